@@ -0,0 +1,255 @@
+"""
+Latency benchmarks for the code that runs on every paint and click.
+Covers TextHandler, TextSelector and qtToPymuUtils on synthetic PDFs and writes a JSON baseline.
+
+Usage:
+    python bench_hot_paths.py --pages 10,200 --links 20,400 --annots 10,100 --output baseline.json
+    python bench_hot_paths.py --output new.json --compare baseline.json
+"""
+import  os
+import  sys
+import  json
+import  time
+import  random
+import  argparse
+import  platform
+import  tempfile
+import  itertools
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import  pymupdf
+import  PySide6
+from    PySide6.QtCore                  import  QPoint, QPointF, QRect, QRectF, QSize, QSizeF
+from    PySide6.QtWidgets               import  QApplication, QWidget, QAbstractScrollArea
+from    PySide6.QtPdfWidgets            import  QPdfView
+
+from    qtapp.utils.TextHandler         import  TextHandler
+from    qtapp.viewerUtils.TextSelector  import  TextSelector
+from    qtapp.utils.qtToPymuUtils       import  (dpi_to_px,
+                                                 px_to_dpi,
+                                                 rect_py_to_qt,
+                                                 rect_qt_to_py,
+                                                 point_to_px,
+                                                 rects_to_array,
+                                                 dpi_to_px_batch)
+from    synthetic                       import  make_synthetic_pdf
+
+
+ZOOM = 1.8
+REGRESSION_RATIO = 1.2
+
+
+class BenchHost(QWidget):
+    """Minimal stand-in for PdfViewer: TextSelector only needs parent.view.viewport()."""
+    def __init__(self):
+        super().__init__()
+        self.view = QAbstractScrollArea(self)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples_ns):
+    """Return latency statistics in microseconds."""
+    values = sorted(sample / 1000.0 for sample in samples_ns)
+    return {
+        "n": len(values),
+        "mean_us": sum(values) / len(values),
+        "min_us": values[0],
+        "p50_us": percentile(values, 50),
+        "p90_us": percentile(values, 90),
+        "p99_us": percentile(values, 99),
+        "max_us": values[-1],
+    }
+
+
+def measure(op, repeat):
+    """Call op(i) repeat times and return per-call durations in ns."""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        op(i)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def make_selector(host, page_size):
+    """Create a TextSelector with a fixed viewport state."""
+    selector = TextSelector(host)
+    selector.set_curr_state({
+        "current_page": 0,
+        "current_zoom_factor": ZOOM,
+        "current_zoom_custom": 1.0,
+        "current_zoom_mode": QPdfView.ZoomMode.FitToWidth,
+        "current_document_size": QSizeF(page_size.width, page_size.height),
+        "current_viewport": QSize(1200, 900),
+        "w_offset": 0.0,
+        "h_offset": 0.0,
+        "current_margins": 10.0,
+    })
+    return selector
+
+
+def bench_scenario(pdf_path, pages, repeat, host, seed=0):
+    """Run every operation on one synthetic document."""
+    rng = random.Random(seed)
+    handler = TextHandler()
+    handler.assign_document(pdf_path)
+    page_size = handler.document[0].rect
+    selector = make_selector(host, page_size)
+
+    page_ids = [rng.randrange(pages) for _ in range(repeat)]
+    points = [QPointF(rng.uniform(0, page_size.width), rng.uniform(0, page_size.height))
+              for _ in range(repeat)]
+    rects = [QRectF(rng.uniform(40, 300), rng.uniform(40, 600), rng.uniform(40, 200), rng.uniform(12, 60))
+             for _ in range(repeat)]
+    px_rects = [QRect(int(r.x() * ZOOM), int(r.y() * ZOOM), int(r.width() * ZOOM), int(r.height() * ZOOM))
+                for r in rects]
+    py_rects = [rect_qt_to_py(r) for r in rects]
+    rect_array = rects_to_array(rects)
+
+    def cold_annots(i):
+        handler.invalidate_page_cache(page_ids[i])
+        handler.get_all_annotations(page_ids[i], ZOOM)
+
+    def cold_links(i):
+        handler.invalidate_page_cache(page_ids[i])
+        handler.get_all_links(page_ids[i], ZOOM)
+
+    def cold_find_text(i):
+        handler.release_page()
+        handler.find_text(page_ids[i], rects[i])
+
+    def cold_year_rect(i):
+        handler.word_cache.pop(page_ids[i], None)
+        handler.extract_year_rect(handler.load_page(page_ids[i]), py_rects[i])
+
+    ops = {
+        "TextHandler.get_all_annotations[cold]": cold_annots,
+        "TextHandler.get_all_annotations[warm]": lambda i: handler.get_all_annotations(page_ids[0], ZOOM),
+        "TextHandler.get_all_links[cold]": cold_links,
+        "TextHandler.get_all_links[warm]": lambda i: handler.get_all_links(page_ids[0], ZOOM),
+        "TextHandler.get_viewport_rects": lambda i: handler.get_viewport_rects(page_ids[0], ZOOM, (10.0, -i)),
+        "TextHandler.hit_test": lambda i: handler.hit_test(page_ids[i], points[i]),
+        "TextHandler.find_text[cold]": cold_find_text,
+        "TextHandler.find_text[warm]": lambda i: handler.find_text(page_ids[0], rects[i]),
+        "TextHandler.extract_year_rect[cold]": cold_year_rect,
+        "TextHandler.extract_year_rect[warm]": lambda i: handler.extract_year_rect(
+                                                        handler.load_page(page_ids[0]), py_rects[i]),
+        "TextSelector.normalize_pixel_to_page": lambda i: selector.normalize_pixel_to_page(px_rects[i]),
+        "TextSelector.page_to_viewport_coords": lambda i: selector.page_to_viewport_coords(px_rects[i]),
+        "TextSelector.viewport_to_page_point": lambda i: selector.viewport_to_page_point(px_rects[i].topLeft()),
+        "TextSelector.page_to_viewport_offset": lambda i: selector.page_to_viewport_offset(),
+        "qtToPymuUtils.dpi_to_px": lambda i: dpi_to_px({"rect": rects[i], "current_zoom": ZOOM}),
+        "qtToPymuUtils.px_to_dpi": lambda i: px_to_dpi({"rect": px_rects[i], "current_zoom": ZOOM}),
+        "qtToPymuUtils.rect_py_to_qt": lambda i: rect_py_to_qt(py_rects[i]),
+        "qtToPymuUtils.rect_qt_to_py": lambda i: rect_qt_to_py(rects[i]),
+        "qtToPymuUtils.point_to_px": lambda i: point_to_px(points[i], ZOOM),
+        "qtToPymuUtils.dpi_to_px_batch[all]": lambda i: dpi_to_px_batch(rect_array, ZOOM, 10.0, -i),
+    }
+
+    results = {}
+    for name, op in ops.items():
+        op(0) # warm up imports and first-call caches
+        results[name] = summarize(measure(op, repeat))
+    handler.close_document()
+    return results
+
+
+def compare(current, baseline_path):
+    """Print p50/p90 ratios against a baseline; return number of regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = 0
+    print(f"\ncomparison against {baseline_path} (ratio > {REGRESSION_RATIO} flagged)")
+    for scenario, data in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(scenario)
+        if not old:
+            print(f"{scenario}: not in baseline")
+            continue
+        print(f"{scenario}:")
+        for op, stats in data["ops"].items():
+            old_stats = old["ops"].get(op)
+            if not old_stats:
+                continue
+            ratio_p50 = stats["p50_us"] / old_stats["p50_us"] if old_stats["p50_us"] else 0.0
+            ratio_p90 = stats["p90_us"] / old_stats["p90_us"] if old_stats["p90_us"] else 0.0
+            flag = ""
+            if ratio_p50 > REGRESSION_RATIO:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"  {op:45} p50 {old_stats['p50_us']:10.1f} -> {stats['p50_us']:10.1f} us"
+                  f" (x{ratio_p50:.2f}, p90 x{ratio_p90:.2f}){flag}")
+    return regressions
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TextHandler/TextSelector/qtToPymuUtils hot paths.")
+    parser.add_argument("--pages", type=parse_int_list, default=[10, 200])
+    parser.add_argument("--links", type=parse_int_list, default=[20, 400],
+                        help="links per page")
+    parser.add_argument("--annots", type=parse_int_list, default=[10, 100],
+                        help="annotations per page")
+    parser.add_argument("--repeat", type=int, default=200, help="samples per operation")
+    parser.add_argument("--output", default="benchmark_baseline.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to diff against")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    host = BenchHost()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pymupdf": pymupdf.VersionBind,
+            "pyside6": PySide6.__version__,
+            "repeat": args.repeat,
+            "zoom": ZOOM,
+        },
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages, links, annots in itertools.product(args.pages, args.links, args.annots):
+            scenario = f"pages{pages}_links{links}_annots{annots}"
+            pdf_path = os.path.join(tmp_dir, scenario + ".pdf")
+            make_synthetic_pdf(pdf_path, pages, links, annots)
+            print(f"{scenario} ...")
+            ops = bench_scenario(pdf_path, pages, args.repeat, host)
+            report["scenarios"][scenario] = {
+                "pages": pages,
+                "links_per_page": links,
+                "annots_per_page": annots,
+                "ops": ops,
+            }
+            for op, stats in ops.items():
+                print(f"  {op:45} p50 {stats['p50_us']:10.1f} us  p90 {stats['p90_us']:10.1f} us"
+                      f"  p99 {stats['p99_us']:10.1f} us")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Memory stress test for long sessions on very large PDFs.
+Walks every page through the render cache, text handler and search index under a MemoryBudget and asserts bounded growth.
+
+Usage:
+    python stress_memory.py --pages 1500 --scanned --limit 512
+    python stress_memory.py --pdf volume.pdf --passes 2 --output memory.json
+"""
+import  os
+import  sys
+import  json
+import  time
+import  argparse
+import  tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from    PySide6.QtCore                  import  QEvent, QEventLoop, QRectF, QTimer
+from    PySide6.QtWidgets               import  QApplication
+
+from    qtapp.utils.TextHandler         import  TextHandler
+from    qtapp.utils.TextIndex           import  TextIndex
+from    qtapp.utils.MemoryBudget        import  MemoryBudget, process_rss
+from    qtapp.utils.DocumentRegistry    import  DocumentRegistry
+from    qtapp.viewerUtils.RenderCache   import  RenderCache
+from    synthetic                       import  make_synthetic_pdf
+
+
+ZOOM = 1.0
+RENDER_TIMEOUT_MS = 5000
+CHECK_EVERY_PAGES = 25      # budget checks while walking (the app checks on a timer)
+
+
+def wait_for(signal, timeout_ms):
+    """Run the event loop until signal fires or timeout_ms passes; True if it fired."""
+    loop = QEventLoop()
+    fired = []
+    def on_signal(*args):
+        fired.append(args)
+        loop.quit()
+    signal.connect(on_signal)
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+    timer.start(timeout_ms)
+    loop.exec()
+    timer.stop()
+    signal.disconnect(on_signal)
+    return bool(fired)
+
+
+def build_index(text_index, path, page_count):
+    """Index the whole document, as the search panel does on open."""
+    text_index.set_document(path, page_count)
+    while not text_index.is_ready():
+        if not wait_for(text_index.progress, RENDER_TIMEOUT_MS * 4):
+            break
+
+
+def render_page(render_cache, page_idx):
+    """Render page_idx with its prefetch window and wait until it is cached."""
+    render_cache.prefetch(page_idx)
+    deadline = time.perf_counter() + RENDER_TIMEOUT_MS / 1000.0
+    while render_cache.get(page_idx) is None and time.perf_counter() < deadline:
+        wait_for(render_cache.page_ready, RENDER_TIMEOUT_MS)
+
+
+def walk_pages(handler, render_cache, budget, page_count, samples, failures, walk=0):
+    """
+    Visit every page like a reader would: render, overlays, hit test, text selection.
+
+    Samples are taken before each budget check, so they show what the
+    caches grew to, not what a trim happened to leave behind.
+    """
+    for page_idx in range(page_count):
+        render_page(render_cache, page_idx)
+        handler.get_all_annotations(page_idx, ZOOM)
+        handler.get_all_links(page_idx, ZOOM)
+        handler.get_viewport_rects(page_idx, ZOOM, (10.0, 10.0))
+        handler.find_text(page_idx, QRectF(50, 50, 300, 200))
+        handler.get_word_layout(page_idx)
+
+        if handler.cache_bytes > handler.cache_budget_bytes and len(handler.cache_order) > 2:
+            failures.append(f"page {page_idx}: text caches {handler.cache_bytes} > {handler.cache_budget_bytes}")
+        if render_cache.bytes_used > render_cache.budget_bytes and len(render_cache.images) > 1:
+            failures.append(f"page {page_idx}: render cache {render_cache.bytes_used} > {render_cache.budget_bytes}")
+        if page_idx % CHECK_EVERY_PAGES == 0 or page_idx == page_count - 1:
+            samples.append({"pass": walk, "page": page_idx, "rss": process_rss(),
+                            "render": render_cache.bytes_used, "text": handler.cache_bytes})
+            samples[-1]["trimmed"] = budget.check()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk every page under a memory budget and check for unbounded growth.")
+    parser.add_argument("--pdf", help="PDF to walk (default: a generated synthetic volume)")
+    parser.add_argument("--pages", type=int, default=1500, help="pages of the synthetic volume")
+    parser.add_argument("--links", type=int, default=20, help="links per synthetic page")
+    parser.add_argument("--annots", type=int, default=10, help="annotations per synthetic page")
+    parser.add_argument("--scanned", action="store_true", help="put a page image behind the synthetic text")
+    parser.add_argument("--limit", type=int, default=512, help="memory ceiling in MB")
+    parser.add_argument("--passes", type=int, default=2, help="walks over the document")
+    parser.add_argument("--warmup", type=float, default=0.1,
+                        help="fraction of the first pass before the baseline is taken")
+    parser.add_argument("--max-growth-mb", type=float, default=96.0,
+                        help="allowed resident growth from the baseline to the end")
+    parser.add_argument("--max-leak-mb", type=float, default=24.0,
+                        help="allowed growth of the resident peak from the first pass to the last")
+    parser.add_argument("--output", help="JSON file for samples and the telemetry report")
+    args = parser.parse_args()
+    if sys.version_info < (3, 12):
+        # PySide6 signal emits drop a reference to True each time; bools are
+        # immortal from 3.12 on, before that a long run aborts the interpreter
+        print("stress_memory.py needs Python 3.12 or newer (requires-python in pyproject.toml)")
+        return 1
+
+    app = QApplication.instance() or QApplication([])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.pdf
+        if not path:
+            path = os.path.join(tmp_dir, "stress.pdf")
+            print(f"generating {args.pages} pages ...")
+            make_synthetic_pdf(path, args.pages, args.links, args.annots, scanned=args.scanned)
+
+        registry = DocumentRegistry()
+        handler = TextHandler(registry=registry)
+        handler.assign_document(path)
+        document = registry.acquire_qt(path)
+        page_count = document.pageCount()
+        render_cache = RenderCache()
+        render_cache.set_document(document)
+        render_cache.set_zoom(ZOOM)
+        text_index = TextIndex()
+
+        budget = MemoryBudget(limit_mb=args.limit, registry=registry)
+        budget.attach("stress", handler, render_cache, text_index)
+
+        start = time.perf_counter()
+        build_index(text_index, path, page_count)
+        print(f"indexed in {time.perf_counter() - start:.1f}s, rss {(process_rss() or 0) / 1e6:.0f} MB")
+
+        failures = []
+        samples = []
+        warmup_page = int(page_count * args.warmup)
+        for walk in range(args.passes):
+            start = time.perf_counter()
+            walk_pages(handler, render_cache, budget, page_count, samples, failures, walk)
+            print(f"pass {walk + 1}: {page_count} pages in {time.perf_counter() - start:.1f}s, "
+                  f"rss {(samples[-1]['rss'] or 0) / 1e6:.0f} MB")
+
+        budget.print_report()
+        report = budget.report()
+
+        rss_values = [sample["rss"] for sample in samples if sample["rss"] is not None]
+        if rss_values:
+            baseline = next(sample["rss"] for sample in samples if sample["page"] >= warmup_page)
+            growth = (rss_values[-1] - baseline) / 1e6
+            print(f"resident: baseline {baseline / 1e6:.0f} MB, end {rss_values[-1] / 1e6:.0f} MB, "
+                  f"peak {max(rss_values) / 1e6:.0f} MB, growth {growth:.1f} MB")
+            if growth > args.max_growth_mb:
+                failures.append(f"resident growth {growth:.1f} MB > {args.max_growth_mb} MB")
+            # peaks per pass: trims land on different checks from pass to pass,
+            # but a leak raises every peak
+            pass_peaks = [max(sample["rss"] for sample in samples
+                              if sample["pass"] == walk and sample["rss"] is not None)
+                          for walk in range(args.passes)]
+            if len(pass_peaks) > 1:
+                leak = (pass_peaks[-1] - pass_peaks[0]) / 1e6
+                print(f"pass peaks: {', '.join(f'{peak / 1e6:.0f}' for peak in pass_peaks)} MB, "
+                      f"growth after the first pass: {leak:.1f} MB")
+                if leak > args.max_leak_mb:
+                    failures.append(f"growth after the first pass {leak:.1f} MB > {args.max_leak_mb} MB")
+        else:
+            print("resident size not available on this platform; only cache bounds checked")
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"pdf": args.pdf or "synthetic", "pages": page_count, "limit_mb": args.limit,
+                           "samples": samples, "report": report, "failures": failures}, f, indent=2)
+            print(f"results written to {args.output}")
+
+        # renderer first: its worker thread must not outlive the document
+        render_cache.close()
+        app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        app.processEvents()
+        handler.close_document()
+        registry.close_all()
+
+    for failure in failures[:20]:
+        print("FAIL", failure)
+    print("FAILED" if failures else "OK: memory stayed bounded")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Synthetic PDF generator for benchmarks.
+Builds volumes with configurable page count and link/annotation density using PyMuPDF.
+"""
+import  random
+import  pymupdf
+
+
+SURNAMES = ["Adorno", "Trocki", "Davidson", "Zima", "Kermauner", "Casanova",
+            "Deckard", "Iser", "Frank", "Smith", "Novak", "Horvat"]
+
+PAGE_MARGIN = 50
+LINE_HEIGHT = 14
+FONT_SIZE = 9
+LARGE_VOLUME_PAGES = 200
+SCAN_SIZE = (600, 850)      # grey page image of "scanned" volumes, in pixels
+
+
+def citation_text(rng):
+    """Return a random (Surname Year: pages) citation."""
+    return f"({rng.choice(SURNAMES)} {rng.randint(1950, 2023)}: {rng.randint(1, 300)})"
+
+
+def scan_pixmap(page_idx):
+    """Return a grey page image that differs per page but compresses well."""
+    width, height = SCAN_SIZE
+    samples = bytearray(b"\xeb" * (width * height))
+    for line in range(40):
+        x1 = 40 + (page_idx * 37 + line * 53) % 500
+        for y in range(40 + line * 19, 49 + line * 19):
+            samples[y * width + 40:y * width + x1] = b"\xb4" * (x1 - 40)
+    return pymupdf.Pixmap(pymupdf.csGRAY, width, height, bytes(samples), False)
+
+
+def make_synthetic_pdf(path, pages=10, links_per_page=50, annots_per_page=20, seed=0, scanned=False):
+    """
+    Write a synthetic PDF to path.
+
+    Every page carries body text with citations, links_per_page GOTO links
+    and annots_per_page underline annotations placed over text lines; the
+    last page of the document holds a bibliography. scanned puts a
+    distinct page image behind the text, like an OCRed scan.
+
+    Returns:
+        str: path
+    """
+    rng = random.Random(seed)
+    doc = pymupdf.open()
+    for _ in range(pages):
+        doc.new_page()
+
+    width = doc[0].rect.width
+    lines_per_page = int((doc[0].rect.height - 2 * PAGE_MARGIN) // LINE_HEIGHT)
+
+    for page_idx in range(pages):
+        page = doc[page_idx]
+        is_bibliography = page_idx == pages - 1
+        if scanned:
+            page.insert_image(page.rect, pixmap=scan_pixmap(page_idx), overlay=False)
+        for line in range(lines_per_page):
+            y = PAGE_MARGIN + (line + 1) * LINE_HEIGHT
+            if is_bibliography:
+                text = (f"{rng.choice(SURNAMES)}, Name, {rng.randint(1950, 2023)}: "
+                        f"Title of work {line}. Publisher.")
+            else:
+                text = f"Body text line {line} with a citation {citation_text(rng)} and more words."
+            page.insert_text((PAGE_MARGIN, y), text, fontsize=FONT_SIZE)
+
+        for idx in range(links_per_page):
+            line = idx % lines_per_page
+            column = (idx // lines_per_page) % 4
+            x0 = PAGE_MARGIN + column * (width - 2 * PAGE_MARGIN) / 4
+            y1 = PAGE_MARGIN + (line + 1) * LINE_HEIGHT + 3
+            rect = pymupdf.Rect(x0, y1 - LINE_HEIGHT, x0 + 80, y1)
+            page.insert_link({"kind": pymupdf.LINK_GOTO,
+                              "from": rect,
+                              "page": pages - 1,
+                              "to": pymupdf.Point(PAGE_MARGIN, PAGE_MARGIN + line * LINE_HEIGHT)})
+
+        for idx in range(annots_per_page):
+            line = idx % lines_per_page
+            y1 = PAGE_MARGIN + (line + 1) * LINE_HEIGHT + 3
+            rect = pymupdf.Rect(PAGE_MARGIN + 200, y1 - LINE_HEIGHT, PAGE_MARGIN + 260, y1)
+            if idx % 2:
+                page.add_highlight_annot(rect)
+            else:
+                page.add_underline_annot(rect)
+
+    # duplicate-object merging (garbage=3) is quadratic; large volumes only drop unused objects
+    doc.save(path, garbage=3 if pages <= LARGE_VOLUME_PAGES else 1, deflate=True)
+    doc.close()
+    return path
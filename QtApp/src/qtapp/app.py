@@ -0,0 +1,624 @@
+"""
+Main window module for the Citation Linker Qt application.
+Provides the user interface for linking citations in PDF documents to their bibliography entries.
+"""
+import  sys
+import  os
+import  time
+from    PySide6.QtCore                  import  Qt, Slot, QTimer
+from    PySide6.QtWidgets               import  (QApplication,
+                                                 QMessageBox,
+                                                 QPushButton,
+                                                 QMainWindow,
+                                                 QWidget,
+                                                 QHBoxLayout,
+                                                 QVBoxLayout,
+                                                 QStackedLayout,
+                                                 QLabel,
+                                                 QCheckBox,
+                                                 QSizePolicy)
+from    qtapp.components.FileManager    import  FileManager
+from    qtapp.utils.startupProfiler     import  profiler
+
+# PdfViewer, TextHandler, DocConfig, Bridge and DocumentRegistry pull in
+# QtPdf/PyMuPDF/citation_linker; they are imported in build_workspace()
+# so the upload screen shows before those are loaded.
+
+class CitationLinkerApp(QMainWindow):
+    """
+    Main application window for Citation Linker.
+    
+    Parent: QMainWindow (from PySide6.QtWidgets)
+    Children: PdfViewer, FileManager, DocConfig, TextHandler, Bridge
+    
+    This class orchestrates the entire citation linking workflow including:
+    - PDF file upload and viewing
+    - Citation configuration management
+    - Document processing and link creation
+    - Output file generation and saving
+    
+    The application manages multiple document environments (input and output views)
+    and provides UI controls for switching between configuration and viewing modes.
+    """
+    def __init__(self, memory_limit_mb=None):
+        """Initialize the main application window; memory_limit_mb overrides the default memory ceiling."""
+        super().__init__()
+
+        container = QWidget()
+        self.upload_path = ""
+
+
+        self.layout = QVBoxLayout(container)
+        self.horizontal_bar = QHBoxLayout()
+
+        self.input_container = QWidget()
+        self.output_container = QWidget()
+        self.input_layout = QHBoxLayout(self.input_container)
+        self.output_layout = QHBoxLayout(self.output_container)
+        self.stacked_layout = QStackedLayout()
+
+        self.layout.setStretchFactor(self.horizontal_bar, 0)
+        self.setCentralWidget(container)
+
+
+        self.view_environments = []
+        self.pending_save_path = ""
+        self.journal_snapshots = {}     # save path -> output journal when its save started
+        self.is_input_view = True
+        # built on first use by build_workspace()
+        self.document_registry = None
+        self.memory_budget = None
+        self.memory_limit_mb = memory_limit_mb
+        self.bridge = None
+        self.document_config = None
+        self.text_handler = None
+        self.initial_viewer = None
+        self.upload_file_manager = FileManager(upload=True, pdf=True, parent=self)
+        self.save_file_manager = FileManager(upload=False, pdf=True, parent=self)
+
+
+        self.configToggle = QPushButton("config")
+        self.startProcess = QPushButton("start linking")
+        self.switchViewers = QPushButton("output document")
+        self.saveFile = QPushButton("save file")
+        self.cancelProcess = QPushButton("cancel linking")
+        self.parallelArticles = QCheckBox("parallel articles")
+        self.parallelArticles.setChecked(True)
+        self.parallelArticles.setToolTip("link every article break in its own process")
+        self.exitBtn = QPushButton("🗙")
+        
+        self.filenameLabel = QLabel("")
+        self.filenameLabel.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self.statusLabel = QLabel("")
+
+
+        self.switchViewers.setMaximumWidth(200)
+        self.configToggle.setMaximumWidth(200)
+        self.startProcess.setMaximumWidth(200)
+        self.exitBtn.setMaximumWidth(20)
+        self.saveFile.setMaximumWidth(200)
+        self.cancelProcess.setMaximumWidth(200)
+        self.parallelArticles.setMaximumWidth(200)
+        self.configToggle.setCheckable(True)
+        self.switchViewers.setCheckable(True)
+
+
+        self.upload_file_manager.process_finished.connect(self.file_upload)
+        self.configToggle.toggled.connect(self.toggle_config)
+        self.switchViewers.toggled.connect(self.switch_views)
+        self.startProcess.clicked.connect(self.start_linking_process)
+        self.saveFile.clicked.connect(self.save_file_event)
+        self.exitBtn.clicked.connect(QApplication.quit)
+        self.save_file_manager.process_finished.connect(self.perform_save)
+
+
+        self.layout.addWidget(self.upload_file_manager)
+        self.layout.addWidget(self.filenameLabel)
+        self.horizontal_bar.setContentsMargins(50, 2, 50, 2)
+        self.input_layout.setContentsMargins(0, 0, 0, 0)
+        self.output_layout.setContentsMargins(0, 0, 0, 0)
+        self.horizontal_bar.setSpacing(20)
+        self.horizontal_bar.addStretch()
+        self.horizontal_bar.addWidget(self.configToggle)
+        self.horizontal_bar.addWidget(self.startProcess)
+        self.horizontal_bar.addWidget(self.parallelArticles)
+        self.horizontal_bar.addWidget(self.switchViewers)
+        self.horizontal_bar.addWidget(self.saveFile)
+        self.horizontal_bar.addWidget(self.cancelProcess)
+        self.horizontal_bar.addWidget(self.statusLabel)
+        self.horizontal_bar.addStretch()
+        self.horizontal_bar.addWidget(self.exitBtn)
+
+        self.stacked_layout.addWidget(self.input_container) # 0
+        self.stacked_layout.addWidget(self.output_container) # 1
+
+        self.input_idx = self.stacked_layout.indexOf(self.input_container)
+        self.output_idx = self.stacked_layout.indexOf(self.output_container)
+        self.config_idx = -1
+
+
+        self.layout.addLayout(self.horizontal_bar, stretch=0)
+        self.layout.addLayout(self.stacked_layout, stretch=1)
+        # self.layout.addLayout(self.input_layout, stretch=1)
+        # self.layout.addLayout(self.output_layout, stretch=1)
+        # self.layout.addWidget(self.document_config, stretch=1)
+
+
+        self.filenameLabel.hide()
+        self.configToggle.hide()
+        self.startProcess.hide()
+        self.parallelArticles.hide()
+        self.switchViewers.hide()
+        self.saveFile.hide()
+        self.cancelProcess.hide()
+        self.statusLabel.hide()
+        self.exitBtn.hide()
+
+    def build_workspace(self):
+        """
+        Construct the bridge, config panel and viewer environments on first use.
+
+        Deferred from __init__ so the window appears before QtPdf, PyMuPDF and
+        citation_linker are imported; called once when the first file is opened.
+        """
+        if self.bridge is not None:
+            return
+
+        with profiler.measure("workspace"):
+            with profiler.measure("import viewer/config modules", "import"):
+                from qtapp.utils.Bridge             import  Bridge
+                from qtapp.utils.DocumentRegistry   import  DocumentRegistry
+                from qtapp.components.DocConfig     import  DocConfig
+                from qtapp.utils.MemoryBudget       import  MemoryBudget, DEFAULT_MEMORY_LIMIT_MB
+
+            with profiler.measure("Bridge + DocumentRegistry"):
+                self.document_registry = DocumentRegistry(self)
+                self.bridge = Bridge(self)
+            with profiler.measure("DocConfig"):
+                self.document_config = DocConfig(self, self.bridge)
+            with profiler.measure("viewer environments"):
+                self.create_document_env()
+                self.create_document_env("output_doc", output=True)
+                self.create_document_env("output_alt", alt=True, output=True)
+
+            self.text_handler = next(env["text_handler"]
+                                     for env in self.view_environments if 
+                                     env["type"] == "input_doc")
+            self.initial_viewer = next(env["viewer"]
+                                       for env in self.view_environments if 
+                                       env["type"] == "input_doc")
+
+            self.memory_budget = MemoryBudget(self, self.memory_limit_mb or DEFAULT_MEMORY_LIMIT_MB,
+                                              self.document_registry)
+            for env in self.view_environments:
+                search_panel = env["viewer"].search_panel
+                self.memory_budget.attach(env["type"], env["text_handler"], env["viewer"].view.render_cache,
+                                          search_panel.text_index if search_panel else None)
+            self.memory_budget.start()
+
+            self.text_handler.set_viewer(self.initial_viewer)
+            self.document_config.hide()
+            self.connect_viewer_signals()
+
+            self.cancelProcess.clicked.connect(self.bridge.cancel_linking_process)
+            self.bridge.linking_finished.connect(self.open_output_view)
+            self.bridge.linking_progress.connect(self.on_linking_progress)
+            self.bridge.linking_cancelled.connect(self.on_linking_cancelled)
+            self.bridge.article_report.connect(self.on_article_report)
+            self.bridge.linking_event.connect(self.on_linking_event)
+            self.bridge.doc_saver.save_finished.connect(self.on_save_finished)
+
+            self.stacked_layout.addWidget(self.document_config) # 2
+            self.config_idx = self.stacked_layout.indexOf(self.document_config)
+        profiler.report("workspace")
+
+
+    def refresh_layout(self):
+        """Force UI refresh by hiding and showing the main window."""
+
+        self.layout.invalidate()
+        self.layout.activate()
+        self.centralWidget().updateGeometry()
+        
+        QApplication.processEvents()
+        # self.hide()
+        # self.show()
+        # QApplication.processEvents()
+    
+    def init_viewers_ui(self):
+        """Initialize and display all viewer widgets in their respective layouts."""
+        for env in self.view_environments:
+            # Set size policy for viewers to expand and fill space
+            env["viewer"].setSizePolicy(QSizePolicy.Policy.Expanding,
+                                        QSizePolicy.Policy.Expanding)
+            
+            if env["type"] == "input_doc":
+                self.input_layout.addWidget(env["viewer"])
+                self.document_config.list_widget_changed.emit("ALL", None)
+            else:
+                self.output_layout.addWidget(env["viewer"])
+        
+    def create_document_env(self, view_type="input_doc", alt=False, output=False):
+        """
+        Create a document viewing environment with associated handlers and viewers.
+        
+        Args:
+            view_type: Type identifier for the environment ("input_doc", "output_doc", "output_alt")
+            alt: Whether this is an alternative viewer (shares text handler with previous environment)
+            output: Whether this is an output viewer (for processed documents)
+
+        Documents are not created here; viewers and text handlers borrow them
+        from the document registry when a file is opened.
+        """
+        from qtapp.components.PdfViewer     import  PdfViewer
+        from qtapp.utils.TextHandler        import  TextHandler
+
+        if alt:
+            text_handler = self.view_environments[-1]["text_handler"]
+        else:
+            text_handler = TextHandler(self, self.document_registry)
+        viewer = PdfViewer(parent=self, textHandler=text_handler, isAlt=alt, isOutput=output)
+
+
+
+        self.view_environments.append({"type": view_type,
+                                        "text_handler": text_handler,
+                                        "viewer": viewer})
+
+    def connect_viewer_signals(self):
+        """
+        Connect link_saved signals from all viewers to the data handler, destination previews
+        to the alt viewer, and destinations set in the alt viewer to closing the suggestions.
+        """
+        for env in self.view_environments:
+            env["viewer"].link_saved.connect(self.send_link_data)
+        # suggested link destinations are previewed in the bibliography (alt) viewer
+        for env in self.view_environments:
+            if env["type"] == "output_doc":
+                for alt_env in self.view_environments:
+                    if alt_env["type"] == "output_alt":
+                        env["viewer"].destination_preview.connect(alt_env["viewer"].on_search_result)
+                        alt_env["viewer"].destination_set.connect(env["viewer"].link_suggestions.dismiss)
+    
+    def clear_text_handlers(self):
+        """Clear configuration data from all text handlers."""
+        for env in self.view_environments:
+            env["text_handler"].clear_all_config_info()
+
+    def open_output_view(self, success, output_file_path):
+        """
+        Open the output view showing the processed PDF with linked citations.
+        
+        Args:
+            success: Whether the linking process completed successfully
+            output_file_path: Path to the generated output PDF file
+        """
+        self.set_linking_controls(running=False)
+        if not success:
+            QMessageBox.warning(self, "Linking Failed",
+                              "The linking process failed.\n"
+                              "Please check the configuration again\n"
+                              "and ensure all settings are correct.")
+            return
+        
+        for env in self.view_environments:
+            if env["type"] == "input_doc":
+                env["viewer"].hide()
+            else:
+                env["viewer"].open_viewer(output_file_path)
+                env["viewer"].show()
+                self.document_config.output_file_path = output_file_path
+                self.set_alt_viewer(env)
+            self.stacked_layout.setCurrentIndex(self.output_idx)
+            self.document_config.hide()
+            self.is_input_view = False
+            self.configToggle.setChecked(False)
+            self.configToggle.setText("config")
+            self.switchViewers.setChecked(True)
+            self.switchViewers.setText("input document")
+        
+        self.refresh_layout()
+
+    def set_alt_viewer(self, env):
+        """
+        Configure the alternative viewer to display article-specific content.
+        
+        Args:
+            env: The viewer environment dictionary containing the viewer to configure
+        """
+        viewer = env["viewer"]
+        if viewer.is_alt == False:
+            return
+
+        article_list = self.document_config.article_breaks_list
+        start_page = 0
+        for i in range(article_list.count()):
+            if i == 0:
+                tokens = article_list.item(i).text().split(":")
+                start_page = int(tokens[-1]) - 1
+                break
+        viewer.navigator.jump_to(start_page)
+        for env in self.view_environments:
+            if env["viewer"] != viewer:
+                env["viewer"].article_changed.connect(viewer.on_article_changed)
+        
+        print("start_page: ", start_page)
+        
+
+    def file_upload(self):
+        """Handle the file upload process and initialize the main viewer UI."""
+        self.upload_path = self.upload_file_manager.get_file_path()
+        if not self.upload_path:
+            return
+        
+        self.build_workspace()
+        self.initial_viewer.open_viewer(self.upload_path)
+        self.document_config.file_path = self.upload_path
+        self.upload_file_manager.hide()
+        
+        # Update filename label
+        filename = os.path.basename(self.upload_path)
+        self.filenameLabel.setText(f"File: {filename}")
+        self.filenameLabel.show()
+        
+        # Show main UI after file is loaded
+        self.configToggle.show()
+        self.startProcess.show()
+        self.parallelArticles.show()
+        self.switchViewers.show()
+        self.saveFile.show()
+        self.exitBtn.show()
+        self.init_viewers_ui()
+
+    def start_linking_process(self):
+        """Initiate the citation linking process after user confirmation."""
+        update_data = self.text_handler.get_config_data()
+        print(update_data)
+        self.document_config.set_data_from_view(update_data)
+        reply = QMessageBox.information(self, "Are you sure?",
+                                ("Are you sure?,\n"
+                                 "otherwise check again\n"
+                                 "if the configuration is okay."),
+                                QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            if self.bridge.start_linking_process(parallel=self.parallelArticles.isChecked()):
+                self.set_linking_controls(running=True)
+        else:
+            pass
+
+    def set_linking_controls(self, running):
+        """Swap start/cancel controls while a linking run is in progress."""
+        self.startProcess.setEnabled(not running)
+        self.cancelProcess.setVisible(running)
+        self.statusLabel.setVisible(running)
+
+    @Slot()
+    def on_linking_progress(self, percent, message):
+        """Show linking progress in the status label."""
+        self.statusLabel.setText(f"{message} ({percent}%)")
+
+    @Slot()
+    def on_article_report(self, report):
+        """Print per-article results of an article-by-article run and warn about failed articles."""
+        print("=========================")
+        for result in report["results"]:
+            article = result["article"]
+            print(f"article {result['index'] + 1:3d} pages {article['first'] + 1}-{article['last'] + 1}: "
+                  f"{'cached' if result.get('cached') else result['status']:6} "
+                  f"{result.get('elapsed_s', 0.0):6.1f}s {result.get('error') or ''}")
+        print(f"{report['succeeded']}/{report['articles']} articles linked "
+              f"({report.get('cached', 0)} from cache) in {report['elapsed_s']:.1f}s")
+        print("=========================")
+
+        failed = [result for result in report["results"] if result["status"] != "ok"]
+        if failed and report.get("merged"):
+            pages = ", ".join(f"{result['article']['first'] + 1}-{result['article']['last'] + 1}"
+                              for result in failed)
+            QMessageBox.warning(self, "Some Articles Failed",
+                                f"{len(failed)} of {report['articles']} articles could not be linked "
+                                f"and were left unchanged (pages {pages}).\n"
+                                "See the logs next to the output file.")
+
+    @Slot()
+    def on_linking_event(self, event):
+        """Print where the time of a finished linking run went."""
+        if event["event"] != "run_end":
+            return
+        phases = ", ".join(f"{phase} {elapsed:.2f}s" for phase, elapsed in event["phases"].items())
+        print(f"linking run {event['run_id']} {event['status']} in {event['elapsed_s']:.2f}s: {phases}")
+        print(f"  {event['pages']} pages, {event['citations']} citations, {event['links']} links")
+        print(f"  telemetry: {self.bridge.telemetry_path}")
+
+    @Slot()
+    def on_linking_cancelled(self):
+        """Restore controls after a cancelled linking run."""
+        self.set_linking_controls(running=False)
+        QMessageBox.information(self, "Linking Cancelled",
+                                "The linking process was cancelled.\n"
+                                "The output directory was left unchanged.")
+
+    @Slot()
+    def send_link_data(self, data):
+        """
+        Distribute link selection data to all viewer environments.
+        
+        Args:
+            data: Dictionary containing 'rect' and 'viewport' for link highlighting
+        """
+        for env in self.view_environments:
+            env["viewer"].view.prev_selection = data["rect"]
+            env["viewer"].view.prev_viewport = data["viewport"]
+
+    @Slot()
+    def switch_views(self, checked):
+        """
+        Toggle between input document and output document views.
+        
+        Args:
+            checked: True for output view, False for input view
+        """
+        if self.configToggle.isChecked():
+            self.configToggle.setChecked(False)
+            self.document_config.hide()
+        
+        if not checked:
+            self.switchViewers.setText("output document")
+            for env in self.view_environments:
+                if env["type"] == "input_doc":
+                    env["viewer"].show()
+                else:
+                    env["viewer"].hide()
+            self.is_input_view = True
+            self.stacked_layout.setCurrentIndex(self.input_idx)
+        else:
+            self.switchViewers.setText("input document")
+            for env in self.view_environments:
+                if env["type"] == "input_doc":
+                    env["viewer"].hide()
+                else:
+                    env["viewer"].show()
+            self.is_input_view = False
+            self.stacked_layout.setCurrentIndex(self.output_idx)
+        
+        self.refresh_layout()
+
+    @Slot()
+    def toggle_config(self, checked):
+        """
+        Toggle between configuration panel and viewer display.
+        
+        Args:
+            checked: True to show config panel, False to show viewer
+        """
+        if checked:
+            self.configToggle.setText("viewer")
+            for env in self.view_environments:
+                env["viewer"].hide()
+            update_data = self.text_handler.get_config_data()
+            self.stacked_layout.setCurrentIndex(self.config_idx)
+            self.document_config.set_data_from_view(update_data)
+            self.document_config.show()
+
+        elif not checked and self.is_input_view:
+            self.configToggle.setText("config")
+            self.document_config.hide()
+            self.stacked_layout.setCurrentIndex(self.input_idx)
+            self.initial_viewer.show()
+        else: 
+            self.configToggle.setText("config")
+            self.document_config.hide()
+            self.stacked_layout.setCurrentIndex(self.output_idx)
+            for env in self.view_environments:
+                if env["type"] != "input_doc":
+                    env["viewer"].show()
+
+        
+        self.refresh_layout()
+
+    @Slot()
+    def save_file_event(self):
+        """Handle the file save event by prompting for user location."""
+        pymu_doc = None
+        for env in self.view_environments:
+            if env["type"] == "output_doc":
+                pymu_doc = env["text_handler"].document
+        
+        # self.bridge.save_final_doc(pymu_doc)
+        
+        self.save_file_manager.save_file()
+    
+    @Slot()
+    def perform_save(self):
+        """Save a copy of the output document to a user-specified location."""
+        save_path = self.save_file_manager.get_file_path()
+        if not save_path:
+            return
+        
+        pymu_doc = None
+        for env in self.view_environments:
+            if env["type"] == "output_doc":
+                pymu_doc = env["text_handler"].document
+        
+        if pymu_doc:
+            # full save runs in the background, result arrives in on_save_finished
+            self.pending_save_path = save_path
+            for env in self.view_environments:
+                if env["type"] == "output_doc":
+                    self.journal_snapshots[save_path] = env["text_handler"].journal.snapshot()
+            open_docs = [env["text_handler"].document for env in self.view_environments
+                         if env["text_handler"].document]
+            self.bridge.save_final_doc(pymu_doc, save_path, open_docs=open_docs)
+        
+        self.save_file_manager.reset_manager(upload=False, pdf=True)
+
+    @Slot()
+    def on_save_finished(self, success, save_path, stats):
+        """
+        Report the result of a save to a user-chosen location.
+
+        Args:
+            success: Whether the save completed
+            save_path: Path the document was written to
+            stats: Save timings and size delta from DocSaver
+
+        Every successful save also writes the output document's edit journal
+        next to the saved file, so undo/redo survives reopening it. The
+        journal written is the one from when the save started, matching the
+        saved content even if edits were made while it ran in the background.
+        """
+        snapshot = self.journal_snapshots.pop(save_path, None)
+        if success:
+            for env in self.view_environments:
+                if env["type"] == "output_doc":
+                    env["text_handler"].journal.save(save_path, snapshot)
+        if save_path != self.pending_save_path:
+            return
+        self.pending_save_path = ""
+        if success:
+            QMessageBox.information(self, "Success", 
+                                  f"File saved to:\n{save_path}\n"
+                                  f"({stats['mode']} save, {stats['total_s']:.2f}s, "
+                                  f"{stats['size_after'] / 1e6:.1f} MB)")
+        else:
+            QMessageBox.critical(self, "Error",
+                                 f"Error saving copy to chosen location:\n{stats.get('error', '')}")
+
+    def closeEvent(self, event):
+        """Clean up resources when the application window is closed."""
+        if self.bridge is None:
+            event.accept()
+            return
+        self.bridge.cancel_linking_process()
+        self.memory_budget.stop()
+        self.memory_budget.print_report()
+        for env in self.view_environments:
+            env["viewer"].view.render_cache.print_stats(env["type"])
+            if env["viewer"].search_panel:
+                env["viewer"].search_panel.cancel()
+            if env["text_handler"].document:
+                env["text_handler"].close_document()
+        self.document_registry.print_memory_report()
+        self.document_registry.close_all()
+        event.accept()
+
+
+def run_app(memory_limit_mb=None):
+    """Initialize and run the Citation Linker application."""
+    QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+    with profiler.measure("QApplication"):
+        app = QApplication()
+        app.setAttribute(Qt.AA_UseHighDpiPixmaps)
+    with profiler.measure("CitationLinkerApp"):
+        citationLinkerApp = CitationLinkerApp(memory_limit_mb)
+    with profiler.measure("showMaximized"):
+        citationLinkerApp.showMaximized()  # Start maximized
+
+    if profiler.enabled:
+        # first pass of the event loop: the window is on screen
+        QTimer.singleShot(0, lambda: (profiler.mark("event loop running"),
+                                      profiler.report()))
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    run_app()
@@ -0,0 +1,156 @@
+"""
+Headless batch mode for the Citation Linker application.
+Links many PDFs in a bounded process pool and writes a JSON summary; never imports QtWidgets.
+"""
+import  os
+import  sys
+import  json
+import  time
+import  tempfile
+import  multiprocessing
+from    concurrent.futures              import  ProcessPoolExecutor, as_completed
+
+from    qtapp.utils.linkerRunner        import  run_linker_job, active_config_path
+
+
+MAX_DEFAULT_JOBS = 4
+
+
+def read_manifest(path):
+    """
+    Collect (pdf, config) pairs from a directory or manifest file.
+
+    Supported inputs:
+    - directory: every *.pdf directly inside it
+    - .json: list of paths or {"pdf": ..., "config": ...} objects
+    - any other file: one PDF path per line, "#" starts a comment
+
+    Relative paths in a manifest are resolved against the manifest's directory.
+    """
+    if os.path.isdir(path):
+        return [(os.path.join(path, name), None)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith(".pdf")]
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            for item in json.load(f):
+                if isinstance(item, str):
+                    entries.append((item, None))
+                else:
+                    entries.append((item["pdf"], item.get("config")))
+        else:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    entries.append((line, None))
+
+    return [(os.path.join(base_dir, pdf),
+             os.path.join(base_dir, config) if config else None)
+            for pdf, config in entries]
+
+
+def build_jobs(args, entries, output_dir, scratch_root, default_config):
+    """
+    Create one job dict per PDF with its own scratch directory.
+
+    Entries without their own config use default_config. PDFs sharing a
+    base name (from different directories) get their entry number appended
+    to their output names, so their linked PDFs and logs do not overwrite
+    each other in output_dir.
+    """
+    bases = [os.path.splitext(os.path.basename(pdf))[0] for pdf, _ in entries]
+    jobs = []
+    for idx, (pdf, config) in enumerate(entries):
+        base = bases[idx]
+        jobs.append({
+            "pdf": os.path.abspath(pdf),
+            "config": os.path.abspath(config) if config else default_config,
+            "scratch_dir": os.path.join(scratch_root, f"{idx:04d}_{base}"),
+            "output_dir": output_dir,
+            "output_name": f"{base}_{idx + 1:04d}" if bases.count(base) > 1 else base,
+            "cmd_in": args.mode,
+            "keep_scratch": args.keep_scratch,
+        })
+    return jobs
+
+
+def run_batch(args):
+    """
+    Run the batch described by parsed command line args.
+
+    Returns:
+        int: 0 if every file was linked, 1 otherwise
+    """
+    entries = read_manifest(args.batch)
+    if not entries:
+        print(f"no PDF files found in {args.batch}")
+        return 1
+
+    output_dir = os.path.abspath(args.output or os.path.join(
+            args.batch if os.path.isdir(args.batch) else os.path.dirname(args.batch),
+            "linked"))
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = args.summary or os.path.join(output_dir, "batch_summary.json")
+    max_workers = args.jobs or min(MAX_DEFAULT_JOBS, os.cpu_count() or 1)
+    # resolved here: jobs run with isolated user dirs that only hold factory defaults
+    default_config = os.path.abspath(args.config) if args.config else active_config_path()
+    if default_config is None and any(config is None for _, config in entries):
+        print("no active config found; pass one with --config")
+        return 1
+    scratch_root = tempfile.mkdtemp(prefix="citation_linker_batch_")
+
+    jobs = build_jobs(args, entries, output_dir, scratch_root, default_config)
+    print(f"linking {len(jobs)} files with {max_workers} workers -> {output_dir}")
+
+    start = time.perf_counter()
+    results = []
+    # one task per child: every job starts from a fresh interpreter, so its
+    # isolated user dirs are in place before citation_linker is imported
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as pool:
+        futures = {pool.submit(run_linker_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"pdf": job["pdf"], "status": "error",
+                          "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            print(f"[{len(results)}/{len(jobs)}] {result['status']:6} "
+                  f"{os.path.basename(result['pdf'])} "
+                  f"({result.get('elapsed_s', 0.0):.1f}s)")
+
+    if not args.keep_scratch:
+        try:
+            os.rmdir(scratch_root)
+        except OSError:
+            pass
+
+    results.sort(key=lambda result: result["pdf"])
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    summary = {
+        "mode": args.mode,
+        "config": default_config,
+        "output_dir": output_dir,
+        "workers": max_workers,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_s": time.perf_counter() - start,
+        "files": results,
+    }
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"{succeeded}/{len(results)} linked, summary: {summary_path}")
+    return 0 if succeeded == len(results) else 1
+
+
+if __name__ == "__main__":
+    from qtapp.main import parse_args
+    sys.exit(run_batch(parse_args()))
@@ -2,7 +2,6 @@
 Document configuration management UI for citation linking settings.
 Provides forms for all configuration options with load/save functionality.
 """
-import  re
 import  os
 import  sys
 import  subprocess
@@ -26,6 +25,8 @@ from    PySide6.QtWidgets               import  (QWidget,
                                                  QScrollArea,)
 
 from    qtapp.components.FileManager    import  FileManager
+from    qtapp.utils.ArticleRanges       import  ArticleRanges
+from    qtapp.utils.ConfigModel         import  ConfigStore
 
 class DocConfig(QWidget):
     """
@@ -44,6 +45,11 @@ class DocConfig(QWidget):
     
     Configuration is synchronized with text handlers and persisted to disk.
     Provides help dialogs for each configuration field.
+
+    Values live in a ConfigStore: widgets write single fields into it, and
+    its config_changed diffs are applied to the widgets and the text
+    handlers, so only the fields that changed are touched. The file is
+    re-read only when it changed on disk and written only when edited.
     """
     list_widget_changed = Signal(str, QListWidget)
 
@@ -70,21 +76,43 @@ class DocConfig(QWidget):
         self.annot_type = "underline"
         self.color = "black"
         self.offset = ""
-        self.article_cache = []
+        self.article_cache = ArticleRanges()
         self.soft_year_search = False
         self.deep_search = False
         self.search_exclude = []
         self.alternative_bib = False
 
+        self.config_store = ConfigStore(self)
         self.file_manager = FileManager(upload=True, pdf=False, parent=self)
         self.file_manager.hide()
 
         # Initialize UI
         self.init_ui()
+        self.list_widgets = {
+                "SPECIAL_CASE": self.special_case_list,
+                "BIBLIOGRAPHY_DELIMITER": self.delimiter_list,
+                "ARTICLE_BREAKS": self.article_breaks_list,
+                "SEARCH_EXCLUDE": self.search_exclude_list,
+                }
+        self.check_boxes = {
+                "DEBUG": self.debug_check,
+                "SOFT_YEAR": self.soft_year_check,
+                "DEEP_SEARCH": self.deep_search_check,
+                "ALTERNATIVE_BIB": self.alternative_bib_check,
+                }
 
         #signals
         self.list_widget_changed.connect(self.list_widget_update)
         self.bridge.config_path_changed.connect(self.on_config_path_change)
+        self.config_store.config_changed.connect(self.on_config_changed)
+        for key, check_box in self.check_boxes.items():
+            check_box.toggled.connect(lambda checked, key=key: self.config_store.update(key, checked))
+        self.annot_type_combo.currentTextChanged.connect(
+                lambda text: self.config_store.update("ANNOT_TYPE", text))
+        self.color_combo.currentTextChanged.connect(
+                lambda text: self.config_store.update("COLOR", text))
+        self.offset_combo.currentIndexChanged.connect(
+                lambda idx: self.config_store.update("OFFSET", self.offset_combo.currentData()))
 
         if self.config_path and os.path.exists(self.config_path):
             self.load_config()
@@ -391,149 +419,49 @@ class DocConfig(QWidget):
         self.parent.bridge.set_paths(output_dir=self.output_dir)
 
     def on_config_path_change(self, path):
-        """Handle configuration path change signal."""
+        """Switch to the config profile at path (cached profiles switch without disk access)."""
         self.config_path = path
-
-    def parse_config_line(self, line):
-        """Parse a single line from configuration file."""
-        line = line.strip()
-        if not line or line.startswith("#"):
-            return None, None
-
-        if "=" not in line:
-            return None, None
-
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-
-        return key, value
-
-    def parse_list_value(self, value):
-        """Parse comma-separated quoted values from config."""
-        if not value:
-            return []
-
-        # Match quoted strings
-        matches = re.findall(r'"([^"]*)"', value)
-        return matches
+        if path and os.path.exists(path):
+            try:
+                self.config_store.load(path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error loading config: {e}")
+
+    def showEvent(self, event):
+        """Pick up changes made to the config file outside the app."""
+        if self.config_store.path:
+            self.config_store.refresh()
+        super().showEvent(event)
 
     def load_config(self):
-        """Load configuration from file."""
+        """Load configuration from file, discarding unsaved edits."""
         if not self.config_path or not os.path.exists(self.config_path):
             QMessageBox.warning(self, "Config Not Found",
                               f"Config file not found at: {self.config_path or 'unknown path'}")
             return
 
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    key, value = self.parse_config_line(line)
-                    if not key:
-                        continue
-
-                    if key == "DEBUG":
-                        self.debug_check.setChecked(value.lower() == "true")
-                    elif key == "SPECIAL_CASE":
-                        self.special_case_list.clear()
-                        for item in self.parse_list_value(value):
-                            self.special_case_list.addItem(item)
-                    elif key == "BIBLIOGRAPHY_DELIMITER":
-                        self.delimiter_list.clear()
-                        for item in self.parse_list_value(value):
-                            self.delimiter_list.addItem(item)
-                    elif key == "ANNOT_TYPE":
-                        idx = self.annot_type_combo.findText(value)
-                        if idx >= 0:
-                            self.annot_type_combo.setCurrentIndex(idx)
-                    elif key == "COLOR":
-                        idx = self.color_combo.findText(value)
-                        if idx >= 0:
-                            self.color_combo.setCurrentIndex(idx)
-                    elif key == "OFFSET":
-                        idx = self.offset_combo.findData(value)
-                        if idx >= 0:
-                            self.offset_combo.setCurrentIndex(idx)
-                    elif key == "ARTICLE_BREAKS":
-                        self.article_breaks_list.clear()
-                        for item in self.parse_list_value(value):
-                            self.article_breaks_list.addItem(item)
-                    elif key == "SOFT_YEAR":
-                        self.soft_year_check.setChecked(value.lower() == "true")
-                    elif key == "DEEP_SEARCH":
-                        self.deep_search_check.setChecked(value.lower() == "true")
-                    elif key == "SEARCH_EXCLUDE":
-                        self.search_exclude_list.clear()
-                        for item in self.parse_list_value(value):
-                            self.search_exclude_list.addItem(item)
-                    elif key == "ALTERNATIVE_BIB":
-                        self.alternative_bib_check.setChecked(value.lower() == "true")
-
+            self.config_store.load(self.config_path, discard_edits=True)
             # QMessageBox.information(self, "Success", "Config loaded successfully!")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error loading config: {e}")
 
-    def format_list_value(self, list_widget):
-        """Format list widget items as comma-separated quoted strings."""
-        items = []
-        for i in range(list_widget.count()):
-            items.append(f'"{list_widget.item(i).text()}"')
-        return ", ".join(items) if items else ""
-
     def save_config(self):
-        """Save configuration to file."""
+        """Save configuration to file if it has unsaved edits."""
         if not self.config_path:
             QMessageBox.warning(self, "No Config Path",
                               "Config path not set. Cannot save.")
             return
 
         try:
-            # Build config content in correct order
-            lines = []
-            lines.append(f"DEBUG={self.debug_check.isChecked()}")
-
-            special_case = self.format_list_value(self.special_case_list)
-            lines.append(f"SPECIAL_CASE={special_case}")
-
-            delimiter = self.format_list_value(self.delimiter_list)
-            lines.append(f"BIBLIOGRAPHY_DELIMITER={delimiter}")
-
-            lines.append(f"ANNOT_TYPE={self.annot_type_combo.currentText()}")
-            lines.append(f"COLOR={self.color_combo.currentText()}")
-            lines.append(f"OFFSET={self.offset_combo.currentData()}")
-
-            article_breaks = self.format_list_value(self.article_breaks_list)
-            lines.append(f"ARTICLE_BREAKS={article_breaks}")
-
-            lines.append(f"SOFT_YEAR={self.soft_year_check.isChecked()}")
-            lines.append(f"DEEP_SEARCH={self.deep_search_check.isChecked()}")
-
-            search_exclude = self.format_list_value(self.search_exclude_list)
-            lines.append(f"SEARCH_EXCLUDE={search_exclude}")
-
-            lines.append(f"ALTERNATIVE_BIB={self.alternative_bib_check.isChecked()}")
-
-            # Write to file
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                f.write("\n".join(lines))
-
-            QMessageBox.information(self, "Success", f"Config saved to: {self.config_path}")
+            if self.config_store.save(self.config_path):
+                QMessageBox.information(self, "Success", f"Config saved to: {self.config_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error saving config: {e}")
 
     def clear_all_fields(self):
         """Clear all configuration fields."""
-        self.debug_check.setChecked(False)
-        self.special_case_list.clear()
-        self.delimiter_list.clear()
-        self.annot_type_combo.setCurrentIndex(0)
-        self.color_combo.setCurrentIndex(0)
-        self.offset_combo.setCurrentIndex(0)
-        self.article_breaks_list.clear()
-        self.soft_year_check.setChecked(False)
-        self.deep_search_check.setChecked(False)
-        self.search_exclude_list.clear()
-        self.alternative_bib_check.setChecked(False)
+        self.config_store.reset()
 
         self.parent.clear_text_handlers()
 
@@ -551,7 +479,7 @@ class DocConfig(QWidget):
     
     def article_list_to_cache(self, data):
         """Convert one-based string list to zero-based article cache."""
-        cache = []
+        cache = ArticleRanges()
         for i in range(data.count()):
             tokens = data.item(i).text().split(":")
             # transform from 1 index to 0 index  count
@@ -563,49 +491,88 @@ class DocConfig(QWidget):
         return cache
 
     def set_data_from_view(self, config_data=None):
-        """Update configuration from viewer data."""
+        """Update configuration from viewer data (only changed fields are applied)."""
         if config_data:
             if "article_cache" in config_data:
-                self.article_cache = config_data["article_cache"]
-                article_list = self.article_cache_to_list(self.article_cache)
-                self.article_breaks_list.clear()
-                self.article_breaks_list.addItems(article_list)
-
+                self.config_store.update("ARTICLE_BREAKS",
+                                         self.article_cache_to_list(config_data["article_cache"]))
 
             if "special_cases" in config_data:
-                self.special_cases = config_data["special_cases"]
-                self.special_case_list.clear()
-                for item in self.special_cases:
-                    self.special_case_list.addItem(item)
+                self.config_store.update("SPECIAL_CASE", config_data["special_cases"])
 
             if "delimiters" in config_data:
-                self.delimiters = config_data["delimiters"]
-                self.delimiter_list.clear()
-                for item in self.delimiters:
-                    self.delimiter_list.addItem(item)
+                self.config_store.update("BIBLIOGRAPHY_DELIMITER", config_data["delimiters"])
                      
         self.update()
 
     def list_widget_update(self, field_name, widget=None):
-        """Update TextHandler when list widgets change."""
-        if field_name == "SPECIAL_CASE" or field_name == "ALL":
-            self.special_cases.clear()
-            for i in range(self.special_case_list.count()):
-                self.special_cases.append(self.special_case_list.item(i).text())
-            self.parent.text_handler.special_cases = self.special_cases
-
-        if field_name == "BIBLIOGRAPHY_DELIMITER" or field_name == "ALL":
-            self.delimiters.clear()
-            for i in range(self.delimiter_list.count()):
-                self.delimiters.append(self.delimiter_list.item(i).text())
-            self.parent.text_handler.delimiters = self.delimiters
-
-        if field_name == "ARTICLE_BREAKS" or field_name == "ALL":
-            new_cache = self.article_list_to_cache(self.article_breaks_list)
+        """Store the items of an edited list widget ("ALL" pushes every list to the handlers)."""
+        if field_name == "ALL":
+            self.apply_to_handlers(self.config_store.model.values)
+            return
+        list_widget = self.list_widgets[field_name]
+        self.config_store.update(field_name,
+                                 [list_widget.item(i).text() for i in range(list_widget.count())])
+
+    @Slot()
+    def on_config_changed(self, diff):
+        """Apply changed config fields to the widgets and the text handler."""
+        for key, value in diff.items():
+            if key in self.list_widgets:
+                list_widget = self.list_widgets[key]
+                if [list_widget.item(i).text() for i in range(list_widget.count())] != list(value):
+                    list_widget.clear()
+                    list_widget.addItems(list(value))
+            elif key in self.check_boxes:
+                self.check_boxes[key].setChecked(value)
+            elif key == "ANNOT_TYPE":
+                idx = self.annot_type_combo.findText(value)
+                if idx >= 0:
+                    self.annot_type_combo.setCurrentIndex(idx)
+            elif key == "COLOR":
+                idx = self.color_combo.findText(value)
+                if idx >= 0:
+                    self.color_combo.setCurrentIndex(idx)
+            elif key == "OFFSET":
+                idx = self.offset_combo.findData(value)
+                if idx >= 0:
+                    self.offset_combo.setCurrentIndex(idx)
+        self.apply_to_handlers(diff)
+
+    def apply_to_handlers(self, diff):
+        """Update the lists shared with the text handler in place for the fields in diff."""
+        text_handler = getattr(self.parent, "text_handler", None)
+        if "SPECIAL_CASE" in diff:
+            self.special_cases[:] = diff["SPECIAL_CASE"]
+            if text_handler:
+                text_handler.special_cases = self.special_cases
+        if "BIBLIOGRAPHY_DELIMITER" in diff:
+            self.delimiters[:] = diff["BIBLIOGRAPHY_DELIMITER"]
+            if text_handler:
+                text_handler.delimiters = self.delimiters
+        if "ARTICLE_BREAKS" in diff:
+            new_cache = self.config_store.model.articles()
             self.article_cache.clear()
             self.article_cache.extend(new_cache)
-            self.parent.text_handler.article_cache.clear()
-            self.parent.text_handler.article_cache.extend(new_cache)
+            if text_handler:
+                text_handler.article_cache.clear()
+                text_handler.article_cache.extend(new_cache)
+        if "DEBUG" in diff:
+            self.debug = diff["DEBUG"]
+        if "ANNOT_TYPE" in diff:
+            self.annot_type = diff["ANNOT_TYPE"]
+        if "COLOR" in diff:
+            self.color = diff["COLOR"]
+        if "OFFSET" in diff:
+            self.offset = diff["OFFSET"]
+        if "SOFT_YEAR" in diff:
+            self.soft_year_search = diff["SOFT_YEAR"]
+        if "DEEP_SEARCH" in diff:
+            self.deep_search = diff["DEEP_SEARCH"]
+        if "SEARCH_EXCLUDE" in diff:
+            self.search_exclude = list(diff["SEARCH_EXCLUDE"])
+        if "ALTERNATIVE_BIB" in diff:
+            self.alternative_bib = diff["ALTERNATIVE_BIB"]
                     
 
 
@@ -0,0 +1,103 @@
+"""
+Destination suggestions for a manually created link.
+Lists the bibliography entries matching the selected citation; Enter links the chosen one.
+"""
+from    PySide6.QtCore                  import  Qt, Signal, Slot
+from    PySide6.QtWidgets               import  (QWidget,
+                                                 QVBoxLayout,
+                                                 QLabel,
+                                                 QListWidget,
+                                                 QListWidgetItem)
+
+
+class LinkSuggestions(QWidget):
+    """
+    Ranked bibliography entries for the citation just selected with "add link".
+
+    Parent: PdfViewer
+    Children: QLabel, QListWidget
+
+    The best entry is preselected; moving the selection emits
+    suggestion_selected (preview in the bibliography viewer) and Enter in
+    the list or the viewer emits suggestion_chosen with the entry dict.
+    """
+    suggestion_selected = Signal(int, tuple)
+    suggestion_chosen = Signal(dict)
+
+    def __init__(self, parent=None):
+        """Initialize hidden, empty suggestion list."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.layout = QVBoxLayout()
+        self.status_label = QLabel("")
+        self.suggestion_list = QListWidget()
+
+        ### options
+        self.setLayout(self.layout)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.suggestion_list.setMaximumHeight(110)
+        self.hide()
+
+        ### signals
+        self.suggestion_list.currentItemChanged.connect(self.on_current_changed)
+        self.suggestion_list.itemActivated.connect(self.on_item_activated)
+
+        ### element appending
+        self.layout.addWidget(self.status_label)
+        self.layout.addWidget(self.suggestion_list)
+
+    ### methods
+    def show_suggestions(self, citation_text, suggestions, ready=True):
+        """List suggestions for citation_text (best first) and preselect the best one."""
+        self.suggestion_list.clear()
+        for entry in suggestions:
+            item = QListWidgetItem(f"p. {entry['page'] + 1}: {entry['text']}")
+            item.setData(Qt.UserRole, entry)
+            self.suggestion_list.addItem(item)
+        if suggestions:
+            self.status_label.setText(f"destinations for \"{citation_text.strip()}\" "
+                                      f"(Enter links the selected entry, Esc dismisses)")
+            self.suggestion_list.setCurrentRow(0)
+            self.suggestion_list.show()
+        else:
+            pending = "" if ready else " (bibliography index still building)"
+            self.status_label.setText(f"no bibliography entry found for \"{citation_text.strip()}\"{pending}; "
+                                      f"select the destination by hand")
+            self.suggestion_list.hide()
+        self.show()
+
+    def has_suggestions(self):
+        """True while suggestions are shown."""
+        return self.isVisible() and self.suggestion_list.count() > 0
+
+    def current_entry(self):
+        """Entry dict of the selected row, or None."""
+        item = self.suggestion_list.currentItem()
+        return item.data(Qt.UserRole) if item else None
+
+    def commit(self):
+        """Emit the selected entry and close the list."""
+        entry = self.current_entry()
+        self.dismiss()
+        if entry is not None:
+            self.suggestion_chosen.emit(entry)
+
+    def dismiss(self):
+        """Hide and clear the suggestions."""
+        self.suggestion_list.clear()
+        self.hide()
+
+    @Slot()
+    def on_current_changed(self, current, previous):
+        """Preview the newly selected entry."""
+        if current is not None:
+            entry = current.data(Qt.UserRole)
+            self.suggestion_selected.emit(entry["page"], tuple(entry["rect"]))
+
+    @Slot()
+    def on_item_activated(self, item):
+        """Enter/double click on a row links it."""
+        self.suggestion_list.setCurrentItem(item)
+        self.commit()
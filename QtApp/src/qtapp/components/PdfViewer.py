@@ -2,7 +2,7 @@
 Main PDF viewer component integrating navigation, zoom, and extended view.
 Manages document loading and multi-article tracking.
 """
-from    PySide6.QtCore                  import  Qt, QFile, Slot, Signal
+from    PySide6.QtCore                  import  Qt, QFile, QPointF, QRectF, Slot, Signal
 from    PySide6.QtWidgets               import  (QWidget,
                                                 QPushButton,
                                                 QHBoxLayout,
@@ -16,6 +16,12 @@ from    qtapp.viewerUtils.Navigator     import PdfNavigator
 from    qtapp.viewerUtils.ZoomSelector  import ZoomSelector
 from    qtapp.viewerUtils.TextSelector  import TextSelector
 from    qtapp.viewerUtils.ExtendedView  import ExtendedView
+from    qtapp.components.SearchPanel    import SearchPanel
+from    qtapp.components.LinkSuggestions import LinkSuggestions
+from    qtapp.utils.BibIndex            import BibIndex
+
+# config fields the bibliography index is built from
+BIB_CONFIG_KEYS = {"BIBLIOGRAPHY_DELIMITER", "ARTICLE_BREAKS", "ALTERNATIVE_BIB", "SOFT_YEAR"}
 
 
 class PdfViewer(QWidget):
@@ -23,7 +29,8 @@ class PdfViewer(QWidget):
     Complete PDF viewing widget with navigation and text handling.
     
     Parent: MainWindow
-    Children: PdfNavigator, ZoomSelector, TextSelector, ExtendedView
+    Children: PdfNavigator, ZoomSelector, TextSelector, ExtendedView, SearchPanel,
+              BibIndex, LinkSuggestions
     
     Integrates all PDF viewing components:
     - Document loading and display
@@ -32,9 +39,12 @@ class PdfViewer(QWidget):
     - Text selection and annotation
     - Multi-article document tracking
     - Alternative viewer synchronization
+    - Full-text search (not in alternative viewers, which show the same document)
     """
     article_changed = Signal(dict, bool)
     link_saved = Signal(dict)
+    destination_preview = Signal(int, tuple)
+    destination_set = Signal()
 
     def __init__(self, parent=None, textHandler=None, isAlt=False, isOutput=False):
         """Initialize PDF viewer with all components."""
@@ -66,7 +76,11 @@ class PdfViewer(QWidget):
                                  ) # most logic is here
         
         
-        self.document = QPdfDocument(self)
+        self.search_panel = None if isAlt else SearchPanel(self)
+        # destination suggestions in the viewer where citations are linked
+        self.bib_index = BibIndex(self) if isOutput and not isAlt else None
+        self.link_suggestions = LinkSuggestions(self) if self.bib_index else None
+        self.document = None # borrowed from the document registry on open
         self.config_article_cache = self.parent.document_config.article_cache
         self.current_article = None
         self.zoom_factor = 1.0
@@ -76,7 +90,6 @@ class PdfViewer(QWidget):
 
         ### options
         self.setWindowTitle("Viewer")
-        self.view.setDocument(self.document)
         self.view.setPageMode(QPdfView.SinglePage)
         self.view.hide()
         self.view.set_selection_enabled(False)
@@ -86,6 +99,13 @@ class PdfViewer(QWidget):
         ### signals
         self.zoom_selector.zoom_mode_changed.connect(self.change_zoom_mode)
         self.zoom_selector.zoom_factor_changed.connect(self.change_zoom_factor)
+        if self.search_panel:
+            self.search_panel.result_selected.connect(self.on_search_result)
+        if self.bib_index:
+            self.link_suggestions.suggestion_selected.connect(self.destination_preview)
+            self.link_suggestions.suggestion_chosen.connect(self.on_suggestion_chosen)
+            self.destination_set.connect(self.link_suggestions.dismiss)
+            self.parent.document_config.config_store.config_changed.connect(self.on_config_changed)
 
         ### element appending
         self.horizontal_bar.addWidget(self.navigator)
@@ -93,6 +113,11 @@ class PdfViewer(QWidget):
 
 
         self.layout.addLayout(self.horizontal_bar)
+        if self.search_panel:
+            self.search_panel.hide()
+            self.layout.addWidget(self.search_panel)
+        if self.link_suggestions:
+            self.layout.addWidget(self.link_suggestions)
         # self.layout.addWidget(self.navigator)
         self.layout.addWidget(self.view)
 
@@ -101,14 +126,26 @@ class PdfViewer(QWidget):
         if file_path:
             self.file_path = file_path
             self.text_handler.assign_document(file_path)
-            self.document.load(self.file_path)
+            registry = self.parent.document_registry
+            document = registry.acquire_qt(self.file_path)
+            if self.document:
+                registry.release(self.document)
+            self.document = document
+            self.view.setDocument(self.document)
             self.navigator.set_total_pages(self.document.pageCount())
             self.navigator.set_view(self.view)
             self.navigator.show()
             self.zoom_selector.show()
             self.zoom_selector.reset()
             self.view.set_selection_enabled(True)
+            self.view.clear_search_hit()
             self.view.show()
+            if self.search_panel:
+                self.search_panel.set_document(self.file_path, self.document.pageCount())
+                self.search_panel.show()
+            if self.bib_index:
+                self.link_suggestions.dismiss()
+                self.bib_index.set_document(self.file_path, self.parent.document_config.config_store.model)
             self.config_article_cache = self.parent.document_config.article_cache
             #signal
             self.navigator.nav.currentPageChanged.connect(self.on_page_change)
@@ -116,13 +153,12 @@ class PdfViewer(QWidget):
     @Slot()
     def on_page_change(self, page_idx):
         self.config_article_cache = self.parent.document_config.article_cache
-        for article in self.config_article_cache:
-            if article["first"] <= page_idx <= article["last"]:
-                if self.current_article != article:
-                    self.current_article = article
-                    self.article_changed.emit(article, self.is_alt)
-        else:
+        article = self.config_article_cache.find(page_idx)
+        if article is None:
             self.current_article = None
+        elif self.current_article != article:
+            self.current_article = article
+            self.article_changed.emit(article, self.is_alt)
 
         # page = self.document.getAllText(page_idx)
         # print(f" page: {page_idx}, has rect: {page.boundingRectangle()}")
@@ -136,6 +172,39 @@ class PdfViewer(QWidget):
         self.navigator.jump_to(last_page)
 
 
+    @Slot()
+    def on_search_result(self, page_idx, rect):
+        """Jump to a search hit and highlight it."""
+        self.view.set_search_hit(page_idx, rect)
+        self.navigator.jump_to(page_idx, QPointF(0, max(0.0, rect[1] - 40.0)))
+
+    @Slot()
+    def on_config_changed(self, diff):
+        """Rebuild the bibliography index when the fields it depends on change."""
+        if self.bib_index.path and BIB_CONFIG_KEYS.intersection(diff):
+            self.bib_index.set_document(self.bib_index.path, self.parent.document_config.config_store.model)
+
+    def suggest_destinations(self, citation_text, page_idx):
+        """Show the bibliography entries matching a citation selected on page_idx."""
+        suggestions = self.bib_index.suggest(citation_text, page_idx)
+        self.link_suggestions.show_suggestions(citation_text, suggestions, self.bib_index.ready)
+
+    @Slot()
+    def on_suggestion_chosen(self, entry):
+        """Link the pending citation to a suggested bibliography entry."""
+        if not self.text_handler.has_pending_link():
+            # the destination was already set by hand
+            return
+        x0, y0, x1, y1 = entry["rect"]
+        self.text_handler.link_destination(QRectF(x0, y0, x1 - x0, y1 - y0),
+                                           entry["page"],
+                                           self.view.effectiveZoomFactor())
+        print(f"linked {entry['citation']} to p. {entry['page'] + 1}: {entry['text'][:60]}")
+        self.view.prev_selection = None
+        self.view.viewport().update()
+        # repaints the bibliography viewer with the new link
+        self.destination_preview.emit(entry["page"], tuple(entry["rect"]))
+
     @Slot()
     def change_zoom_mode(self, mode):
         self.view.setZoomMode(mode)
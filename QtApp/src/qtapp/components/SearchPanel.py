@@ -0,0 +1,146 @@
+"""
+Search panel for the PDF viewers.
+Queries the background TextIndex of the open document and jumps to the selected hit.
+"""
+import  time
+from    PySide6.QtCore                  import  Qt, QTimer, Signal, Slot
+from    PySide6.QtWidgets               import  (QWidget,
+                                                 QHBoxLayout,
+                                                 QVBoxLayout,
+                                                 QLabel,
+                                                 QLineEdit,
+                                                 QListWidget,
+                                                 QListWidgetItem,
+                                                 QProgressBar)
+
+from    qtapp.utils.TextIndex           import  TextIndex
+
+
+SEARCH_DELAY_MS = 120
+
+
+class SearchPanel(QWidget):
+    """
+    Search field, indexing progress and result list of one viewer.
+
+    Parent: PdfViewer
+    Children: TextIndex, QLineEdit, QProgressBar, QListWidget
+
+    Typing runs the query against the index after a short pause; results
+    found while indexing is still running are refreshed when it finishes.
+    Activating a result emits result_selected(page, rect) with the hit's
+    rectangle in PDF points.
+    """
+    result_selected = Signal(int, tuple)
+
+    def __init__(self, parent=None):
+        """Initialize empty panel; indexing starts with set_document()."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.text_index = TextIndex(self)
+        self.layout = QVBoxLayout()
+        self.search_bar = QHBoxLayout()
+        self.query_edit = QLineEdit()
+        self.progress_bar = QProgressBar()
+        self.status_label = QLabel("")
+        self.results_list = QListWidget()
+        self.search_timer = QTimer(self)
+
+        ### options
+        self.setLayout(self.layout)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.query_edit.setPlaceholderText("search document")
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.setMaximumWidth(300)
+        self.progress_bar.setMaximumWidth(160)
+        self.progress_bar.setFormat("indexing %v/%m")
+        self.progress_bar.hide()
+        self.results_list.setMaximumHeight(150)
+        self.results_list.hide()
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+
+        ### signals
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.query_edit.returnPressed.connect(self.on_return_pressed)
+        self.search_timer.timeout.connect(self.run_search)
+        self.results_list.itemActivated.connect(self.on_item_activated)
+        self.results_list.itemClicked.connect(self.on_item_activated)
+        self.text_index.progress.connect(self.on_index_progress)
+        self.text_index.finished.connect(self.on_index_finished)
+
+        ### element appending
+        self.search_bar.addWidget(self.query_edit)
+        self.search_bar.addWidget(self.progress_bar)
+        self.search_bar.addWidget(self.status_label)
+        self.search_bar.addStretch()
+        self.layout.addLayout(self.search_bar)
+        self.layout.addWidget(self.results_list)
+
+    ### methods
+    def set_document(self, path, page_count):
+        """Start indexing a newly opened document."""
+        self.results_list.clear()
+        self.results_list.hide()
+        self.status_label.setText("")
+        self.text_index.set_document(path, page_count)
+
+    @Slot()
+    def on_index_progress(self, done, total):
+        """Show indexing progress."""
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+        self.progress_bar.setVisible(done < total)
+
+    @Slot()
+    def on_index_finished(self):
+        """Re-run a query typed while indexing so it covers every page."""
+        self.progress_bar.hide()
+        if self.query_edit.text().strip():
+            self.run_search()
+
+    @Slot()
+    def run_search(self):
+        """Query the index and list the hits."""
+        query = self.query_edit.text()
+        self.results_list.clear()
+        if not query.strip():
+            self.results_list.hide()
+            self.status_label.setText("")
+            return
+
+        start = time.perf_counter()
+        results = self.text_index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        for result in results:
+            item = QListWidgetItem(f"p. {result['page'] + 1}: {result['context']}")
+            item.setData(Qt.UserRole, (result["page"], result["rect"]))
+            self.results_list.addItem(item)
+        partial = "" if self.text_index.is_ready() else " (indexing)"
+        self.status_label.setText(f"{len(results)} hits{partial} in {elapsed_ms:.1f} ms")
+        self.results_list.setVisible(bool(results))
+
+    @Slot()
+    def on_return_pressed(self):
+        """Search immediately and jump to the next hit on repeated Enter."""
+        if self.search_timer.isActive() or self.results_list.count() == 0:
+            self.search_timer.stop()
+            self.run_search()
+            row = 0
+        else:
+            row = (self.results_list.currentRow() + 1) % self.results_list.count()
+        if self.results_list.count():
+            self.results_list.setCurrentRow(row)
+            self.on_item_activated(self.results_list.item(row))
+
+    @Slot()
+    def on_item_activated(self, item):
+        """Emit the page and rect of the chosen hit."""
+        page, rect = item.data(Qt.UserRole)
+        self.result_selected.emit(page, tuple(rect))
+
+    def cancel(self):
+        """Stop background indexing (viewer closing)."""
+        self.text_index.cancel()
@@ -0,0 +1,120 @@
+"""
+Interval index of article page ranges.
+Replaces the plain list of {"first", "last"} dicts used for multi-article documents.
+"""
+from    bisect                          import  bisect_right
+
+
+class ArticleRanges:
+    """
+    List-like container of {"first": int, "last": int} article dicts with a sorted lookup index.
+
+    Parent: None
+    Children: None
+
+    Behaves like the list it replaces (iteration, len, append, extend,
+    remove, clear, indexing) and keeps its insertion order, so
+    DocConfig.article_cache_to_list and article_list_to_cache round-trip
+    ARTICLE_BREAKS unchanged. Lookups go through a separate copy sorted
+    by first page:
+    - find(page): article containing page in O(log n)
+    - overlapping(first, last): articles intersecting a page range
+    - boundary_count(page): how many article starts/ends fall on page, O(1)
+    Articles with equal first pages keep their insertion order.
+    """
+    def __init__(self, articles=()):
+        """Initialize from an iterable of article dicts."""
+        self.articles = []      # insertion order
+        self.sorted = []        # articles sorted by first page (stable)
+        self.firsts = []
+        self.max_lasts = []     # max_lasts[i] = max(last) of sorted[0..i]
+        self.boundaries = {}    # page -> number of article firsts/lasts on it
+        self.extend(articles)
+
+    def __iter__(self):
+        return iter(self.articles)
+
+    def __len__(self):
+        return len(self.articles)
+
+    def __getitem__(self, idx):
+        return self.articles[idx]
+
+    def __contains__(self, article):
+        return article in self.articles
+
+    def __eq__(self, other):
+        if isinstance(other, ArticleRanges):
+            return self.articles == other.articles
+        return self.articles == other
+
+    def __repr__(self):
+        return f"ArticleRanges({self.articles!r})"
+
+    ### mutation
+    def append(self, article):
+        """Add article at the end."""
+        self.articles.append(article)
+        self.rebuild()
+
+    def extend(self, articles):
+        """Add several articles at the end."""
+        self.articles.extend(articles)
+        self.rebuild()
+
+    def remove(self, article):
+        """Remove the first article equal to article (ValueError if missing)."""
+        self.articles.remove(article)
+        self.rebuild()
+
+    def clear(self):
+        """Remove all articles."""
+        self.articles.clear()
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute the sorted lookup index after a mutation (articles change rarely)."""
+        self.sorted = sorted(self.articles, key=lambda article: article["first"])
+        self.firsts = [article["first"] for article in self.sorted]
+        self.max_lasts = []
+        self.boundaries = {}
+        max_last = None
+        for article in self.sorted:
+            max_last = article["last"] if max_last is None else max(max_last, article["last"])
+            self.max_lasts.append(max_last)
+            for page in (article["first"], article["last"]):
+                self.boundaries[page] = self.boundaries.get(page, 0) + 1
+
+    ### queries
+    def find(self, page):
+        """Return the article containing page (latest starting one if several), or None."""
+        idx = bisect_right(self.firsts, page) - 1
+        while idx >= 0 and self.max_lasts[idx] >= page:
+            if self.sorted[idx]["last"] >= page:
+                return self.sorted[idx]
+            idx -= 1
+        return None
+
+    def overlapping(self, first, last):
+        """Return all articles sharing at least one page with first..last."""
+        idx = bisect_right(self.firsts, last) - 1
+        found = []
+        while idx >= 0 and self.max_lasts[idx] >= first:
+            if self.sorted[idx]["last"] >= first:
+                found.append(self.sorted[idx])
+            idx -= 1
+        found.reverse()
+        return found
+
+    def find_boundary(self, page):
+        """Return the article that starts or ends on page, or None."""
+        if page not in self.boundaries:
+            return None
+        for article in self.overlapping(page, page):
+            if page in (article["first"], article["last"]):
+                return article
+        return None
+
+    def boundary_count(self, page):
+        """Number of article starts/ends on page (0 if none)."""
+        return self.boundaries.get(page, 0)
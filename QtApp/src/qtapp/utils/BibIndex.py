@@ -0,0 +1,315 @@
+"""
+Background index of bibliography entries for manual link destinations.
+Finds each article's bibliography by BIBLIOGRAPHY_DELIMITER and maps surname + year to the entry's page and rect.
+"""
+import  re
+import  time
+import  threading
+import  pymupdf
+from    PySide6.QtCore                  import  QObject, QRunnable, QThreadPool, Signal, Slot
+
+from    qtapp.utils.TextIndex           import  normalize_word
+
+
+MAX_SUGGESTIONS = 5
+# "Surname, Name, 1969: Title" / "Surname, Name (ur.), 1969. Title"; no colon before
+# the year, so continuation lines like "Berlin: Suhrkamp, 1969." do not start entries
+ENTRY_RE = re.compile(r"^(?P<surname>[^\W\d_][\w'’ -]{0,50}?),[^:]{0,100}?\b(?P<year>\d{4}[a-z]?)\b")
+# "Surname, Name: Title," with the year on a wrapped line
+AUTHOR_RE = re.compile(r"^(?P<surname>[^\W\d_][\w'’ -]{0,50}?),")
+# "– 1970: Title" (same author as the entry above)
+SAME_AUTHOR_RE = re.compile(r"^[–—-]+[,.]?\s*(?P<year>\d{4}[a-z]?)\b")
+# "1964. Title" (ALTERNATIVE_BIB)
+ALT_ENTRY_RE = re.compile(r"^(?P<year>\d{4}[a-z]?)\.\s")
+# "Adorno 1969", "Deckard et al. 2015", "Zima (2015", "Casanova [2004]"
+CITATION_RE = re.compile(r"(?P<surname>[^\W\d_][\w'’-]*)(?:\s+et\s+al\.)?,?\s*[(\[]?(?P<year>\d{4}[a-z]?)\b")
+YEAR_RE = re.compile(r"\b(?P<year>\d{4}[a-z]?)\b")
+# hanging indent of wrapped entry lines, in points; more is another column
+INDENT_RANGE = (2.0, 40.0)
+# line endings that break an entry off mid-sentence
+OPEN_ENDINGS = (",", ";", ":", "(", "-", "–", "—")
+
+
+def surname_key(surname):
+    """Lookup form of a surname: last word of it, casefolded, without punctuation."""
+    parts = surname.split()
+    return normalize_word(parts[-1]) if parts else ""
+
+
+def year_number(year):
+    """Numeric part of a year like "2019b"."""
+    return int(year[:4])
+
+
+def find_bibliography_start(doc, article, delimiters):
+    """
+    Locate the bibliography heading of an article.
+
+    Returns:
+        tuple: (page, y) of the last line matching a delimiter, or None
+    """
+    delimiters = [delimiter.strip().casefold() for delimiter in delimiters if delimiter.strip()]
+    if not delimiters:
+        return None
+    for page_idx in range(article["last"], article["first"] - 1, -1):
+        found = None
+        for block in doc[page_idx].get_text("dict")["blocks"]:
+            for line in block.get("lines", ()):
+                text = "".join(span["text"] for span in line["spans"]).strip().casefold()
+                if any(text.startswith(delimiter) for delimiter in delimiters):
+                    found = (page_idx, line["bbox"][3])
+        if found:
+            return found
+    return None
+
+
+def wraps_entry(current, x0, y0, previous):
+    """
+    True if a line directly below the current entry continues it: it is
+    indented past the entry's first line, or the line before it breaks
+    off mid-sentence ("Ästhetische Theorie," / "Frankfurt am Main, 1969.").
+    """
+    rect = current["rect"]
+    if y0 - rect[3] > rect[3] - rect[1]:
+        return False
+    return INDENT_RANGE[0] < x0 - rect[0] < INDENT_RANGE[1] or previous.endswith(OPEN_ENDINGS)
+
+
+def parse_entries(doc, article, start, alternative=False):
+    """
+    Split an article's bibliography into entries.
+
+    Every line starting with "Surname, ..., Year", a dash plus year (same
+    author as before) or, with alternative, "Year." starts a new entry,
+    unless it wraps the entry above (see wraps_entry); other lines continue
+    the current one. A line starting with "Surname," but no year starts an
+    entry that takes its year from its wrapped lines.
+
+    Returns:
+        list: {"surname", "key", "year", "page", "rect", "text"} dicts
+    """
+    entries = []
+    current = None
+    surname = ""
+    previous = ""
+    first_page, start_y = start
+    for page_idx in range(first_page, article["last"] + 1):
+        for block in doc[page_idx].get_text("dict")["blocks"]:
+            for line in block.get("lines", ()):
+                x0, y0, x1, y1 = line["bbox"]
+                if page_idx == first_page and y0 < start_y:
+                    continue
+                text = "".join(span["text"] for span in line["spans"]).strip()
+                if not text:
+                    continue
+                wrapped = (current is not None and current["page"] == page_idx
+                           and wraps_entry(current, x0, y0, previous))
+                year = None
+                match = None if wrapped else ENTRY_RE.match(text) or AUTHOR_RE.match(text)
+                if match:
+                    surname, year = match.group("surname"), match.groupdict().get("year")
+                elif not wrapped:
+                    match = SAME_AUTHOR_RE.match(text) or (alternative and ALT_ENTRY_RE.match(text))
+                    if match and surname:
+                        year = match.group("year")
+                    else:
+                        match = None
+                if match:
+                    current = {"surname": surname, "key": surname_key(surname), "year": year,
+                               "page": page_idx, "rect": (x0, y0, x1, y1), "text": text}
+                    entries.append(current)
+                elif current and current["page"] == page_idx:
+                    rect = current["rect"]
+                    current["rect"] = (min(rect[0], x0), rect[1], max(rect[2], x1), max(rect[3], y1))
+                    if len(current["text"]) < 160:
+                        current["text"] += " " + text
+                    if current["year"] is None:
+                        match = YEAR_RE.search(text)
+                        current["year"] = match.group("year") if match else None
+                previous = text
+    return [entry for entry in entries if entry["year"]]
+
+
+def parse_citations(text):
+    """
+    (surname, year) pairs in cited text; a bare year reuses the surname
+    before it ("Adorno 1969, 1970; 1971" cites Adorno three times).
+    """
+    pairs = []
+    surname = ""
+    for part in re.split(r"[;\n]", text):
+        cited = {match.start("year"): match.group("surname") for match in CITATION_RE.finditer(part)}
+        for match in YEAR_RE.finditer(part):
+            surname = cited.get(match.start("year"), surname)
+            if surname:
+                pairs.append((surname, match.group("year")))
+    return pairs
+
+
+class BibIndexWorkerSignals(QObject):
+    """
+    Signals emitted by BibIndexWorker.
+
+    Parent: None
+    Children: None
+    """
+    done = Signal(int, object)
+
+
+class BibIndexWorker(QRunnable):
+    """
+    QThreadPool job parsing the bibliographies of all articles.
+
+    Parent: BibIndex
+    Children: BibIndexWorkerSignals
+
+    Opens its own PyMuPDF document and reads only the pages from each
+    bibliography heading to the end of its article.
+    """
+    def __init__(self, path, articles, delimiters, alternative, generation, cancel_event):
+        """Initialize worker for the given articles of path."""
+        super().__init__()
+        self.path = path
+        self.articles = articles
+        self.delimiters = delimiters
+        self.alternative = alternative
+        self.generation = generation
+        self.cancel_event = cancel_event
+        self.signals = BibIndexWorkerSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        """Parse every article's bibliography."""
+        entries = []
+        missing = 0
+        try:
+            with pymupdf.open(self.path) as doc:
+                articles = self.articles or [{"first": 0, "last": doc.page_count - 1}]
+                for article_idx, article in enumerate(articles):
+                    if self.cancel_event.is_set():
+                        return
+                    start = find_bibliography_start(doc, article, self.delimiters)
+                    if start is None:
+                        missing += 1
+                        continue
+                    for entry in parse_entries(doc, article, start, self.alternative):
+                        entry["article"] = article_idx
+                        entries.append(entry)
+        except Exception as e:
+            print(f"Error indexing bibliography of {self.path}: {e}")
+        self.signals.done.emit(self.generation, {"entries": entries, "missing": missing})
+
+
+class BibIndex(QObject):
+    """
+    Surname + year index of the bibliography entries of one document.
+
+    Parent: PdfViewer
+    Children: BibIndexWorker
+
+    set_document() parses the bibliographies in the background (articles
+    from ARTICLE_BREAKS, headings from BIBLIOGRAPHY_DELIMITER); a newer
+    call drops the results of an older one. suggest() ranks the entries
+    matching the citations in a selected text: same article first, exact
+    year before neighbouring years (SOFT_YEAR) before surname-only matches.
+    """
+    finished = Signal(int)
+
+    def __init__(self, parent=None):
+        """Initialize an empty index."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.path = ""
+        self.articles = []
+        self.entries = []
+        self.by_key = {}            # surname key -> entries
+        self.soft_year = False
+        self.ready = False
+        self.generation = 0
+        self.cancel_event = threading.Event()
+        self.workers = []
+        self.start_time = 0.0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    ### methods
+    def set_document(self, path, config):
+        """
+        (Re)build the index of path.
+
+        Args:
+            config: ConfigModel providing ARTICLE_BREAKS, BIBLIOGRAPHY_DELIMITER,
+                    ALTERNATIVE_BIB and SOFT_YEAR
+        """
+        self.cancel()
+        self.generation += 1
+        self.cancel_event = threading.Event()
+        self.path = path
+        self.articles = config.articles()
+        self.soft_year = config["SOFT_YEAR"]
+        self.entries = []
+        self.by_key = {}
+        self.ready = False
+        self.start_time = time.perf_counter()
+
+        worker = BibIndexWorker(path, self.articles, list(config["BIBLIOGRAPHY_DELIMITER"]),
+                                config["ALTERNATIVE_BIB"], self.generation, self.cancel_event)
+        worker.signals.done.connect(self.on_done)
+        self.workers.append(worker)
+        self.pool.start(worker)
+
+    def cancel(self):
+        """Stop an outstanding worker; its result is ignored."""
+        self.cancel_event.set()
+        self.pool.clear()
+        self.workers = []
+
+    @Slot()
+    def on_done(self, generation, result):
+        """Store the parsed entries of the current generation."""
+        if generation != self.generation:
+            return
+        self.workers = []
+        self.entries = result["entries"]
+        self.by_key = {}
+        for entry in self.entries:
+            self.by_key.setdefault(entry["key"], []).append(entry)
+        self.ready = True
+        print(f"indexed {len(self.entries)} bibliography entries "
+              f"({result['missing']} articles without bibliography) "
+              f"in {time.perf_counter() - self.start_time:.2f}s")
+        self.finished.emit(len(self.entries))
+
+    def article_of(self, page_idx):
+        """Index of the article containing page_idx, or None."""
+        for idx, article in enumerate(self.articles):
+            if article["first"] <= page_idx <= article["last"]:
+                return idx
+        return None if self.articles else 0
+
+    def suggest(self, text, page_idx, max_results=MAX_SUGGESTIONS):
+        """
+        Rank bibliography entries for the citations in text (selected on page_idx).
+
+        Returns:
+            list: entry dicts plus "score" and "citation", best first
+        """
+        article = self.article_of(page_idx)
+        scored = {}
+        for surname, year in parse_citations(text):
+            key = surname_key(surname)
+            for entry in self.by_key.get(key, ()):
+                if entry["year"] == year:
+                    score = 3
+                elif self.soft_year and abs(year_number(entry["year"]) - year_number(year)) <= 1:
+                    score = 2
+                else:
+                    score = 1
+                if entry["article"] == article:
+                    score += 10
+                entry_id = id(entry)
+                if entry_id not in scored or scored[entry_id]["score"] < score:
+                    scored[entry_id] = dict(entry, score=score, citation=f"{surname} {year}")
+        return sorted(scored.values(), key=lambda entry: (-entry["score"], entry["page"], entry["rect"][1]))[:max_results]
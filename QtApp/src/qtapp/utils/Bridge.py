@@ -7,19 +7,17 @@ import  os
 import  sys
 import  subprocess
 import  pymupdf
-import  shutil
 import  time
 from    pathlib                         import  Path
-from    PySide6.QtCore                  import  QObject, Signal, Slot
+from    PySide6.QtCore                  import  QObject, QThreadPool, Signal, Slot
 
-from    citation_linker.configPaths     import  (ensure_defaults, 
-                                                  resolve_config_path,
-                                                  resolve_dir_paths,
-                                                  active_config_file,
-                                                  active_dir)
-from    citation_linker.multiArticle    import  main as multi_article_main
-from    citation_linker.multiFile       import  main as multi_file_main
-from    citation_linker.citationLinker  import  main as citation_linker_main
+from    qtapp.utils.LinkingWorker       import  LinkingWorker, ArticleLinkingWorker
+from    qtapp.utils.linkerRunner        import  DEFAULT_LINKER
+from    qtapp.utils.articleLinker       import  ARTICLE_MODE, read_article_breaks, read_offset, parse_offset, apply_offset
+from    qtapp.utils.ArticleRanges       import  ArticleRanges
+from    qtapp.utils.linkTelemetry       import  LinkTelemetry, telemetry_path, append_jsonl
+from    qtapp.utils.DocSaver            import  DocSaver
+from    qtapp.utils.fileUtils           import  handoff_file
 
 class Bridge(QObject):
     """
@@ -30,12 +28,18 @@ class Bridge(QObject):
     
     Handles:
     - Configuration path management via citation-config
-    - Subprocess execution of citation linking tools
+    - Background execution of citation linking tools (LinkingWorker)
+    - Linking telemetry: phase/article events via linking_event and
+      <output>_telemetry.jsonl (one line per event, appended across runs)
     - Input/output directory management
     - Document saving and file operations
     """
     config_path_changed = Signal(str)
     linking_finished = Signal(bool, str)
+    linking_progress = Signal(int, str)
+    linking_cancelled = Signal()
+    article_report = Signal(dict)
+    linking_event = Signal(dict)
 
     def __init__(self, parent=None):
         """Initialize bridge with parent app reference."""
@@ -51,8 +55,17 @@ class Bridge(QObject):
         self.output_dir= ""
         self.input_file_path = ""
         self.output_file_path = ""
+        self.pending_output_path = ""
+        self.output_backup_path = ""
+        self.worker = None
+        self.telemetry = None
+        self.telemetry_path = ""
+        self.run_totals = {}
+        self.thread_pool = QThreadPool.globalInstance()
+        self.doc_saver = DocSaver(self)
         self.user_shell = self.get_user_shell()
-        self.config_path = self.get_config_path()
+        # resolved by DocConfig through get_config_path(), not at construction
+        self.config_path = ""
 
 
     def get_user_shell(self):
@@ -76,6 +89,11 @@ class Bridge(QObject):
         self.get_input_file_path()
         
         try:
+            # imported on first use: citation_linker is not needed to show the window
+            from citation_linker.configPaths import (resolve_config_path,
+                                                     resolve_dir_paths,
+                                                     active_config_file,
+                                                     active_dir)
             # Get config path directly
             config_path = resolve_config_path()
             self.config_path = str(config_path)
@@ -135,6 +153,8 @@ class Bridge(QObject):
             config_path: Path to configuration file (optional)
         """
         try:
+            from citation_linker.configPaths import resolve_config_path, resolve_dir_paths
+
             # Update config path if provided
             if config_path:
                 new_config = resolve_config_path(config_path)
@@ -159,91 +179,241 @@ class Bridge(QObject):
             print(f"Error setting paths: {e}")
 
 
-    def start_linking_process(self, cmd_in=None):
+    def start_linking_process(self, cmd_in=None, parallel=False):
         """
-        Execute the citation linking process by calling main functions directly.
-        
-        The main functions now return exit codes instead of calling sys.exit(),
-        so they can be safely called from the Qt application without terminating it.
-        
+        Start the citation linking process on a background worker.
+
+        The linker runs in a child process supervised by a QThreadPool job,
+        so the GUI stays responsive and the run can be cancelled.
+
         Workflow:
         1. Save current configuration
         2. Copy input PDF to input directory
-        3. Execute citation linking function (multi_article by default)
-        4. Verify output file was created
-        5. Emit linking_finished signal with success status
+        3. Move any previous output aside so a cancel can restore it
+        4. Execute citation linking function (multi_article by default)
+        5. Verify output file was created (on_worker_finished)
+        6. Emit linking_finished signal with success status
         
         Args:
             cmd_in: Function to use: "citation-linker", "citation-multi-file", 
                    or "citation-multi-article". Defaults to citation-multi-article.
+            parallel: Split the volume by ARTICLE_BREAKS and link the articles
+                   in parallel processes (multi-article mode only); otherwise
+                   the linker runs once over the whole volume
                     
         Returns:
-            tuple: (success: bool, output_file_path: str)
+            bool: False if a linking run is already in progress
         """
-        self.parent.document_config.save_config()
+        if self.is_linking():
+            print("linking already in progress")
+            return False
+
+        self.linking_progress.emit(0, "preparing input")
         self.get_input_file_path()
         base, ext = os.path.splitext(os.path.basename(self.input_file_path))
-        self.delete_files_in_dir(self.input_dir)
-        shutil.copy(self.input_file_path, os.path.join(self.input_dir, base+ext))
         output_file_base = base + "_linked" + ext
-        output_file_path = os.path.join(self.output_dir, output_file_base)
+        self.pending_output_path = os.path.join(self.output_dir, output_file_base)
+        self.start_telemetry(cmd_in, parallel)
 
-        try:
-            # Call the appropriate main function directly
-            # They now return exit codes instead of calling sys.exit()
-            if cmd_in == "citation-linker":
-                return_code = citation_linker_main()
-            elif cmd_in == "citation-multi-file":
-                return_code = multi_file_main()
-            else:
-                return_code = multi_article_main()
-        except Exception as e:
-            print(f"Error during linking process: {e}")
-            import traceback
-            traceback.print_exc()
-            return_code = 1  # Failure
-            
+        with self.telemetry.phase("prepare") as phase:
+            self.parent.document_config.save_config()
+            self.delete_files_in_dir(self.input_dir, keep=(base+ext,))
+            phase["handoff"] = handoff_file(self.input_file_path, os.path.join(self.input_dir, base+ext))
+            print(f"input handoff: {phase['handoff']}")
+            self.backup_output(self.pending_output_path)
+            articles = self.get_article_ranges(cmd_in) if parallel else []
+
+        if articles:
+            print(f"linking {len(articles)} articles in parallel")
+            self.worker = ArticleLinkingWorker(self.input_file_path, self.config_path,
+                                               articles, self.pending_output_path,
+                                               run_id=self.telemetry.run_id)
+            self.worker.signals.report.connect(self.article_report)
+        else:
+            self.worker = LinkingWorker(cmd_in, self.input_file_path, self.pending_output_path,
+                                        run_id=self.telemetry.run_id)
+        self.worker.signals.event.connect(self.record_linking_event)
+        self.worker.signals.progress.connect(self.linking_progress)
+        self.worker.signals.finished.connect(self.on_worker_finished)
+        self.worker.signals.cancelled.connect(self.on_worker_cancelled)
+        self.thread_pool.start(self.worker)
+        return True
+
+    def get_article_ranges(self, cmd_in=None):
+        """
+        Return the ARTICLE_BREAKS ranges to link article by article.
+
+        Per-article runs reuse cached links of unchanged articles. Empty
+        (single linker run over the whole volume) unless the multi-article
+        linker is used and the ranges do not overlap. OFFSET is applied
+        here, so the ranges are the pages the linker itself would use.
+        """
+        if (cmd_in or DEFAULT_LINKER) != ARTICLE_MODE or not os.path.exists(self.config_path):
+            return []
+        config_store = self.parent.document_config.config_store
+        if config_store.path == os.path.abspath(self.config_path):
+            articles = config_store.model.articles()
+            offset = parse_offset(config_store.model["OFFSET"])
+        else:
+            articles = read_article_breaks(self.config_path)
+            offset = read_offset(self.config_path)
+        with pymupdf.open(self.input_file_path) as doc:
+            page_count = doc.page_count
+        articles = apply_offset(articles, offset, page_count)
+        ranges = ArticleRanges()
+        for article in articles:
+            if ranges.overlapping(article["first"], article["last"]):
+                print(f"overlapping article {article}, linking sequentially")
+                return []
+            ranges.append(article)
+        return articles
+
+    def start_telemetry(self, cmd_in, parallel):
+        """Open the telemetry of a new run and emit its run_start event."""
+        self.telemetry = LinkTelemetry(self.record_linking_event)
+        self.telemetry_path = telemetry_path(self.pending_output_path)
+        self.run_totals = {"phases": {}, "pages": 0, "citations": 0, "links": 0,
+                           "articles": 0, "failed_articles": 0, "cached_articles": 0}
+        self.telemetry.event("run_start",
+                             mode=cmd_in or DEFAULT_LINKER,
+                             parallel=parallel,
+                             pdf=self.input_file_path,
+                             output=self.pending_output_path)
+
+    def finish_telemetry(self, status):
+        """Emit run_end with phase totals and counts summed over the run's events."""
+        if self.telemetry is None:
+            return
+        self.telemetry.event("run_end", status=status,
+                             elapsed_s=round(time.perf_counter() - self.telemetry.start, 4),
+                             **self.run_totals)
+        self.telemetry = None
+
+    @Slot()
+    def record_linking_event(self, event):
+        """Aggregate one telemetry event, append it to the JSON lines file and re-emit it."""
+        totals = self.run_totals
+        if event["event"] == "phase_end":
+            phases = totals["phases"]
+            phases[event["phase"]] = round(phases.get(event["phase"], 0.0) + event["elapsed_s"], 4)
+        elif event["event"] in ("article", "document"):
+            for key in ("pages", "citations", "links"):
+                totals[key] += event[key]
+            if event["event"] == "article":
+                totals["articles"] += 1
+                totals["failed_articles"] += event["status"] != "ok"
+                totals["cached_articles"] += event["cached"]
+
+        if self.telemetry_path:
+            try:
+                append_jsonl(self.telemetry_path, event)
+            except OSError as e:
+                print(f"Could not write telemetry: {e}")
+        self.linking_event.emit(event)
+
+    def is_linking(self):
+        """Return True while a linking worker is running."""
+        return self.worker is not None
+
+    def cancel_linking_process(self):
+        """Request cancellation of the running linking worker."""
+        if self.worker:
+            self.linking_progress.emit(0, "cancelling")
+            self.worker.cancel()
+
+    @Slot()
+    def on_worker_finished(self, return_code):
+        """Verify output of a finished run and emit linking_finished."""
+        output_file_path = self.pending_output_path
+        self.worker = None
         self.output_file_path = output_file_path
         print("output file path: ", output_file_path)
-        
+
         success = return_code == 0 and os.path.exists(output_file_path)
+        if success:
+            self.discard_output_backup()
+        else:
+            self.restore_output_backup(output_file_path)
+        self.linking_progress.emit(100, "done" if success else "failed")
+        self.finish_telemetry("ok" if success else "failed")
         self.linking_finished.emit(success, output_file_path)
-        return (success, output_file_path)
 
+    @Slot()
+    def on_worker_cancelled(self):
+        """Roll back a cancelled run so the output directory is unchanged."""
+        self.worker = None
+        self.restore_output_backup(self.pending_output_path)
+        print("linking cancelled")
+        self.finish_telemetry("cancelled")
+        self.linking_progress.emit(0, "cancelled")
+        self.linking_cancelled.emit()
+
+    def backup_output(self, output_file_path):
+        """Move an existing output file aside before a new run."""
+        self.output_backup_path = ""
+        if os.path.exists(output_file_path):
+            try:
+                os.replace(output_file_path, output_file_path + ".bak")
+                self.output_backup_path = output_file_path + ".bak"
+            except OSError as e:
+                print(f"Could not back up previous output: {e}")
 
-    def delete_files_in_dir(self, dir):
+    def restore_output_backup(self, output_file_path):
+        """Remove partial output and put the previous output file back."""
+        if os.path.exists(output_file_path):
+            os.remove(output_file_path)
+        if self.output_backup_path and os.path.exists(self.output_backup_path):
+            os.replace(self.output_backup_path, output_file_path)
+        self.output_backup_path = ""
+
+    def discard_output_backup(self):
+        """Delete the previous output once a new run succeeded."""
+        if self.output_backup_path and os.path.exists(self.output_backup_path):
+            os.remove(self.output_backup_path)
+        self.output_backup_path = ""
+
+
+    def delete_files_in_dir(self, dir, keep=()):
         """
         Delete all files in the specified directory.
         
-        Used to clean the input directory before copying new PDF.
+        Used to clean the input directory before handing off the new PDF.
         Subdirectories are not removed.
         
         Args:
             dir: Directory path (currently unused, uses self.input_dir)
+            keep: File names to leave in place (the PDF about to be handed
+                  off again, so an unchanged input is not re-copied)
         """
         for filename in os.listdir(self.input_dir):
             file_path = os.path.join(self.input_dir, filename)
-            if os.path.isfile(file_path):
+            if filename not in keep and os.path.isfile(file_path):
                 os.remove(file_path)
 
-    def save_final_doc(self, pymu_doc):
+    def save_final_doc(self, pymu_doc, save_path=None, open_docs=None):
         """
-        Save the final processed document to output location.
-        
-        Document should be closed before calling this to avoid file locks.
+        Save the final processed document.
+
+        Saving back to the output file the document was opened from is
+        incremental (only changed objects are appended). Saving anywhere else
+        is a full save done on a background thread; the result is reported
+        through doc_saver.save_finished. A full save never replaces a file
+        that pymu_doc or one of open_docs is backed by.
         
         Args:
             pymu_doc: PyMuPDF document object to save
+            save_path: Destination path (defaults to the output file path)
+            open_docs: Other open PyMuPDF documents whose files must not be replaced
+
+        Returns:
+            str: "incremental" or "full", None if nothing was saved
         """
-        if pymu_doc:
-            temp_path = self.output_file_path + ".tmp"
-            pymu_doc.save(temp_path)
-            
-            # Replace existing file
-            if os.path.exists(self.output_file_path):
-                os.remove(self.output_file_path)
-            os.rename(temp_path, self.output_file_path)
-            print("file saved")
+        if not pymu_doc:
+            return None
+        target_path = save_path if save_path else self.output_file_path
+        if not target_path:
+            return None
+        return self.doc_saver.save(pymu_doc, target_path, incremental=True, open_docs=open_docs)
 
     def set_kwargs(self, shell=True):
         """
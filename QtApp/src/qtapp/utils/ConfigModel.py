@@ -0,0 +1,274 @@
+"""
+Typed citation linker configuration and its on-disk store.
+Parses a config file once, reloads it only when it changed on disk and writes it only when edited.
+"""
+import  os
+import  re
+import  hashlib
+from    PySide6.QtCore                  import  QObject, Signal
+
+
+# file order: (key, kind, default)
+CONFIG_FIELDS = (
+    ("DEBUG",                   "bool", False),
+    ("SPECIAL_CASE",            "list", ()),
+    ("BIBLIOGRAPHY_DELIMITER",  "list", ()),
+    ("ANNOT_TYPE",              "str",  "underline"),
+    ("COLOR",                   "str",  "black"),
+    ("OFFSET",                  "str",  ""),
+    ("ARTICLE_BREAKS",          "list", ()),
+    ("SOFT_YEAR",               "bool", False),
+    ("DEEP_SEARCH",             "bool", False),
+    ("SEARCH_EXCLUDE",          "list", ()),
+    ("ALTERNATIVE_BIB",         "bool", False),
+)
+FIELD_KINDS = {key: kind for key, kind, _ in CONFIG_FIELDS}
+
+
+def parse_value(kind, value):
+    """Convert a raw config value to its typed form (lists become tuples)."""
+    if kind == "bool":
+        return value.strip().lower() == "true"
+    if kind == "list":
+        return tuple(re.findall(r'"([^"]*)"', value))
+    return value.strip()
+
+
+def format_value(kind, value):
+    """Convert a typed value back to config file syntax."""
+    if kind == "list":
+        return ", ".join(f'"{item}"' for item in value)
+    return str(value)
+
+
+class ConfigModel:
+    """
+    Typed values of one config file.
+
+    Parent: ConfigStore
+    Children: None
+
+    Values are immutable (bools, strings, tuples of strings) so models can
+    be compared, copied cheaply and diffed field by field. Lines with keys
+    the app does not know are kept and written back unchanged.
+    """
+    def __init__(self, values=None, extra=()):
+        """Initialize with defaults, overridden by values."""
+        self.values = {key: default for key, _, default in CONFIG_FIELDS}
+        if values:
+            self.values.update(values)
+        self.extra = tuple(extra)
+
+    def __eq__(self, other):
+        return (isinstance(other, ConfigModel)
+                and self.values == other.values and self.extra == other.extra)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    @classmethod
+    def parse(cls, text):
+        """Build a model from config file text."""
+        values = {}
+        extra = []
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#") or "=" not in stripped:
+                continue
+            key, value = stripped.split("=", 1)
+            key = key.strip()
+            if key in FIELD_KINDS:
+                values[key] = parse_value(FIELD_KINDS[key], value)
+            else:
+                extra.append(stripped)
+        return cls(values, extra)
+
+    def dumps(self):
+        """Return config file text in canonical field order."""
+        lines = [f"{key}={format_value(kind, self.values[key])}" for key, kind, _ in CONFIG_FIELDS]
+        lines.extend(self.extra)
+        return "\n".join(lines)
+
+    def copy(self):
+        return ConfigModel(self.values, self.extra)
+
+    def set(self, key, value):
+        """Set a field (lists are stored as tuples); return True if it changed."""
+        if FIELD_KINDS[key] == "list":
+            value = tuple(value)
+        if self.values[key] == value:
+            return False
+        self.values[key] = value
+        return True
+
+    def diff(self, other):
+        """Return {key: value in other} for every field that differs from self."""
+        return {key: other.values[key] for key in FIELD_KINDS
+                if self.values[key] != other.values[key]}
+
+    def articles(self):
+        """ARTICLE_BREAKS as zero-based {"first", "last"} dicts; malformed entries are skipped."""
+        articles = []
+        for item in self.values["ARTICLE_BREAKS"]:
+            try:
+                first, last = item.split(":")
+                articles.append({"first": int(first) - 1, "last": int(last) - 1})
+            except ValueError:
+                print(f"ignoring malformed article break: {item!r}")
+        return articles
+
+
+class ConfigStore(QObject):
+    """
+    The active config model and the files it was loaded from.
+
+    Parent: DocConfig
+    Children: ConfigModel
+
+    - load() re-reads a file only when its (mtime, size) stamp changed and
+      re-parses it only when its content hash changed as well
+    - save() writes only when the model differs from what is on disk
+    - every change of the active model emits config_changed with only the
+      fields that changed, so widgets and text handlers update incrementally
+    - parsed profiles (including unsaved edits) are kept per path, so
+      switching back and forth between journal configs does not touch disk
+    """
+    config_changed = Signal(dict)
+
+    def __init__(self, parent=None):
+        """Initialize store with a default model and no file."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.path = ""
+        self.model = ConfigModel()
+        self.saved = ConfigModel()     # model as last read from / written to path
+        self.stamp = None
+        self.digest = None
+        self.profiles = {}              # abs path -> {"stamp", "digest", "saved", "model"}
+
+        ### counters
+        self.reads = 0
+        self.parses = 0
+        self.writes = 0
+
+    ### methods
+    def file_stamp(self, path):
+        """(mtime_ns, size) of path, None if missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_dirty(self):
+        """True if the active model has edits that are not on disk."""
+        return self.model != self.saved
+
+    def replace(self, model):
+        """Make model the active one and emit the fields that changed."""
+        diff = self.model.diff(model)
+        self.model = model
+        if diff:
+            self.config_changed.emit(diff)
+        return diff
+
+    def update(self, key, value):
+        """Set one field of the active model; emits config_changed if it changed."""
+        if self.model.set(key, value):
+            self.config_changed.emit({key: self.model[key]})
+            return True
+        return False
+
+    def remember_profile(self):
+        """Keep the active model (with unsaved edits) for a later switch back."""
+        if self.path:
+            self.profiles[self.path] = {"stamp": self.stamp, "digest": self.digest,
+                                        "saved": self.saved, "model": self.model}
+
+    def load(self, path=None, discard_edits=False):
+        """
+        Make the config at path (default: current path) the active model.
+
+        Unchanged files are not read again; a cached profile is restored
+        including unsaved edits unless discard_edits is set.
+
+        Returns:
+            dict: fields that changed in the active model
+        """
+        path = os.path.abspath(path or self.path)
+        diff = {}
+        if path != self.path:
+            self.remember_profile()
+            profile = self.profiles.get(path)
+            if profile:
+                # start from the cached parse; refresh() below only reads a changed file
+                self.path, self.stamp, self.digest = path, profile["stamp"], profile["digest"]
+                self.saved = profile["saved"]
+                diff = self.replace((self.saved if discard_edits else profile["model"]).copy())
+            else:
+                # nothing to keep for an unseen file: whatever is on disk wins
+                self.path, self.stamp, self.digest = path, None, None
+                self.saved = self.model
+        diff.update(self.refresh(discard_edits=discard_edits))
+        return diff
+
+    def refresh(self, discard_edits=False):
+        """
+        Reload the current file if it changed on disk.
+
+        External changes are only applied over a model with unsaved edits
+        when discard_edits is set.
+        """
+        stamp = self.file_stamp(self.path)
+        if stamp is None:
+            return {}
+        if stamp == self.stamp:
+            return self.replace(self.saved.copy()) if discard_edits else {}
+        if self.is_dirty() and not discard_edits:
+            print(f"{self.path} changed on disk, keeping unsaved config edits")
+            return {}
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.reads += 1
+        self.stamp = stamp
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if digest != self.digest:
+            self.digest = digest
+            self.saved = ConfigModel.parse(data.decode("utf-8"))
+            self.parses += 1
+        return self.replace(self.saved.copy())
+
+    def save(self, path=None):
+        """
+        Write the active model to path (default: current path) if it is dirty.
+
+        Returns:
+            bool: True if the file was written
+        """
+        path = os.path.abspath(path or self.path)
+        if path == self.path and not self.is_dirty() and self.file_stamp(path) == self.stamp:
+            return False
+
+        data = self.model.dumps().encode("utf-8")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.writes += 1
+        self.path = path
+        self.stamp = self.file_stamp(path)
+        self.digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self.saved = self.model.copy()
+        return True
+
+    def reset(self):
+        """Replace the active model with defaults (unsaved until save())."""
+        return self.replace(ConfigModel(extra=self.model.extra))
+
+    def stats(self):
+        """Return read/parse/write counters."""
+        return {"reads": self.reads, "parses": self.parses, "writes": self.writes,
+                "profiles": len(self.profiles), "dirty": self.is_dirty()}
@@ -0,0 +1,171 @@
+"""
+Incremental and background saving of PyMuPDF documents.
+Reports timings and file size deltas for every save.
+"""
+import  os
+import  time
+import  pymupdf
+from    PySide6.QtCore                  import  QObject, QRunnable, QThreadPool, Signal, Slot
+
+from    qtapp.utils.fileUtils           import  file_size
+
+
+def is_same_file(doc, path):
+    """Return True if doc was opened from path."""
+    if not doc.name or not os.path.exists(path):
+        return False
+    try:
+        return os.path.samefile(doc.name, path)
+    except OSError:
+        return False
+
+
+class SaveWorkerSignals(QObject):
+    """
+    Signals emitted by SaveWorker.
+
+    Parent: None
+    Children: None
+    """
+    finished = Signal(bool, str, dict)
+
+
+class SaveWorker(QRunnable):
+    """
+    QThreadPool job that writes a document snapshot to disk.
+
+    Parent: DocSaver
+    Children: SaveWorkerSignals
+
+    Works on its own document opened from snapshot bytes, so the live
+    document used by the viewers is never touched off the GUI thread.
+    """
+    def __init__(self, snapshot, target_path, stats):
+        super().__init__()
+        self.snapshot = snapshot
+        self.target_path = target_path
+        self.stats = stats
+        self.signals = SaveWorkerSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        """Garbage collect, compress and atomically replace the target file."""
+        start = time.perf_counter()
+        temp_path = self.target_path + ".tmp"
+        try:
+            doc = pymupdf.open("pdf", self.snapshot)
+            doc.save(temp_path, garbage=3, deflate=True)
+            doc.close()
+            os.replace(temp_path, self.target_path)
+            success = True
+        except Exception as e:
+            print(f"Error saving {self.target_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.stats["error"] = str(e)
+            success = False
+
+        self.snapshot = None
+        self.stats["write_s"] = time.perf_counter() - start
+        self.stats["total_s"] = self.stats["snapshot_s"] + self.stats["write_s"]
+        self.stats["size_after"] = file_size(self.target_path)
+        self.stats["size_delta"] = self.stats["size_after"] - self.stats["size_before"]
+        self.signals.finished.emit(success, self.target_path, self.stats)
+
+
+class DocSaver(QObject):
+    """
+    Saves PyMuPDF documents incrementally or on a background thread.
+
+    Parent: Bridge
+    Children: SaveWorker
+
+    - Saving back to the file the document was opened from appends only
+      the changed objects (incremental save) on the calling thread.
+    - Any other save serializes a snapshot on the calling thread and does
+      the expensive cleanup/compression and write on the thread pool.
+    - A full save is refused if the target is the file of an open document
+      (replacing it would pull the file out from under that document).
+    """
+    save_finished = Signal(bool, str, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.workers = []
+
+    def can_save_incrementally(self, doc, target_path):
+        """Return True if doc can be appended to target_path."""
+        return is_same_file(doc, target_path) and doc.can_save_incrementally()
+
+    def save(self, doc, target_path, incremental=True, open_docs=None):
+        """
+        Save doc to target_path.
+
+        Args:
+            doc: PyMuPDF document to save
+            target_path: Destination file path
+            incremental: Append changes if target_path is the document's own file
+            open_docs: Other open documents whose files must not be replaced
+
+        Returns:
+            str: "incremental" or "full" (full saves finish asynchronously),
+                 None if the save was refused
+        """
+        stats = {"path": target_path, "size_before": file_size(target_path)}
+
+        if incremental and self.can_save_incrementally(doc, target_path):
+            start = time.perf_counter()
+            try:
+                doc.save(target_path,
+                         incremental=True,
+                         encryption=pymupdf.PDF_ENCRYPT_KEEP)
+                success = True
+            except Exception as e:
+                print(f"Error saving {target_path} incrementally: {e}")
+                stats["error"] = str(e)
+                success = False
+            stats["mode"] = "incremental"
+            stats["snapshot_s"] = 0.0
+            stats["write_s"] = time.perf_counter() - start
+            stats["total_s"] = stats["write_s"]
+            stats["size_after"] = file_size(target_path)
+            stats["size_delta"] = stats["size_after"] - stats["size_before"]
+            self.on_worker_finished(success, target_path, stats)
+            return "incremental"
+
+        backing_docs = [doc] + [other for other in (open_docs or []) if other is not doc]
+        if any(is_same_file(other, target_path) for other in backing_docs):
+            stats["mode"] = "full"
+            stats["error"] = f"{target_path} is open in the viewer and cannot be replaced"
+            stats["snapshot_s"] = stats["write_s"] = stats["total_s"] = 0.0
+            stats["size_after"] = stats["size_before"]
+            stats["size_delta"] = 0
+            self.on_worker_finished(False, target_path, stats)
+            return None
+
+        start = time.perf_counter()
+        snapshot = doc.tobytes(garbage=0, deflate=False)
+        stats["mode"] = "full"
+        stats["snapshot_s"] = time.perf_counter() - start
+
+        worker = SaveWorker(snapshot, target_path, stats)
+        worker.signals.finished.connect(self.on_worker_finished)
+        self.workers.append(worker)
+        self.thread_pool.start(worker)
+        return "full"
+
+    def is_saving(self):
+        """Return True while background saves are pending."""
+        return bool(self.workers)
+
+    @Slot()
+    def on_worker_finished(self, success, target_path, stats):
+        """Report save timings and forward the result."""
+        self.workers = [worker for worker in self.workers
+                        if worker.target_path != target_path or worker.snapshot is not None]
+        print(f"saved {target_path} ({stats.get('mode')}): "
+              f"{stats.get('total_s', 0.0):.3f}s, "
+              f"{stats.get('size_before', 0)} -> {stats.get('size_after', 0)} bytes "
+              f"({stats.get('size_delta', 0):+d})")
+        self.save_finished.emit(success, target_path, stats)
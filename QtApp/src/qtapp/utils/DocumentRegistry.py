@@ -0,0 +1,159 @@
+"""
+Reference-counted registry of parsed PDF documents.
+Lets viewers and text handlers borrow one parsed document per file instead of opening their own.
+"""
+import  os
+import  pymupdf
+from    PySide6.QtCore                  import  QObject
+from    PySide6.QtPdf                   import  QPdfDocument
+
+from    qtapp.utils.fileUtils           import  file_fingerprint, file_size
+
+
+class DocumentRegistry(QObject):
+    """
+    Shared document store keyed by path and content fingerprint.
+
+    Parent: mainWindow
+    Children: QPdfDocument
+
+    Holds at most one QPdfDocument (rendering) and one PyMuPDF document
+    (text/annotations) per file version. Borrowers acquire and release;
+    a document is closed when its last borrower releases it. A re-written
+    file gets a new fingerprint and therefore a fresh entry.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = {}
+
+    def key_for(self, path):
+        """Return registry key (absolute path, fingerprint) for path."""
+        abs_path = os.path.abspath(path)
+        return (abs_path, file_fingerprint(abs_path))
+
+    def get_entry(self, path):
+        """Return the entry for path, creating an empty one if needed."""
+        key = self.key_for(path)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {
+                "path": key[0],
+                "fingerprint": key[1],
+                "qt": None,
+                "qt_refs": 0,
+                "pymu": None,
+                "pymu_refs": 0,
+            }
+            self.entries[key] = entry
+        return entry
+
+    def find_entry(self, doc):
+        """Return (key, kind) of the entry holding doc, or (None, None)."""
+        for key, entry in self.entries.items():
+            if entry["qt"] is doc:
+                return key, "qt"
+            if entry["pymu"] is doc:
+                return key, "pymu"
+        return None, None
+
+    def acquire_qt(self, path):
+        """Borrow the QPdfDocument for path, loading it on first use."""
+        entry = self.get_entry(path)
+        if entry["qt"] is None:
+            doc = QPdfDocument(self)
+            doc.load(entry["path"])
+            entry["qt"] = doc
+        entry["qt_refs"] += 1
+        return entry["qt"]
+
+    def acquire_pymu(self, path):
+        """Borrow the PyMuPDF document for path, opening it on first use."""
+        entry = self.get_entry(path)
+        if entry["pymu"] is None:
+            entry["pymu"] = pymupdf.open(entry["path"])
+        entry["pymu_refs"] += 1
+        return entry["pymu"]
+
+    def release(self, doc):
+        """Return a borrowed document; closes it when no borrowers remain."""
+        key, kind = self.find_entry(doc)
+        if key is None:
+            return
+        entry = self.entries[key]
+        entry[kind + "_refs"] -= 1
+        if entry[kind + "_refs"] <= 0:
+            entry[kind + "_refs"] = 0
+            entry[kind] = None
+            doc.close()
+            if kind == "qt":
+                doc.deleteLater()
+        if entry["qt"] is None and entry["pymu"] is None:
+            del self.entries[key]
+
+    def reload_qt_documents(self):
+        """
+        Reload every QPdfDocument in place to drop the page and image data
+        PDFium keeps for each page visited (memory ceiling reached).
+
+        Borrowers keep their reference; files re-written since they were
+        opened are skipped. PyMuPDF documents stay open, they may hold
+        unsaved edits. Renderers must be detached from the documents first
+        (RenderCache.suspend()), or a render in flight reads a closed one.
+
+        Returns:
+            int: number of documents reloaded
+        """
+        reloaded = 0
+        for entry in self.entries.values():
+            if entry["qt"] is None or file_fingerprint(entry["path"]) != entry["fingerprint"]:
+                continue
+            entry["qt"].close()
+            entry["qt"].load(entry["path"])
+            reloaded += 1
+        return reloaded
+
+    def close_all(self):
+        """Close every registered document regardless of borrowers."""
+        for entry in self.entries.values():
+            if entry["qt"] is not None:
+                entry["qt"].close()
+            if entry["pymu"] is not None:
+                entry["pymu"].close()
+        self.entries.clear()
+
+    def memory_report(self):
+        """
+        Return per-document memory estimates.
+
+        Neither backend exposes its heap usage, so each live parse is
+        estimated at the file size (both keep the file contents resident).
+        """
+        report = []
+        for entry in self.entries.values():
+            size = file_size(entry["path"])
+            parses = int(entry["qt"] is not None) + int(entry["pymu"] is not None)
+            page_count = 0
+            if entry["pymu"] is not None:
+                page_count = entry["pymu"].page_count
+            elif entry["qt"] is not None:
+                page_count = entry["qt"].pageCount()
+            report.append({
+                "path": entry["path"],
+                "fingerprint": entry["fingerprint"],
+                "pages": page_count,
+                "qt_refs": entry["qt_refs"],
+                "pymu_refs": entry["pymu_refs"],
+                "parses": parses,
+                "file_size": size,
+                "estimated_bytes": size * parses,
+            })
+        return report
+
+    def print_memory_report(self):
+        """Print memory_report in a readable form."""
+        print("=========================")
+        for item in self.memory_report():
+            print(f"{os.path.basename(item['path'])}: {item['pages']} pages, "
+                  f"qt refs {item['qt_refs']}, pymu refs {item['pymu_refs']}, "
+                  f"~{item['estimated_bytes'] / 1e6:.1f} MB")
+        print("=========================")
@@ -0,0 +1,153 @@
+"""
+Undo/redo journal of manual link and annotation edits.
+Stores inverse edit records instead of document snapshots and persists them next to the saved PDF.
+"""
+import  os
+import  json
+import  time
+from    collections                     import  deque
+from    PySide6.QtCore                  import  QObject, Signal
+
+from    qtapp.utils.fileUtils           import  file_fingerprint
+
+
+JOURNAL_SUFFIX = "_edits.json"
+JOURNAL_VERSION = 2
+MAX_JOURNAL_ENTRIES = 500
+
+
+def journal_path(pdf_path):
+    """JSON file holding the edit journal of pdf_path."""
+    return os.path.splitext(pdf_path)[0] + JOURNAL_SUFFIX
+
+
+def to_json(obj):
+    """json.dump default: PyMuPDF Rect/Point/Quad become (nested) lists."""
+    return list(obj)
+
+
+class EditJournal(QObject):
+    """
+    Undo and redo stacks of one document.
+
+    Parent: TextHandler
+    Children: None
+
+    An entry is {"label", "time", "records"}, where records are the edit
+    records (TextHandler.apply_edit_records) that revert one user action.
+    Applying them returns the records reverting *that*, which become the
+    entry on the opposite stack, so undo and redo cost only the size of the
+    edit itself. The oldest entries are dropped beyond MAX_JOURNAL_ENTRIES.
+
+    save() writes both stacks with the fingerprint of the saved PDF; load()
+    restores them only if the file on disk is still that exact version.
+    Saves finishing in the background write the snapshot() taken when the
+    save started, since the stacks may have moved on meanwhile.
+    """
+    changed = Signal(int, int)
+
+    def __init__(self, parent=None):
+        """Initialize empty stacks."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.undo_stack = deque(maxlen=MAX_JOURNAL_ENTRIES)
+        self.redo_stack = deque(maxlen=MAX_JOURNAL_ENTRIES)
+        self.path = ""
+        self.fingerprint = None
+
+    ### methods
+    def record(self, label, records):
+        """Push a new user action (its inverse records); clears the redo stack."""
+        if not records:
+            return
+        self.undo_stack.append({"label": label, "time": round(time.time(), 3), "records": records})
+        self.redo_stack.clear()
+        self.changed.emit(len(self.undo_stack), len(self.redo_stack))
+
+    def pop(self, redo=False):
+        """Take the newest entry of the undo (or redo) stack, None if empty."""
+        stack = self.redo_stack if redo else self.undo_stack
+        if not stack:
+            return None
+        return stack.pop()
+
+    def push(self, entry, records, redo=False):
+        """Put the inverse of an undone (redone) entry on the opposite stack."""
+        stack = self.undo_stack if redo else self.redo_stack
+        stack.append({"label": entry["label"], "time": round(time.time(), 3), "records": records})
+        self.changed.emit(len(self.undo_stack), len(self.redo_stack))
+
+    def clear(self):
+        """Drop both stacks."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.changed.emit(0, 0)
+
+    def snapshot(self):
+        """Copy of both stacks (entries are never modified, so a shallow copy suffices)."""
+        return {"undo": list(self.undo_stack), "redo": list(self.redo_stack)}
+
+    def load(self, pdf_path):
+        """
+        Restore the journal saved with pdf_path, or start empty.
+
+        Stacks are kept if pdf_path is the file already loaded (a second
+        viewer opening the same document).
+        """
+        pdf_path = os.path.abspath(pdf_path)
+        fingerprint = file_fingerprint(pdf_path)
+        if pdf_path == self.path and fingerprint == self.fingerprint:
+            return
+        self.path = pdf_path
+        self.fingerprint = fingerprint
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+        path = journal_path(pdf_path)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == JOURNAL_VERSION and data.get("fingerprint") == fingerprint:
+                    self.undo_stack.extend(data["undo"])
+                    self.redo_stack.extend(data["redo"])
+                    print(f"restored edit journal: {len(self.undo_stack)} undo, "
+                          f"{len(self.redo_stack)} redo steps")
+                else:
+                    print(f"ignoring edit journal {path}: written for another version of the PDF")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not read edit journal {path}: {e}")
+        self.changed.emit(len(self.undo_stack), len(self.redo_stack))
+
+    def save(self, pdf_path, snapshot=None):
+        """
+        Write the journal for a freshly saved pdf_path (atomic replace).
+
+        Args:
+            pdf_path: The saved PDF
+            snapshot: snapshot() taken when the save started (default: the current stacks)
+        """
+        pdf_path = os.path.abspath(pdf_path)
+        fingerprint = file_fingerprint(pdf_path)
+        path = journal_path(pdf_path)
+        snapshot = snapshot or self.snapshot()
+        data = {
+            "version": JOURNAL_VERSION,
+            "pdf": pdf_path,
+            "fingerprint": fingerprint,
+            "undo": snapshot["undo"],
+            "redo": snapshot["redo"],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=to_json)
+        os.replace(tmp_path, path)
+        if pdf_path == self.path or not self.path:
+            self.path = pdf_path
+            self.fingerprint = fingerprint
+
+    def stats(self):
+        """Return stack sizes."""
+        return {"undo": len(self.undo_stack), "redo": len(self.redo_stack)}
@@ -0,0 +1,297 @@
+"""
+Background worker for the citation linking process.
+Runs the linker in a child process so the GUI stays responsive and the job can be cancelled.
+"""
+import  os
+import  time
+import  queue
+import  shutil
+import  tempfile
+import  threading
+import  multiprocessing
+from    PySide6.QtCore                  import  QObject, QRunnable, Signal
+
+from    qtapp.utils.linkerRunner        import  DEFAULT_LINKER, run_linker_in_child
+from    qtapp.utils.linkTelemetry       import  (LinkTelemetry,
+                                                 count_pdf_items,
+                                                 count_articles,
+                                                 count_inserted)
+from    qtapp.utils.articleLinker       import  (LINK_CACHE_DIR,
+                                                 build_article_jobs,
+                                                 run_article_job_in_child,
+                                                 merge_article_outputs,
+                                                 write_article_report,
+                                                 cache_store,
+                                                 prune_cache)
+
+
+class LinkingWorkerSignals(QObject):
+    """
+    Signals emitted by LinkingWorker (QRunnable cannot emit signals itself).
+
+    Parent: None
+    Children: None
+    """
+    progress = Signal(int, str)
+    finished = Signal(int)
+    cancelled = Signal()
+    report = Signal(dict)
+    event = Signal(dict)
+
+
+class LinkingWorker(QRunnable):
+    """
+    QThreadPool job that supervises one linking run in a child process.
+
+    Parent: Bridge
+    Children: LinkingWorkerSignals
+
+    The pool thread only waits on the child process, polls for cancellation
+    and reports progress; the linker itself never runs on a Qt thread.
+    Phase timings and the citation/link counts of output_path are emitted
+    as telemetry events through signals.event.
+    """
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, cmd_in=None, input_path=None, output_path=None, run_id=None):
+        """Initialize worker for the given linker command."""
+        super().__init__()
+        self.cmd_in = cmd_in
+        self.input_path = input_path
+        self.output_path = output_path
+        self.run_id = run_id
+        self.signals = LinkingWorkerSignals()
+        self.cancel_event = threading.Event()
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """Request cancellation; the child process is terminated on next poll."""
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        """Start the child process and wait for it, honouring cancel requests."""
+        telemetry = LinkTelemetry(self.signals.event.emit, self.run_id)
+        ctx = multiprocessing.get_context("spawn")
+        result_queue = ctx.Queue()
+        process = ctx.Process(target=run_linker_in_child,
+                              args=(self.cmd_in, result_queue),
+                              daemon=True)
+        with telemetry.phase("link", mode=self.cmd_in or DEFAULT_LINKER) as phase:
+            start = time.perf_counter()
+            last_report = 0
+            process.start()
+            self.signals.progress.emit(10, "linking started")
+
+            while process.is_alive():
+                if self.cancel_event.is_set():
+                    process.terminate()
+                    process.join()
+                    phase["status"] = "cancelled"
+                    self.signals.cancelled.emit()
+                    return
+                process.join(self.POLL_INTERVAL)
+                elapsed = int(time.perf_counter() - start)
+                if elapsed != last_report:
+                    last_report = elapsed
+                    self.signals.progress.emit(10, f"linking... {elapsed}s")
+
+            try:
+                return_code = result_queue.get(timeout=1)
+            except queue.Empty:
+                return_code = process.exitcode or 1
+            phase["return_code"] = return_code
+            if return_code != 0:
+                phase["status"] = "failed"
+
+        self.signals.progress.emit(95, "verifying output")
+        if return_code == 0 and self.output_path and os.path.exists(self.output_path):
+            with telemetry.phase("verify"):
+                before = count_pdf_items(self.input_path) if self.input_path else None
+                telemetry.event("document", **count_inserted(before, count_pdf_items(self.output_path)))
+        self.signals.finished.emit(return_code)
+
+
+class ArticleLinkingWorker(QRunnable):
+    """
+    QThreadPool job that links the articles of a volume in parallel child processes.
+
+    Parent: Bridge
+    Children: LinkingWorkerSignals
+
+    Every ARTICLE_BREAKS range is extracted into its own PDF and linked by a
+    separate process with an isolated scratch directory (at most max_workers
+    at a time). Linked articles are merged back into one output; an article
+    that fails or crashes keeps its original pages instead of aborting the
+    volume. Per-article status, timings and logs are written to
+    <output>_articles/ and emitted through signals.report.
+
+    Linked articles are cached in <output dir>/.link_cache/ keyed by their
+    page contents and config; a re-run only links articles whose pages or
+    relevant config fields changed.
+
+    Phase timings and one "article" event per article (status, timings,
+    citations found, links inserted) are emitted through signals.event.
+    """
+    POLL_INTERVAL = 0.1
+    MAX_DEFAULT_WORKERS = 4
+
+    def __init__(self, pdf_path, config_path, articles, output_path, max_workers=None, use_cache=True,
+                 run_id=None):
+        """Initialize worker for one volume."""
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.config_path = config_path
+        self.articles = articles
+        self.output_path = output_path
+        self.max_workers = max_workers or min(self.MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+        self.report_dir = os.path.splitext(output_path)[0] + "_articles"
+        self.cache_dir = (os.path.join(os.path.dirname(output_path), LINK_CACHE_DIR)
+                          if use_cache else None)
+        self.run_id = run_id
+        self.telemetry = None
+        self.before_counts = []
+        self.signals = LinkingWorkerSignals()
+        self.cancel_event = threading.Event()
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """Request cancellation; running article processes are terminated on next poll."""
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        """Split, link in parallel, merge."""
+        start = time.perf_counter()
+        telemetry = self.telemetry = LinkTelemetry(self.signals.event.emit, self.run_id)
+        work_dir = tempfile.mkdtemp(prefix="citation_linker_articles_")
+        return_code = 1
+        try:
+            self.signals.progress.emit(5, f"splitting {len(self.articles)} articles")
+            with telemetry.phase("split", articles=len(self.articles)) as phase:
+                self.before_counts = count_articles(self.pdf_path, self.articles)
+                jobs, cached = build_article_jobs(self.pdf_path, self.config_path, self.articles,
+                                                  work_dir, self.report_dir, self.cache_dir)
+                phase["cached"] = len(cached)
+            for result in cached:
+                self.article_event(result)
+            if cached:
+                self.signals.progress.emit(10, f"{len(cached)} of {len(self.articles)} articles "
+                                               "unchanged, reusing cached links")
+            with telemetry.phase("link", jobs=len(jobs), workers=self.max_workers) as phase:
+                results = self.run_jobs(jobs)
+                if results is None:
+                    phase["status"] = "cancelled"
+            if results is None:
+                self.signals.cancelled.emit()
+                return
+            results.extend(cached)
+
+            self.signals.progress.emit(90, "merging articles")
+            merged = 0
+            with telemetry.phase("merge") as phase:
+                if any(result["status"] == "ok" for result in results):
+                    merged = merge_article_outputs(self.pdf_path, results, self.output_path)
+                phase["merged"] = merged
+            # after the merge: it fails articles whose page count does not match
+            if self.cache_dir:
+                with telemetry.phase("cache"):
+                    for result in results:
+                        if result["status"] == "ok" and not result.get("cached"):
+                            cache_store(self.cache_dir, result["cache_key"], result["output"])
+            for result in results:
+                if (not result.get("cached") and result.get("output")
+                        and os.path.exists(result["output"])):
+                    os.remove(result["output"])
+            if self.cache_dir:
+                prune_cache(self.cache_dir)
+            report = write_article_report(os.path.join(self.report_dir, "articles.json"),
+                                          self.pdf_path, results, time.perf_counter() - start)
+            report["merged"] = merged
+            self.signals.report.emit(report)
+            return_code = 0 if merged else 1
+        except Exception as e:
+            print(f"Error during parallel article linking: {e}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.signals.progress.emit(95, "verifying output")
+        self.signals.finished.emit(return_code)
+
+    def run_jobs(self, jobs):
+        """
+        Run article jobs in at most max_workers child processes.
+
+        Returns:
+            list: Result dict per article, None if cancelled
+        """
+        ctx = multiprocessing.get_context("spawn")
+        waiting = list(jobs)
+        running = {}    # index -> (process, result queue, job, start)
+        results = []
+        if not jobs:
+            return results
+
+        while waiting or running:
+            if self.cancel_event.is_set():
+                for process, _, _, _ in running.values():
+                    process.terminate()
+                for process, _, _, _ in running.values():
+                    process.join()
+                return None
+
+            while waiting and len(running) < self.max_workers:
+                job = waiting.pop(0)
+                result_queue = ctx.Queue()
+                process = ctx.Process(target=run_article_job_in_child,
+                                      args=(job, result_queue),
+                                      daemon=True)
+                process.start()
+                running[job["index"]] = (process, result_queue, job, time.perf_counter())
+
+            time.sleep(self.POLL_INTERVAL)
+            for idx, (process, result_queue, job, job_start) in list(running.items()):
+                if process.is_alive():
+                    continue
+                try:
+                    result = result_queue.get(timeout=1)
+                except queue.Empty:
+                    # the child died without reporting (crash in the linker)
+                    result = {"pdf": job["pdf"], "status": "error", "output": None,
+                              "error": f"article process exited with code {process.exitcode}",
+                              "elapsed_s": time.perf_counter() - job_start,
+                              "article": job["article"], "index": idx}
+                process.join()
+                del running[idx]
+                results.append(result)
+                self.article_event(result)
+                article = result["article"]
+                self.signals.progress.emit(
+                        10 + int(80 * len(results) / len(jobs)),
+                        f"article {len(results)}/{len(jobs)} (pages {article['first'] + 1}-"
+                        f"{article['last'] + 1}) {result['status']} in {result.get('elapsed_s', 0.0):.1f}s")
+        return results
+
+    def article_event(self, result):
+        """Emit the telemetry event of one finished (or cached) article."""
+        before = self.before_counts[result["index"]] if self.before_counts else None
+        if result["status"] == "ok" and result.get("output"):
+            counts = count_inserted(before, count_pdf_items(result["output"]))
+        else:
+            counts = {"pages": before["pages"] if before else 0, "citations": 0, "links": 0}
+        article = result["article"]
+        self.telemetry.event("article",
+                             index=result["index"],
+                             first_page=article["first"] + 1,
+                             last_page=article["last"] + 1,
+                             status=result["status"],
+                             cached=bool(result.get("cached")),
+                             prepare_s=round(result.get("prepare_s", 0.0), 4),
+                             link_s=round(result.get("link_s", 0.0), 4),
+                             elapsed_s=round(result.get("elapsed_s", 0.0), 4),
+                             error=result.get("error"),
+                             **counts)
@@ -0,0 +1,305 @@
+"""
+Memory ceiling and telemetry for long sessions on very large PDFs.
+Splits one configurable limit between the viewer caches and trims them when the process grows past it.
+"""
+import  os
+import  sys
+import  ctypes
+import  pymupdf
+from    PySide6.QtCore                  import  QObject, QTimer, Signal, Slot
+
+from    qtapp.viewerUtils.RenderCache   import  DEFAULT_BUDGET_BYTES
+
+
+DEFAULT_MEMORY_LIMIT_MB = 1536
+RENDER_SHARE = 0.375        # of the limit, split between the render caches
+TEXT_SHARE = 0.0625         # of the limit, split between the text handlers
+MB = 1024 * 1024
+MIN_CACHE_BYTES = 8 * MB
+CHECK_INTERVAL_MS = 2000
+RETRIM_STEP = 0.05          # of the limit the process must grow by before trimming again
+TRIM_NEIGHBOURS = 1         # pages kept on each side of the current one when trimming
+
+
+def release_heap():
+    """Return freed heap pages to the OS (glibc only; a no-op elsewhere)."""
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def process_rss():
+    """
+    Resident set size of this process in bytes, or None if unknown.
+
+    Read from /proc on Linux and GetProcessMemoryInfo on Windows; other
+    platforms only get the estimates.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", ctypes.c_ulong),
+                        ("PageFaultCount", ctypes.c_ulong),
+                        ("PeakWorkingSetSize", ctypes.c_size_t),
+                        ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t),
+                        ("PeakPagefileUsage", ctypes.c_size_t)]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        try:
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except (AttributeError, OSError):
+            return None
+    return None
+
+
+class MemoryBudget(QObject):
+    """
+    Memory ceiling shared by all viewer environments.
+
+    Parent: CitationLinkerApp
+    Children: QTimer
+
+    attach() registers an environment's RenderCache, TextHandler and
+    TextIndex; their budgets are set from the limit (RENDER_SHARE and
+    TEXT_SHARE, split evenly). Every CHECK_INTERVAL_MS the resident size
+    (or, where it cannot be read, the cache estimates plus the registry's
+    document estimates) is compared with the limit; above it every cache
+    is trimmed to the pages around the current one, page objects are
+    released, the QPdfDocuments are reloaded (PDFium keeps data of every
+    page visited) and MuPDF's resource store is emptied. report() is the
+    per-environment and per-document telemetry readout.
+    """
+    trimmed = Signal(dict)
+
+    def __init__(self, parent=None, limit_mb=DEFAULT_MEMORY_LIMIT_MB, registry=None):
+        """Initialize the budget; checking starts with start()."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.registry = registry
+        self.limit_bytes = int(limit_mb * MB)
+        self.environments = []      # {"type", "text_handler", "render_cache", "text_index"}
+        self.trim_floor = 0         # usage after the last trim; no retrim until it grows RETRIM_STEP
+        self.timer = QTimer(self)
+
+        ### counters
+        self.checks = 0
+        self.trims = 0
+        self.freed_bytes = 0
+        self.peak_bytes = 0
+
+        ### options
+        self.timer.setInterval(CHECK_INTERVAL_MS)
+
+        ### signals
+        self.timer.timeout.connect(self.check)
+
+    ### methods
+    def attach(self, env_type, text_handler=None, render_cache=None, text_index=None):
+        """Register one viewer environment and rebalance the cache budgets."""
+        self.environments.append({"type": env_type,
+                                  "text_handler": text_handler,
+                                  "render_cache": render_cache,
+                                  "text_index": text_index})
+        self.apply_limits()
+
+    def text_handlers(self):
+        """Distinct text handlers of the environments (alt viewers share one)."""
+        handlers = []
+        for env in self.environments:
+            if env["text_handler"] is not None and env["text_handler"] not in handlers:
+                handlers.append(env["text_handler"])
+        return handlers
+
+    def apply_limits(self):
+        """Split the render and text shares of the limit between the registered caches."""
+        render_caches = [env["render_cache"] for env in self.environments if env["render_cache"] is not None]
+        if render_caches:
+            render_bytes = int(self.limit_bytes * RENDER_SHARE / len(render_caches))
+            for render_cache in render_caches:
+                render_cache.set_budget(max(MIN_CACHE_BYTES, min(DEFAULT_BUDGET_BYTES, render_bytes)))
+        handlers = self.text_handlers()
+        if handlers:
+            text_bytes = max(MIN_CACHE_BYTES, int(self.limit_bytes * TEXT_SHARE / len(handlers)))
+            for text_handler in handlers:
+                text_handler.set_cache_budget(text_bytes)
+
+    def set_limit(self, limit_mb):
+        """Change the ceiling."""
+        self.limit_bytes = int(limit_mb * MB)
+        self.trim_floor = 0
+        self.apply_limits()
+
+    def start(self):
+        """Check the ceiling periodically."""
+        self.timer.start()
+
+    def stop(self):
+        """Stop periodic checks."""
+        self.timer.stop()
+
+    def estimated_bytes(self):
+        """Sum of the cache, index and document estimates."""
+        total = 0
+        for env in self.environments:
+            if env["render_cache"] is not None:
+                total += env["render_cache"].bytes_used
+            if env["text_index"] is not None:
+                total += env["text_index"].bytes_estimate
+        total += sum(text_handler.cache_bytes for text_handler in self.text_handlers())
+        if self.registry is not None:
+            total += sum(item["estimated_bytes"] for item in self.registry.memory_report())
+        return total
+
+    def usage_bytes(self):
+        """Resident size of the process, or the estimate where it cannot be read."""
+        rss = process_rss()
+        return rss if rss is not None else self.estimated_bytes()
+
+    @Slot()
+    def check(self):
+        """Trim the caches if usage is above the ceiling (and grew since the last trim)."""
+        self.checks += 1
+        usage = self.usage_bytes()
+        self.peak_bytes = max(self.peak_bytes, usage)
+        if usage <= self.limit_bytes:
+            self.trim_floor = 0
+            return False
+        if self.trim_floor and usage < self.trim_floor + self.limit_bytes * RETRIM_STEP:
+            return False
+        self.trim()
+        self.trim_floor = self.usage_bytes()
+        return True
+
+    def trim(self):
+        """
+        Drop everything not needed for the pages on screen.
+
+        Returns:
+            dict: bytes freed per cache kind and documents reloaded
+        """
+        freed = {"render": 0, "text": 0, "documents": 0}
+        keep_pages = set()
+        render_caches = [env["render_cache"] for env in self.environments if env["render_cache"] is not None]
+        for render_cache in render_caches:
+            keep = self.pages_around(render_cache.current_page)
+            keep_pages |= keep
+            freed["render"] += render_cache.trim(keep)
+        for text_handler in self.text_handlers():
+            keep = keep_pages | self.pages_around(text_handler.curr_page_idx)
+            freed["text"] += text_handler.trim_caches(keep)
+        if self.registry is not None:
+            # no renders may run on a document while it is closed and reloaded
+            for render_cache in render_caches:
+                render_cache.suspend()
+            freed["documents"] = self.registry.reload_qt_documents()
+            for render_cache in render_caches:
+                render_cache.resume()
+        # decoded fonts and images of every open document
+        pymupdf.TOOLS.store_shrink(100)
+        release_heap()
+        self.trims += 1
+        self.freed_bytes += freed["render"] + freed["text"]
+        print(f"memory ceiling {self.limit_bytes // MB} MB reached: freed "
+              f"{freed['render'] / 1e6:.1f} MB rendered pages, {freed['text'] / 1e6:.1f} MB page data, "
+              f"reloaded {freed['documents']} documents")
+        self.trimmed.emit(freed)
+        return freed
+
+    def pages_around(self, page_idx):
+        """page_idx and its TRIM_NEIGHBOURS neighbours, empty if page_idx is None."""
+        if page_idx is None:
+            return set()
+        return set(range(page_idx - TRIM_NEIGHBOURS, page_idx + TRIM_NEIGHBOURS + 1))
+
+    def report(self):
+        """
+        Return the memory telemetry readout.
+
+        Environments list their render cache, text handler (once per
+        shared handler) and search index; documents add the registry's
+        parse estimates to the caches of the environments showing them.
+        """
+        environments = []
+        documents = {}
+        seen_handlers = []
+        for env in self.environments:
+            item = {"type": env["type"], "render": None, "text": None, "search": None, "path": ""}
+            if env["render_cache"] is not None:
+                item["render"] = env["render_cache"].stats()
+            text_handler = env["text_handler"]
+            if text_handler is not None:
+                if text_handler.document:
+                    item["path"] = os.path.abspath(text_handler.document.name)
+                if text_handler not in seen_handlers:
+                    seen_handlers.append(text_handler)
+                    item["text"] = text_handler.memory_stats()
+            if env["text_index"] is not None:
+                item["search"] = env["text_index"].memory_stats()
+            item["bytes"] = sum(part["bytes"] for part in (item["render"], item["text"], item["search"]) if part)
+            environments.append(item)
+            if item["path"]:
+                documents.setdefault(item["path"], {"path": item["path"], "cache_bytes": 0})
+                documents[item["path"]]["cache_bytes"] += item["bytes"]
+
+        if self.registry is not None:
+            for entry in self.registry.memory_report():
+                document = documents.setdefault(entry["path"], {"path": entry["path"], "cache_bytes": 0})
+                document.update(entry)
+        for document in documents.values():
+            document["total_bytes"] = document["cache_bytes"] + document.get("estimated_bytes", 0)
+
+        return {
+            "limit_bytes": self.limit_bytes,
+            "rss_bytes": process_rss(),
+            "estimated_bytes": self.estimated_bytes(),
+            "peak_bytes": self.peak_bytes,
+            "checks": self.checks,
+            "trims": self.trims,
+            "freed_bytes": self.freed_bytes,
+            "environments": environments,
+            "documents": list(documents.values()),
+        }
+
+    def print_report(self):
+        """Print report in a readable form."""
+        report = self.report()
+        rss = report["rss_bytes"]
+        print("=========================")
+        print(f"memory: {'?' if rss is None else f'{rss / 1e6:.0f}'} MB resident, "
+              f"~{report['estimated_bytes'] / 1e6:.0f} MB estimated, limit {report['limit_bytes'] // MB} MB, "
+              f"{report['trims']} trims ({report['freed_bytes'] / 1e6:.1f} MB freed)")
+        for env in report["environments"]:
+            parts = []
+            if env["render"]:
+                parts.append(f"render {env['render']['pages']} pages "
+                             f"{env['render']['bytes'] / 1e6:.1f}/{env['render']['budget_bytes'] / 1e6:.0f} MB")
+            if env["text"]:
+                parts.append(f"text {env['text']['snapshots']} snapshots + {env['text']['word_layouts']} layouts "
+                             f"~{env['text']['bytes'] / 1e6:.1f}/{env['text']['budget_bytes'] / 1e6:.0f} MB, "
+                             f"live page {env['text']['live_page']}")
+            if env["search"]:
+                parts.append(f"search index {env['search']['pages']} pages ~{env['search']['bytes'] / 1e6:.1f} MB")
+            print(f"  {env['type']}: " + ("; ".join(parts) if parts else "empty"))
+        for document in report["documents"]:
+            print(f"  {os.path.basename(document['path'])}: {document.get('pages', 0)} pages, "
+                  f"~{document['total_bytes'] / 1e6:.1f} MB "
+                  f"(parses {document.get('estimated_bytes', 0) / 1e6:.1f} MB, "
+                  f"caches {document['cache_bytes'] / 1e6:.1f} MB)")
+        print("=========================")
@@ -0,0 +1,91 @@
+"""
+Uniform grid spatial index for rectangles in PDF page coordinates.
+Used for hit-testing annotations, links and words without linear scans.
+"""
+
+
+class SpatialIndex:
+    """
+    Grid bucket index of axis-aligned rectangles.
+
+    Parent: None
+    Children: None
+
+    Rectangles are stored as (x0, y0, x1, y1) tuples in page space (points).
+    Each entry carries a key and a z value; query results are returned in
+    descending z order so the topmost entry comes first.
+    """
+    def __init__(self, cell_size=32.0):
+        """Initialize empty index with given bucket size in points."""
+        self.cell_size = float(cell_size)
+        self.buckets = {}
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def cell_range(self, x0, y0, x1, y1):
+        """Return inclusive bucket coordinates covered by a rectangle."""
+        size = self.cell_size
+        return (int(x0 // size), int(y0 // size),
+                int(x1 // size), int(y1 // size))
+
+    def insert(self, key, rect, z=None):
+        """
+        Add a rectangle to the index.
+
+        Args:
+            key: Value returned by queries (e.g. ("link", idx))
+            rect: (x0, y0, x1, y1) in page coordinates
+            z: Stacking order, higher is on top (defaults to insertion order)
+        """
+        x0, y0, x1, y1 = rect
+        if x0 > x1:
+            x0, x1 = x1, x0
+        if y0 > y1:
+            y0, y1 = y1, y0
+        entry_id = len(self.entries)
+        self.entries.append((key, (x0, y0, x1, y1), entry_id if z is None else z))
+
+        cx0, cy0, cx1, cy1 = self.cell_range(x0, y0, x1, y1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.buckets.setdefault((cx, cy), []).append(entry_id)
+
+    def query_point(self, x, y):
+        """Return keys of all rectangles containing (x, y), topmost first."""
+        size = self.cell_size
+        bucket = self.buckets.get((int(x // size), int(y // size)))
+        if not bucket:
+            return []
+
+        hits = []
+        for entry_id in bucket:
+            key, (x0, y0, x1, y1), z = self.entries[entry_id]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                hits.append((z, key))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [key for z, key in hits]
+
+    def query_rect(self, rect):
+        """Return keys of all rectangles intersecting rect, topmost first."""
+        qx0, qy0, qx1, qy1 = rect
+        if qx0 > qx1:
+            qx0, qx1 = qx1, qx0
+        if qy0 > qy1:
+            qy0, qy1 = qy1, qy0
+
+        seen = set()
+        hits = []
+        cx0, cy0, cx1, cy1 = self.cell_range(qx0, qy0, qx1, qy1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for entry_id in self.buckets.get((cx, cy), ()):
+                    if entry_id in seen:
+                        continue
+                    seen.add(entry_id)
+                    key, (x0, y0, x1, y1), z = self.entries[entry_id]
+                    if x0 <= qx1 and qx0 <= x1 and y0 <= qy1 and qy0 <= y1:
+                        hits.append((z, key))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [key for z, key in hits]
@@ -3,10 +3,38 @@ PDF text extraction and annotation management using PyMuPDF.
 Handles text selection, annotation operations, and link creation.
 """
 import  re
+import  time
 import  pymupdf
-from    PySide6.QtCore                  import  QPointF, QPoint, QRect, QSize, QObject, Slot
+from    collections                     import  OrderedDict
+from    PySide6.QtCore                  import  QPointF, QPoint, QRect, QSize, QObject, Signal, Slot
 
 from    qtapp.utils.qtToPymuUtils       import  rect_py_to_qt, rect_qt_to_py, px_to_dpi, dpi_to_px, point_py_to_qt, point_to_px
+from    qtapp.utils.ArticleRanges       import  ArticleRanges
+from    qtapp.utils.qtToPymuUtils       import  rects_to_array, array_rect, dpi_to_px_batch, points_to_px_batch
+from    qtapp.utils.SpatialIndex        import  SpatialIndex
+from    qtapp.utils.WordLayout          import  WordLayout
+from    qtapp.utils.EditJournal         import  EditJournal
+from    qtapp.utils.annotRecords        import  capture_annot, restore_annot
+
+
+BULK_ACTIONS = ("delete", "retarget", "retype", "recolor")
+RECT_TOLERANCE = 0.5       # points; rects come back from the PDF slightly rounded
+RETYPE_FUNCS = {
+    "Underline": "add_underline_annot",
+    "Highlight": "add_highlight_annot",
+    "StrikeOut": "add_strikeout_annot",
+    "Squiggly":  "add_squiggly_annot",
+}
+DEFAULT_CACHE_BUDGET_BYTES = 48 * 1024 * 1024
+# estimated cache cost per page (tracemalloc on synthetic volumes)
+SNAPSHOT_BASE_BYTES = 2048
+SNAPSHOT_ITEM_BYTES = 2048  # one annotation or link with its px/viewport copies
+WORD_BYTES = 512            # one word of a WordLayout with its spatial index entry
+
+
+def rects_match(rect_a, rect_b):
+    """True if two rects are equal within RECT_TOLERANCE."""
+    return all(abs(a - b) <= RECT_TOLERANCE for a, b in zip(rect_a, rect_b))
 
 
 class TextHandler(QObject):
@@ -23,7 +51,16 @@ class TextHandler(QObject):
     - Link creation and destination management
     - Year extraction from citations
     - Configuration data management (delimiters, special cases, articles)
+    - Bulk link/annotation edits over a page, an article or the document
+      (bulk_edit), announced once through bulk_edit_finished
+
+    Memory: page snapshots and word layouts share one LRU bounded by
+    cache_budget_bytes (estimated sizes); self.page is the only PyMuPDF
+    page object held, from load_page() until another page is loaded, the
+    page is invalidated, or release_page()/trim_caches() drops it.
     """
+    bulk_edit_finished = Signal(dict)
+
     def _del__(self):
         """Clean up document resources."""
         if self.document:
@@ -32,38 +69,60 @@ class TextHandler(QObject):
             except Exception:
                 pass
 
-    def __init__(self, parent=None):
-        """Initialize text handler."""
+    def __init__(self, parent=None, registry=None):
+        """Initialize text handler, optionally borrowing documents from a DocumentRegistry."""
         super().__init__(parent)
 
 
         self.parent = parent
+        self.registry = registry
         self.pdfViewer = None
         self.document = ""
         self.page = 0
+        self.annot_objects = None # xref -> pymupdf.Annot of self.page, built on first lookup
         self.selected_text = ""
         self.year_rect = None
         self.year_page = None
         self.translated_rect = pymupdf.Rect()
-        self.article_cache = []
+        self.article_cache = ArticleRanges()
         self.delimiters = []
         self.special_cases = []
-        self.curr_annots = []
-        self.curr_links = []
         self.curr_link_selection = {}
+        self.curr_page_idx = None
+        self.page_cache = {}
+        self.word_cache = {}
+        self.cache_order = OrderedDict() # ("page"|"word", page_idx) -> estimated bytes, LRU first
+        self.cache_bytes = 0
+        self.cache_budget_bytes = DEFAULT_CACHE_BUDGET_BYTES
+        self.cache_evictions = 0
+        self.cache_generation = 0 # bumped on every invalidation; part of the overlay cache key
+        self.journal = EditJournal(self)
 
     def set_viewer(self, viewer):
         """Associate this handler with a PDF viewer."""
         self.pdfViewer = viewer
 
     def assign_document(self, doc):
-        """Open and assign a PyMuPDF document from file path."""
-        self.document = pymupdf.open(doc)
+        """Open (or borrow from the registry) and assign a PyMuPDF document from file path."""
+        if self.registry:
+            new_document = self.registry.acquire_pymu(doc)
+            if self.document:
+                self.registry.release(self.document)
+            self.document = new_document
+        else:
+            self.document = pymupdf.open(doc)
+        self.invalidate_page_cache()
+        self.journal.load(doc)
 
     def close_document(self):
-        """Close the currently open PyMuPDF document."""
+        """Close (or return to the registry) the currently open PyMuPDF document."""
         if self.document:
-            self.document.close()
+            if self.registry:
+                self.registry.release(self.document)
+            else:
+                self.document.close()
+            self.document = ""
+            self.invalidate_page_cache()
         else:
             print("no document open")
 
@@ -71,68 +130,146 @@ class TextHandler(QObject):
         """Clear all configuration data (article cache, delimiters, special cases)."""
         self.year_page = None
         self.year_rect = None
-        self. article_cache = []
+        self.article_cache = ArticleRanges()
         self.delimiters = []
         self.special_cases = []
 
     def find_text(self, page_idx, rectF):
         """Extract text from specified rectangular region on page."""
-        self.page = self.document.load_page(page_idx)
         rect_fitz = rect_qt_to_py(rectF)
-        self.selected_text = self.page.get_text("text", clip=rect_fitz)
+        # clip semantics (characters inside rect, original line breaks) feed the config
+        self.selected_text = self.load_page(page_idx).get_text("text", clip=rect_fitz)
         # print("delimiters:", self.delimiters)
         # print("fitz rect: ", rect_fitz)
         # print("fitz text: ", self.selected_text)
         # print("delimiters:", self.delimiters)
         # print("special_cases", self.special_cases)
 
-    def get_all_links(self, page_idx, zoom_factor):
-        """Get all links on page with coordinates transformed for display."""
-        doc = self.document
-        page = doc[page_idx]
-        self.page = page
-        links = []
-        self.curr_links = page.get_links()
-
+    def load_page(self, page_idx):
+        """Return page object for page_idx, reusing the current one if possible."""
+        if not isinstance(self.page, pymupdf.Page) or self.page.number != page_idx:
+            self.release_page()
+            self.page = self.document[page_idx]
+        return self.page
 
-        for link in self.curr_links:
-            qt_rectF = rect_py_to_qt(link["from"])
-            qt_rect = dpi_to_px({
-                                "rect": qt_rectF,
-                                "current_zoom": zoom_factor
-                                })
-            link_data = {
-                "kind": link.get("kind"),
-                "from": qt_rect,
-                "page": link.get("page"),
-                "to": point_to_px(point_py_to_qt(link["to"]), zoom_factor) if "to" in link else None,
-                "to_dpi": point_py_to_qt(link["to"]) if "to" in link else qt_rectF.topLeft(),
-                "uri": link.get("uri")
-            }
-            links.append(link_data)
-        return links
+    def release_page(self):
+        """Drop the live page object and its annotation map."""
+        self.page = 0
+        self.annot_objects = None
+
+    def cache_lookup(self, kind, page_idx):
+        """Return the cached snapshot ("page") or word layout ("word") of page_idx, or None."""
+        value = (self.page_cache if kind == "page" else self.word_cache).get(page_idx)
+        if value is not None and (kind, page_idx) in self.cache_order:
+            self.cache_order.move_to_end((kind, page_idx))
+        return value
+
+    def cache_store(self, kind, page_idx, value, size):
+        """Cache value with its estimated size and evict the least recently used pages beyond the budget."""
+        (self.page_cache if kind == "page" else self.word_cache)[page_idx] = value
+        self.cache_bytes -= self.cache_order.pop((kind, page_idx), 0)
+        self.cache_order[(kind, page_idx)] = size
+        self.cache_bytes += size
+        self.evict_caches(keep={page_idx, self.curr_page_idx})
+
+    def cache_drop(self, kind, page_idx):
+        """Remove one cached snapshot or word layout."""
+        (self.page_cache if kind == "page" else self.word_cache).pop(page_idx, None)
+        self.cache_bytes -= self.cache_order.pop((kind, page_idx), 0)
+
+    def evict_caches(self, keep=()):
+        """Drop least recently used entries until the caches fit the budget; pages in keep stay."""
+        while self.cache_bytes > self.cache_budget_bytes:
+            victim = next((key for key in self.cache_order if key[1] not in keep), None)
+            if victim is None:
+                break
+            self.cache_drop(*victim)
+            self.cache_evictions += 1
+
+    def set_cache_budget(self, budget_bytes):
+        """Change the cache budget, evicting at once if it shrank."""
+        self.cache_budget_bytes = budget_bytes
+        self.evict_caches(keep={self.curr_page_idx})
+
+    def trim_caches(self, keep_pages=()):
+        """
+        Drop every cached page except keep_pages and release the page object
+        unless it is one of them (memory ceiling reached).
+
+        Returns:
+            int: estimated bytes freed
+        """
+        freed = self.cache_bytes
+        for kind, page_idx in list(self.cache_order):
+            if page_idx not in keep_pages:
+                self.cache_drop(kind, page_idx)
+        if not isinstance(self.page, pymupdf.Page) or self.page.number not in keep_pages:
+            self.release_page()
+        return freed - self.cache_bytes
+
+    def memory_stats(self):
+        """Return cache sizes and the live page (telemetry)."""
+        return {
+            "snapshots": len(self.page_cache),
+            "word_layouts": len(self.word_cache),
+            "bytes": self.cache_bytes,
+            "budget_bytes": self.cache_budget_bytes,
+            "evictions": self.cache_evictions,
+            "live_page": self.page.number if isinstance(self.page, pymupdf.Page) else None,
+        }
 
-    def get_all_annotations(self, page_idx, zoom_factor):
-        """Get all annotations on page with coordinates transformed for display."""
-        doc = self.document
-        self.curr_page_idx = page_idx
-        page = doc[page_idx]
-        self.page = page
-        annotations = []
-        self.curr_annots = page.annots()
-
-        # print("\n" + "="*60)
-        # print("page annotations")
-        # print("="*60)
-        for annot in self.curr_annots:
-            qt_rectF = rect_py_to_qt(annot.rect)
-            qt_rect = dpi_to_px({
-                                "rect": qt_rectF,
-                                "current_zoom": zoom_factor
-                                })
+    def get_word_layout(self, page_idx):
+        """
+        Return cached word layout for page_idx.
+
+        Text does not change when links or annotations are edited, so layouts
+        are only dropped when the document is reassigned.
+        """
+        layout = self.cache_lookup("word", page_idx)
+        if layout is None:
+            layout = WordLayout.from_page(self.load_page(page_idx))
+            self.cache_store("word", page_idx, layout, len(layout) * WORD_BYTES)
+        return layout
+
+    def invalidate_page_cache(self, page_idx=None, keep_page=False):
+        """
+        Drop cached snapshot for one page, or for all pages if page_idx is None.
+
+        keep_page keeps the live page object and its annotation map (edits
+        that only touched annotations and updated the map themselves); link
+        edits need a fresh page object, which does not see them otherwise.
+        """
+        self.cache_generation += 1
+        if page_idx is None:
+            self.page_cache.clear()
+            self.word_cache.clear()
+            self.cache_order.clear()
+            self.cache_bytes = 0
+            self.release_page()
+        else:
+            self.cache_drop("page", page_idx)
+            if (not keep_page and isinstance(self.page, pymupdf.Page)
+                    and self.page.number == page_idx):
+                self.release_page()
+
+    def get_page_snapshot(self, page_idx):
+        """
+        Return cached page-space annotation/link data for page_idx.
+
+        The snapshot is built once per page from PyMuPDF and reused until one
+        of the mutating paths invalidates it.
+        """
+        snapshot = self.cache_lookup("page", page_idx)
+        if snapshot is not None:
+            return snapshot
+
+        page = self.load_page(page_idx)
+        annots = []
+        for annot in page.annots():
             annot_data = {
+                'xref': annot.xref,
                 'type': annot.type[1],
-                'rect': qt_rect,
+                'rect': rect_py_to_qt(annot.rect),
                 'color': annot.colors.get('stroke', None),
                 'opacity': annot.opacity,
                 'border': annot.border,
@@ -145,62 +282,590 @@ class TextHandler(QObject):
                     annot_data['link_type'] = link['kind']
                     annot_data['page_dest'] = link.get('page', None)
                     annot_data['uri'] = link.get('uri', None)
+            annots.append(annot_data)
 
-            annotations.append(annot_data)
-            # print(annot_data)
-
-
-        # print("\n" + "="*60)
-        # print("="*60)
-
-
-        return annotations
+        raw_links = page.get_links()
+        links = []
+        for link in raw_links:
+            qt_rectF = rect_py_to_qt(link["from"])
+            links.append({
+                "xref": link.get("xref"),
+                "kind": link.get("kind"),
+                "from": qt_rectF,
+                "page": link.get("page"),
+                "to": point_py_to_qt(link["to"]) if "to" in link else None,
+                "to_dpi": point_py_to_qt(link["to"]) if "to" in link else qt_rectF.topLeft(),
+                "uri": link.get("uri")
+            })
+
+        annot_rects = rects_to_array(annot["rect"] for annot in annots)
+        link_rects = rects_to_array(link["from"] for link in raw_links)
+
+        # z-order: annotations sit above links, later items above earlier ones
+        hit_index = SpatialIndex()
+        for idx, link in enumerate(links):
+            hit_index.insert(("link", link["xref"]), array_rect(link_rects, idx), z=idx)
+        for idx, annot in enumerate(annots):
+            hit_index.insert(("annot", annot["xref"]), array_rect(annot_rects, idx), z=len(links) + idx)
+
+        snapshot = {
+            "annots": annots,
+            "links": links,
+            "raw_links": raw_links,
+            "annot_index": {annot["xref"]: idx for idx, annot in enumerate(annots)},
+            "link_index": {link["xref"]: idx for idx, link in enumerate(links)},
+            "annot_rects": annot_rects,
+            "link_rects": link_rects,
+            "hit_index": hit_index,
+            "zoom": None,
+            "annots_px": [],
+            "links_px": [],
+            "viewport_key": None,
+            "annots_viewport": [],
+            "links_viewport": [],
+        }
+        self.cache_store("page", page_idx, snapshot,
+                         SNAPSHOT_BASE_BYTES + (len(annots) + len(links)) * SNAPSHOT_ITEM_BYTES)
+        return snapshot
+
+    def snapshot_to_px(self, snapshot, zoom_factor):
+        """Derive zoom-dependent pixel rects from a page snapshot (cached per zoom)."""
+        if snapshot["zoom"] == zoom_factor:
+            return snapshot
+
+        annot_rects = dpi_to_px_batch(snapshot["annot_rects"], zoom_factor)
+        annots_px = []
+        for annot, rect in zip(snapshot["annots"], annot_rects):
+            annot_data = dict(annot)
+            annot_data["rect"] = rect
+            annots_px.append(annot_data)
+
+        link_rects = dpi_to_px_batch(snapshot["link_rects"], zoom_factor)
+        link_points = points_to_px_batch([link["to"] for link in snapshot["links"]], zoom_factor)
+        links_px = []
+        for link, rect, point in zip(snapshot["links"], link_rects, link_points):
+            link_data = dict(link)
+            link_data["from"] = rect
+            link_data["to"] = point
+            links_px.append(link_data)
+
+        snapshot["zoom"] = zoom_factor
+        snapshot["annots_px"] = annots_px
+        snapshot["links_px"] = links_px
+        return snapshot
+
+    def get_viewport_rects(self, page_idx, zoom_factor, offset):
+        """
+        Return (annot_rects, link_rects) for page_idx as viewport QRects.
+
+        offset is the page origin in the viewport (TextSelector.page_to_viewport_offset);
+        all rects are converted in one batch and reused while zoom and offset are unchanged.
+        """
+        snapshot = self.get_page_snapshot(page_idx)
+        key = (zoom_factor, offset)
+        if snapshot["viewport_key"] != key:
+            dx, dy = offset
+            snapshot["annots_viewport"] = dpi_to_px_batch(snapshot["annot_rects"], zoom_factor, dx, dy)
+            snapshot["links_viewport"] = dpi_to_px_batch(snapshot["link_rects"], zoom_factor, dx, dy)
+            snapshot["viewport_key"] = key
+        return snapshot["annots_viewport"], snapshot["links_viewport"]
 
-    def get_annot_from_idx(self, annot_idx):
-        """Retrieve annotation object by index from current page."""
-        for idx, annot in enumerate(self.page.annots()):
-            if idx == annot_idx:
-                return annot
-        return None
+    def get_all_links(self, page_idx, zoom_factor):
+        """Get all links on page with coordinates transformed for display."""
+        snapshot = self.snapshot_to_px(self.get_page_snapshot(page_idx), zoom_factor)
+        self.curr_page_idx = page_idx
+        return snapshot["links_px"]
 
-    def annot_action(self, annot_idx, action, new_rect=None):
+    def get_all_annotations(self, page_idx, zoom_factor):
+        """Get all annotations on page with coordinates transformed for display."""
+        snapshot = self.snapshot_to_px(self.get_page_snapshot(page_idx), zoom_factor)
+        self.curr_page_idx = page_idx
+        return snapshot["annots_px"]
+
+    def hit_test(self, page_idx, point):
+        """
+        Return (kind, xref) pairs under a page-space point, topmost first.
+
+        kind is "annot" or "link"; xref is the PDF object number of the item
+        (see get_item_px / get_annot / get_link).
+        """
+        snapshot = self.get_page_snapshot(page_idx)
+        return snapshot["hit_index"].query_point(point.x(), point.y())
+
+    def get_item_px(self, page_idx, kind, xref, zoom_factor):
+        """Display dict of the annotation or link with xref on page_idx, None if it is gone."""
+        snapshot = self.snapshot_to_px(self.get_page_snapshot(page_idx), zoom_factor)
+        idx = snapshot[kind + "_index"].get(xref)
+        if idx is None:
+            return None
+        return snapshot["annots_px" if kind == "annot" else "links_px"][idx]
+
+    def get_annot(self, annot_xref, page_idx=None):
+        """
+        Return the live annotation with annot_xref on page_idx (default: current page).
+
+        Annotations of the loaded page are mapped by xref on first lookup; the
+        map is updated by the editing paths and dropped with the page object.
+        """
+        page = self.load_page(self.curr_page_idx if page_idx is None else page_idx)
+        if self.annot_objects is None:
+            self.annot_objects = {annot.xref: annot for annot in page.annots()}
+        return self.annot_objects.get(annot_xref)
+
+    def get_link(self, link_xref, page_idx=None):
+        """Return the link dict with link_xref on page_idx (default: current page), or None."""
+        page_idx = self.curr_page_idx if page_idx is None else page_idx
+        snapshot = self.get_page_snapshot(page_idx)
+        idx = snapshot["link_index"].get(link_xref)
+        return None if idx is None else snapshot["raw_links"][idx]
+
+    def forget_annot(self, annot_xref):
+        """Remove a deleted annotation from the live map."""
+        if self.annot_objects is not None:
+            self.annot_objects.pop(annot_xref, None)
+
+    def remember_annot(self, annot):
+        """Add a new annotation of the loaded page to the live map."""
+        if self.annot_objects is not None and annot.parent.number == self.page.number:
+            self.annot_objects[annot.xref] = annot
+
+    def annot_action(self, annot_xref, action, new_rect=None, page_idx=None):
         """Perform action on annotation (delete, toggle_type, update_rect)."""
-        annot = self.get_annot_from_idx(annot_idx)
+        annot = self.get_annot(annot_xref, page_idx)
 
         if not annot:
+            print(f"Annotation {annot_xref} no longer exists.")
             return
 
         if action == "delete":
+            self.journal.record("delete annotation", [self.annot_undo_record(annot)])
+            self.forget_annot(annot_xref)
             self.page.delete_annot(annot)
-            # annot.delete()
-            print(f"Annotation {annot_idx} deleted.")
+            print(f"Annotation {annot_xref} deleted.")
         elif action == "toggle_type":
-            if annot.type[1] == "Underline":
-                annot.set_info(type=pymupdf.PDF_ANNOT_HIGHLIGHT)
-                print(f"Annotation {annot_idx} changed to Highlight.")
-            elif annot.type[1] == "Highlight":
-                annot.set_info(type=pymupdf.PDF_ANNOT_UNDERLINE)
-                print(f"Annotation {annot_idx} changed to Underline.")
+            if annot.type[1] in ("Underline", "Highlight"):
+                old_type = annot.type[1]
+                new_type = "Highlight" if old_type == "Underline" else "Underline"
+                new_annot = self.retype_annot(self.page, annot, new_type)
+                self.journal.record(f"change annotation to {new_type}",
+                                    [{"op": "retype", "page": self.page.number, "xref": new_annot.xref,
+                                      "rect": tuple(new_annot.rect), "current_type": new_type,
+                                      "type": old_type}])
+                print(f"Annotation {annot_xref} changed to {new_type}.")
             else:
                 print("Annotation type is not Underline or Highlight.")
         elif action == "update_rect" and new_rect is not None:
             annot.set_rect(new_rect)
-            print(f"Annotation {annot_idx} rect updated.")
+            print(f"Annotation {annot_xref} rect updated.")
         else:
             print("Invalid action or missing new_rect.")
+        self.invalidate_page_cache(self.page.number, keep_page=True)
 
-    def link_action(self, link_idx, action, new_dest=None):
+    def link_action(self, link_xref, action, new_dest=None, page_idx=None):
         """Perform action on link (delete or change destination)."""
-        link = self.curr_links[link_idx]
+        page_idx = self.curr_page_idx if page_idx is None else page_idx
+        link = self.get_link(link_xref, page_idx)
 
         if not link:
+            print(f"Link {link_xref} no longer exists.")
             return
 
+        page = self.load_page(page_idx)
         if action == "delete":
-            self.page.delete_link(link)
+            self.journal.record("delete link", [{"op": "insert_link", "page": page_idx, "link": dict(link)}])
+            page.delete_link(link)
         elif action == "change":
+            self.journal.record("change link", [{"op": "update_link", "page": page_idx, "link": dict(link)}])
+            link = dict(link)
             link["to"] = new_dest
-            self.page.update_link(link)
+            page.update_link(link)
+        self.invalidate_page_cache(page.number)
+
+    ### bulk editing
+    def scope_pages(self, scope, page_idx=None, article=None):
+        """
+        Page indices covered by an edit scope.
+
+        Args:
+            scope: "page" (page_idx), "article" (article dict, or the article
+                   containing page_idx) or "document"
+        """
+        if scope == "page":
+            return [page_idx]
+        if scope == "article":
+            article = article or self.article_cache.find(page_idx)
+            if article is None:
+                return []
+            return list(range(article["first"], article["last"] + 1))
+        if scope == "document":
+            return list(range(self.document.page_count))
+        raise ValueError(f"unknown edit scope: {scope}")
+
+    def bulk_edit(self, action, pages, kind="all", select=None, value=None):
+        """
+        Apply one edit to every matching annotation/link on pages, one pass per page.
+
+        Args:
+            action: "delete", "retarget" (links: value = {"page", "to"} or
+                    callable(link) returning one/None), "retype" (annotations:
+                    value = "Underline", "Highlight", ... or "toggle") or
+                    "recolor" (value = stroke color, RGB floats 0..1)
+            pages: Page indices, e.g. from scope_pages()
+            kind: "annot", "link" or "all"
+            select: Optional predicate on item dicts ({"kind", "page", "type",
+                    "rect", "color", "xref"} plus "link" for links)
+
+        All pages are planned before anything is changed; if applying fails,
+        the pages edited so far are rolled back from their undo records.
+        Caches are invalidated per page and bulk_edit_finished is emitted
+        once, so viewers repaint once.
+
+        Returns:
+            dict: report with counts, per-action "undo" records and timing
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"unknown bulk action: {action}")
+        if action == "retarget":
+            kind = "link"
+        elif action == "retype":
+            kind = "annot"
+        if action in ("retarget", "retype", "recolor") and value is None:
+            raise ValueError(f"{action} needs a value")
+
+        start = time.perf_counter()
+        plan = []
+        for page_idx in sorted(set(pages)):
+            items = self.collect_page_items(self.load_page(page_idx), kind, select)
+            if items:
+                plan.append((page_idx, items))
+        planned = time.perf_counter()
+
+        report = {"action": action, "kind": kind, "pages": 0, "annots": 0, "links": 0,
+                  "skipped": 0, "undo": [], "error": None, "rolled_back": 0}
+        try:
+            for page_idx, items in plan:
+                page = self.load_page(page_idx)
+                self.apply_page_edits(page, action, items, value, report)
+                report["pages"] += 1
+        except Exception as e:
+            report["error"] = f"{type(e).__name__}: {e}"
+            print(f"bulk {action} failed on page {page_idx + 1}, rolling back: {report['error']}")
+            self.apply_edit_records(report["undo"])
+            report["rolled_back"] = len(report["undo"])
+            report.update({"pages": 0, "annots": 0, "links": 0, "undo": []})
+
+        for page_idx, _ in plan:
+            self.invalidate_page_cache(page_idx)
+        self.journal.record(f"{action} {kind}", report["undo"])
+        report["plan_s"] = planned - start
+        report["apply_s"] = time.perf_counter() - planned
+        report["elapsed_s"] = time.perf_counter() - start
+        print(f"bulk {action}: {report['annots']} annotations, {report['links']} links "
+              f"on {report['pages']} pages in {report['elapsed_s'] * 1000:.1f} ms "
+              f"(plan {report['plan_s'] * 1000:.1f} ms)")
+        self.bulk_edit_finished.emit(report)
+        return report
+
+    def count_bulk_items(self, pages, kind="all", select=None):
+        """Number of annotations/links on pages a bulk_edit with kind and select would touch."""
+        return sum(len(self.collect_page_items(self.load_page(page_idx), kind, select))
+                   for page_idx in sorted(set(pages)))
+
+    def collect_page_items(self, page, kind, select):
+        """Return matching {"kind", "page", "type", "rect", "color", "xref"} dicts of one page."""
+        items = []
+        if kind in ("annot", "all"):
+            self.get_annot(None, page.number)   # builds the page's xref map used when applying
+            for annot in list(self.annot_objects.values()):
+                item = {"kind": "annot", "page": page.number, "type": annot.type[1],
+                        "rect": annot.rect, "color": annot.colors.get("stroke"), "xref": annot.xref}
+                if select is None or select(item):
+                    items.append(item)
+        if kind in ("link", "all"):
+            for link in page.get_links():
+                item = {"kind": "link", "page": page.number, "type": "Link",
+                        "rect": link["from"], "color": None, "xref": link.get("xref"), "link": link}
+                if select is None or select(item):
+                    items.append(item)
+        return items
+
+    def apply_page_edits(self, page, action, items, value, report):
+        """Apply action to the planned items of one page, appending undo records to report."""
+        undo = report["undo"]
+        link_colors = None
+        for item in items:
+            if item["kind"] == "annot":
+                annot = self.get_annot(item["xref"], page.number)
+                if annot is None:
+                    report["skipped"] += 1
+                    continue
+                if action == "delete":
+                    undo.append(self.annot_undo_record(annot))
+                    self.forget_annot(annot.xref)
+                    page.delete_annot(annot)
+                elif action == "retype":
+                    new_type = value
+                    if value == "toggle":
+                        new_type = {"Underline": "Highlight", "Highlight": "Underline"}.get(item["type"])
+                    if (item["type"] not in RETYPE_FUNCS or new_type not in RETYPE_FUNCS
+                            or new_type == item["type"]):
+                        report["skipped"] += 1
+                        continue
+                    new_annot = self.retype_annot(page, annot, new_type)
+                    undo.append({"op": "retype", "page": page.number, "xref": new_annot.xref,
+                                 "rect": tuple(new_annot.rect), "current_type": new_type,
+                                 "type": item["type"]})
+                elif action == "recolor":
+                    undo.append({"op": "recolor", "page": page.number, "kind": "annot",
+                                 "xref": annot.xref, "rect": tuple(annot.rect),
+                                 "current_type": item["type"], "color": item["color"]})
+                    annot.set_colors(stroke=value)
+                    annot.update()
+                report["annots"] += 1
+            else:
+                link = item["link"]
+                if action == "delete":
+                    undo.append({"op": "insert_link", "page": page.number, "link": dict(link)})
+                    page.delete_link(link)
+                elif action == "retarget":
+                    dest = value(link) if callable(value) else value
+                    if not dest or link.get("kind") != pymupdf.LINK_GOTO:
+                        report["skipped"] += 1
+                        continue
+                    undo.append({"op": "update_link", "page": page.number, "link": dict(link)})
+                    link["page"] = dest["page"]
+                    link["to"] = pymupdf.Point(dest["to"])
+                    page.update_link(link)
+                elif action == "recolor":
+                    if link_colors is None:
+                        link_colors = self.page_link_objects(page)
+                    link_obj = link_colors.get(link.get("xref"))
+                    if link_obj is None:
+                        report["skipped"] += 1
+                        continue
+                    undo.append({"op": "recolor", "page": page.number, "kind": "link",
+                                 "xref": link.get("xref"), "rect": tuple(link["from"]),
+                                 "color": link_obj.colors.get("stroke")})
+                    link_obj.set_colors(stroke=value)
+                report["links"] += 1
+
+    def page_link_objects(self, page):
+        """Map link xref -> pymupdf.Link of a page (for border colors)."""
+        links = {}
+        link_obj = page.first_link
+        for link in page.get_links():
+            if link_obj is None:
+                break
+            links[link.get("xref")] = link_obj
+            link_obj = link_obj.next
+        return links
+
+    def find_annot(self, page, record):
+        """
+        Annotation an undo record refers to: by xref if type and rect still
+        match, otherwise by type and rect (re-created by a later edit or undo,
+        or renumbered by a garbage-collecting save).
+        """
+        annot = self.get_annot(record["xref"], page.number)
+        if (annot is not None and annot.type[1] == record["current_type"]
+                and rects_match(record["rect"], annot.rect)):
+            return annot
+        for annot in page.annots():
+            if annot.type[1] == record["current_type"] and rects_match(record["rect"], annot.rect):
+                return annot
+        print(f"undo: annotation {record['xref']} on page {record['page'] + 1} not found")
+        return None
+
+    def annot_undo_record(self, annot):
+        """
+        Everything needed to re-create a deleted annotation of any type as it
+        was: a raw copy of its PDF objects (annotRecords.capture_annot).
+        """
+        return {
+            "op": "add_annot",
+            "page": annot.parent.number,
+            "type": annot.type[1],
+            "rect": tuple(annot.rect),
+            "popup": tuple(annot.popup_rect) if annot.has_popup else None,
+            "raw": capture_annot(self.document, annot.xref),
+        }
+
+    def add_annot_from_record(self, page, record):
+        """Re-create an annotation from an annot_undo_record; returns the new annotation."""
+        xref = restore_annot(self.document, page, record["raw"])
+        if page is self.page:
+            # synced page: annotation objects mapped before are no longer its own
+            self.annot_objects = None
+        annot = page.load_annot(xref)
+        if record["popup"]:
+            annot.set_popup(pymupdf.Rect(record["popup"]))
+        self.remember_annot(annot)
+        return annot
+
+    def markup_record(self, annot):
+        """Quads, colors, opacity and info of a text markup annotation (retype_annot)."""
+        return {
+            "page": annot.parent.number,
+            "type": annot.type[1],
+            "vertices": list(annot.vertices or []),
+            "rect": tuple(annot.rect),
+            "colors": annot.colors,
+            "opacity": annot.opacity,
+            "info": annot.info,
+        }
+
+    def add_markup_annot(self, page, record):
+        """Create a text markup annotation of record["type"] from a markup_record."""
+        vertices = record["vertices"]
+        if vertices:
+            quads = [pymupdf.Quad(*vertices[idx:idx + 4]) for idx in range(0, len(vertices) - 3, 4)]
+        else:
+            quads = [pymupdf.Rect(record["rect"])]
+        annot = getattr(page, RETYPE_FUNCS[record["type"]])(quads)
+        if record["colors"].get("stroke"):
+            annot.set_colors(stroke=record["colors"]["stroke"])
+        if record["opacity"] is not None and record["opacity"] >= 0:
+            annot.set_opacity(record["opacity"])
+        info = {key: value for key, value in record["info"].items() if key != "id"}
+        annot.set_info(info)
+        annot.update()
+        self.remember_annot(annot)
+        return annot
+
+    def retype_annot(self, page, annot, new_type):
+        """
+        Change a text markup annotation's subtype.
+
+        PDF annotations cannot change subtype in place, so the annotation is
+        re-created with the same quads, colors, opacity and info.
+        """
+        record = self.markup_record(annot)
+        self.forget_annot(annot.xref)
+        page.delete_annot(annot)
+        record["type"] = new_type
+        return self.add_markup_annot(page, record)
+
+    def find_link(self, page, record):
+        """
+        Link dict an edit record refers to: by xref if its "from" rect (and
+        destination page, if recorded) still match, otherwise by rect and
+        destination alone (re-inserted with a new xref, or renumbered by a
+        garbage-collecting save).
+        """
+        def matches(link):
+            return (rects_match(record["rect"], link["from"])
+                    and record.get("dest_page", link.get("page")) == link.get("page"))
+
+        links = page.get_links()
+        for link in links:
+            if record.get("xref") is not None and link.get("xref") == record["xref"] and matches(link):
+                return link
+        for link in links:
+            if matches(link):
+                return link
+        print(f"undo: link {record.get('xref')} on page {record['page'] + 1} not found")
+        return None
+
+    def link_from_record(self, link):
+        """Copy of a recorded link dict with PyMuPDF geometry (records may come from JSON)."""
+        link = dict(link)
+        link["from"] = pymupdf.Rect(link["from"])
+        if link.get("to") is not None:
+            link["to"] = pymupdf.Point(link["to"])
+        return link
+
+    def apply_edit_records(self, records):
+        """
+        Apply edit records newest first (bulk rollback, undo and redo).
+
+        Returns:
+            list: records reverting what was applied; being collected newest
+                  first, they are already in the order this method expects
+        """
+        inverse = []
+        for record in reversed(records):
+            page = self.load_page(record["page"])
+            op = record["op"]
+            if op == "add_annot":
+                annot = self.add_annot_from_record(page, record)
+                inverse.append({"op": "delete_annot", "page": page.number, "xref": annot.xref,
+                                "rect": tuple(annot.rect), "current_type": annot.type[1]})
+            elif op == "delete_annot":
+                annot = self.find_annot(page, record)
+                if annot:
+                    inverse.append(self.annot_undo_record(annot))
+                    self.forget_annot(annot.xref)
+                    page.delete_annot(annot)
+            elif op == "insert_link":
+                link = self.link_from_record(record["link"])
+                link.pop("xref", None)
+                link.pop("id", None)
+                page.insert_link(link)
+                inverse.append({"op": "delete_link", "page": page.number, "xref": None,
+                                "rect": tuple(link["from"]), "dest_page": link.get("page")})
+            elif op == "delete_link":
+                link = self.find_link(page, record)
+                if link:
+                    inverse.append({"op": "insert_link", "page": page.number, "link": dict(link)})
+                    page.delete_link(link)
+            elif op == "update_link":
+                link = self.link_from_record(record["link"])
+                current = self.find_link(page, {"page": page.number, "xref": link.get("xref"),
+                                                "rect": link["from"]})
+                if current:
+                    inverse.append({"op": "update_link", "page": page.number, "link": dict(current)})
+                    link["xref"] = current["xref"]
+                    page.update_link(link)
+            elif op == "retype":
+                annot = self.find_annot(page, record)
+                if annot:
+                    new_annot = self.retype_annot(page, annot, record["type"])
+                    inverse.append({"op": "retype", "page": page.number, "xref": new_annot.xref,
+                                    "rect": tuple(new_annot.rect), "current_type": record["type"],
+                                    "type": record["current_type"]})
+            elif op == "recolor":
+                if record["kind"] == "annot":
+                    annot = self.find_annot(page, record)
+                    if annot:
+                        inverse.append(dict(record, xref=annot.xref, rect=tuple(annot.rect),
+                                            color=annot.colors.get("stroke")))
+                        annot.set_colors(stroke=record["color"] or [])
+                        annot.update()
+                else:
+                    link = self.find_link(page, record)
+                    link_obj = self.page_link_objects(page).get(link["xref"]) if link else None
+                    if link_obj:
+                        inverse.append(dict(record, xref=link["xref"], color=link_obj.colors.get("stroke")))
+                        link_obj.set_colors(stroke=record["color"] or [])
+                    link_obj = None
+            # page objects created while one that inserted a link is alive list stale links
+            page = None
+            self.invalidate_page_cache(record["page"])
+        return inverse
+
+    def undo(self):
+        """Revert the newest journal entry; returns its label or None."""
+        return self.replay_journal(redo=False)
+
+    def redo(self):
+        """Re-apply the newest undone entry; returns its label or None."""
+        return self.replay_journal(redo=True)
+
+    def replay_journal(self, redo=False):
+        """Apply the top entry of the undo/redo stack and push its inverse onto the other one."""
+        entry = self.journal.pop(redo)
+        if entry is None:
+            print("nothing to redo" if redo else "nothing to undo")
+            return None
+        start = time.perf_counter()
+        records = self.apply_edit_records(entry["records"])
+        self.journal.push(entry, records, redo)
+        report = {"action": "redo" if redo else "undo", "label": entry["label"],
+                  "records": len(records), "elapsed_s": time.perf_counter() - start}
+        print(f"{report['action']} {entry['label']}: {len(records)} edits "
+              f"in {report['elapsed_s'] * 1000:.1f} ms")
+        self.bulk_edit_finished.emit(report)
+        return entry["label"]
 
     def link_creation(self, selection):
         """Create new link from selected region, extract year for annotation."""
@@ -215,7 +880,7 @@ class TextHandler(QObject):
             "from": rect,
             "page": 0,
             "to": None,
-            "link_page": self.page
+            "link_page": self.page.number
         }
         self.curr_link_selection = link_data
         year_rect = self.extract_year_rect(self.page, pymupdf.Rect(rect))
@@ -223,6 +888,10 @@ class TextHandler(QObject):
             self.year_rect = year_rect
             self.year_page = self.page.number
 
+    def has_pending_link(self):
+        """True between link_creation and the link_destination completing it."""
+        return "link_page" in self.curr_link_selection
+
     def link_destination(self, selection, page_idx, zoom_factor=None):
         """Set destination for previously created link and add year annotation."""
         if not selection:
@@ -231,36 +900,29 @@ class TextHandler(QObject):
 
         rect = rect_qt_to_py(selection)
         point = rect.top_left
-        page = self.curr_link_selection["link_page"]
-        del self.curr_link_selection["link_page"]
-        
-        # Convert the original "from" rect to pixels for display
-        from_rect = rect_py_to_qt(self.curr_link_selection["from"])
-        qt_rect = dpi_to_px({
-                            "rect": from_rect,
-                            "current_zoom": zoom_factor
-                            })
+        # only the page number is kept between link_creation and here, not the page object
+        page = self.load_page(self.curr_link_selection.pop("link_page"))
 
         self.curr_link_selection["to"] = point
         self.curr_link_selection["page"] = page_idx
 
-        link = self.curr_link_selection
-        link_data = {
-                "kind": link.get("kind"),
-                "from": qt_rect,
-                "page": link.get("page"),
-                "to": point_to_px(point_py_to_qt(link["to"]), zoom_factor) if "to" in link else None,
-                "to_dpi": point_py_to_qt(link["to"]) if "to" in link else from_rect.topLeft(),
-                "uri": link.get("uri")
-            }
-
         result = page.insert_link(self.curr_link_selection)
+        undo = [{"op": "delete_link", "page": page.number, "xref": None,
+                 "rect": tuple(self.curr_link_selection["from"]), "dest_page": page_idx}]
 
-        self.curr_links.append(link_data)
         self.curr_link_selection.clear()
+        # release the inserting page object first, or reloaded pages list stale links
+        page_number = page.number
+        page = None
+        self.invalidate_page_cache(page_number)
         if self.year_rect:
-            year_page_fresh = self.document[self.year_page]
+            year_page_fresh = self.load_page(self.year_page)
             annot = year_page_fresh.add_underline_annot([self.year_rect])
+            self.remember_annot(annot)
+            undo.append({"op": "delete_annot", "page": self.year_page, "xref": annot.xref,
+                         "rect": tuple(annot.rect), "current_type": annot.type[1]})
+            self.invalidate_page_cache(self.year_page, keep_page=True)
+        self.journal.record("add link", undo)
             # annot.update()
 
     def extract_year_annot(self, word, word_rect, rect):
@@ -283,11 +945,11 @@ class TextHandler(QObject):
 
     def extract_year_rect(self, page, origin_rect):
         """Find and extract year rectangle from page region intersecting origin_rect."""
-        words = page.get_text("words")
-        for word in words:
-            word_rect = pymupdf.Rect(word[0], word[1], word[2], word[3])
-            if word_rect.intersects(origin_rect):# and re.match(r"\d{4}[a-zA-Z]?", word[4]):
-                year_rect = self.extract_year_annot(word[4], word_rect, origin_rect)
+        layout = self.get_word_layout(page.number)
+        for idx in layout.words_intersecting(tuple(origin_rect)):
+            word_rect = pymupdf.Rect(layout.word_rect(idx))
+            if word_rect.intersects(origin_rect):
+                year_rect = self.extract_year_annot(layout.words[idx], word_rect, origin_rect)
                 if year_rect:
                     return year_rect
         return None
@@ -0,0 +1,261 @@
+"""
+Background full-text index of an open PDF.
+Pages are extracted with PyMuPDF on worker threads and merged into an inverted word index for instant search.
+"""
+import  sys
+import  time
+import  heapq
+import  string
+import  threading
+import  pymupdf
+from    array                           import  array
+from    bisect                          import  bisect_left
+from    PySide6.QtCore                  import  QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+CHUNK_PAGES = 16
+MAX_INDEX_THREADS = 2
+MAX_RESULTS = 1000
+CONTEXT_WORDS = 4
+WORD_STRIDE = 1 << 20      # posting key = page * WORD_STRIDE + word index
+# estimated index cost for memory telemetry
+WORD_BYTES = 120            # token, word and box of one indexed word
+POSTING_BYTES = 8
+STRIP_CHARS = string.punctuation + string.whitespace + "„“”‚‘’«»–—…"
+
+
+def normalize_word(word):
+    """Search token of a word: surrounding punctuation removed, case folded."""
+    return sys.intern(word.strip(STRIP_CHARS).casefold())
+
+
+class IndexWorkerSignals(QObject):
+    """
+    Signals emitted by IndexWorker (QRunnable cannot emit signals itself).
+
+    Parent: None
+    Children: None
+    """
+    chunk_done = Signal(int, object)
+
+
+class IndexWorker(QRunnable):
+    """
+    QThreadPool job extracting the words of a range of pages.
+
+    Parent: TextIndex
+    Children: IndexWorkerSignals
+
+    Opens its own PyMuPDF document (documents must not be shared between
+    threads) and builds the postings of its pages, so the GUI thread only
+    has to merge finished chunks.
+    """
+    def __init__(self, path, first, last, generation, cancel_event):
+        """Initialize worker for pages first..last of path."""
+        super().__init__()
+        self.path = path
+        self.first = first
+        self.last = last
+        self.generation = generation
+        self.cancel_event = cancel_event
+        self.signals = IndexWorkerSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        """Extract words and postings of the page range."""
+        if self.cancel_event.is_set():
+            return
+        pages = {}
+        postings = {}
+        try:
+            with pymupdf.open(self.path) as doc:
+                for page_idx in range(self.first, self.last + 1):
+                    if self.cancel_event.is_set():
+                        return
+                    words = doc[page_idx].get_text("words")
+                    tokens = []
+                    boxes = array("d")
+                    for word_idx, word in enumerate(words):
+                        token = normalize_word(word[4])
+                        tokens.append(token)
+                        boxes.extend((word[0], word[1], word[2], word[3]))
+                        if token:
+                            postings.setdefault(token, array("q")).append(page_idx * WORD_STRIDE + word_idx)
+                    pages[page_idx] = {"tokens": tokens,
+                                       "words": [sys.intern(word[4]) for word in words],
+                                       "boxes": boxes}
+        except Exception as e:
+            print(f"Error indexing pages {self.first + 1}-{self.last + 1}: {e}")
+        self.signals.chunk_done.emit(self.generation, {"first": self.first, "last": self.last,
+                                                       "pages": pages, "postings": postings})
+
+
+class TextIndex(QObject):
+    """
+    Inverted word index of one document, built in the background.
+
+    Parent: SearchPanel
+    Children: IndexWorker
+
+    set_document() starts indexing in CHUNK_PAGES chunks on a private
+    thread pool; chunks are merged as they arrive and progress is emitted,
+    so search() already answers for the pages indexed so far. Switching
+    documents cancels outstanding chunks and drops their late results.
+
+    search() matches words in order on the same page; every query word
+    must match a whole word except the last one, which may be a prefix
+    (search as you type). Matching ignores case and surrounding punctuation.
+    """
+    progress = Signal(int, int)
+    finished = Signal()
+
+    def __init__(self, parent=None):
+        """Initialize an empty index."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.path = ""
+        self.page_count = 0
+        self.pages = {}             # page -> {"tokens", "words", "boxes"}
+        self.postings = {}          # token -> array of posting keys
+        self.vocabulary = None      # sorted tokens for prefix lookup, rebuilt lazily
+        self.indexed_pages = 0
+        self.bytes_estimate = 0
+        self.generation = 0
+        self.cancel_event = threading.Event()
+        self.workers = []
+        self.start_time = 0.0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(MAX_INDEX_THREADS)
+
+    ### methods
+    def set_document(self, path, page_count):
+        """Drop the current index and start indexing path."""
+        self.cancel()
+        self.generation += 1
+        self.cancel_event = threading.Event()
+        self.path = path
+        self.page_count = page_count
+        self.pages = {}
+        self.postings = {}
+        self.vocabulary = None
+        self.indexed_pages = 0
+        self.bytes_estimate = 0
+        self.start_time = time.perf_counter()
+        self.progress.emit(0, page_count)
+
+        for first in range(0, page_count, CHUNK_PAGES):
+            worker = IndexWorker(path, first, min(first + CHUNK_PAGES, page_count) - 1,
+                                 self.generation, self.cancel_event)
+            worker.signals.chunk_done.connect(self.on_chunk_done)
+            self.workers.append(worker)
+            self.pool.start(worker)
+
+    def cancel(self):
+        """Stop outstanding workers; their results are ignored."""
+        self.cancel_event.set()
+        self.pool.clear()
+        self.workers = []
+
+    def is_ready(self):
+        """True once every page is indexed."""
+        return self.page_count > 0 and self.indexed_pages >= self.page_count
+
+    def memory_stats(self):
+        """Return indexed pages, vocabulary size and estimated bytes (telemetry)."""
+        return {"pages": self.indexed_pages, "words": len(self.postings), "bytes": self.bytes_estimate}
+
+    @Slot()
+    def on_chunk_done(self, generation, chunk):
+        """Merge a finished chunk into the index."""
+        if generation != self.generation:
+            return
+        self.pages.update(chunk["pages"])
+        for page in chunk["pages"].values():
+            self.bytes_estimate += len(page["tokens"]) * WORD_BYTES
+        for token, keys in chunk["postings"].items():
+            self.bytes_estimate += len(keys) * POSTING_BYTES
+            existing = self.postings.get(token)
+            if existing is None:
+                self.postings[token] = keys
+            else:
+                existing.extend(keys)
+        self.vocabulary = None
+        self.indexed_pages += chunk["last"] - chunk["first"] + 1
+        self.progress.emit(self.indexed_pages, self.page_count)
+        if self.is_ready():
+            self.workers = []
+            # chunks arrive out of order; sorted postings let search() stop early
+            for token, keys in self.postings.items():
+                self.postings[token] = array("q", sorted(keys))
+            print(f"indexed {self.page_count} pages, {len(self.postings)} words "
+                  f"in {time.perf_counter() - self.start_time:.2f}s")
+            self.finished.emit()
+
+    def candidate_keys(self, token, prefix):
+        """Posting keys of token, or of every indexed token starting with it, in sorted order."""
+        if not prefix:
+            keys = [self.postings.get(token, ())]
+        else:
+            if self.vocabulary is None:
+                self.vocabulary = sorted(self.postings)
+            keys = []
+            idx = bisect_left(self.vocabulary, token)
+            while idx < len(self.vocabulary) and self.vocabulary[idx].startswith(token):
+                keys.append(self.postings[self.vocabulary[idx]])
+                idx += 1
+        if not self.is_ready():
+            return sorted(key for posting in keys for key in posting)
+        return heapq.merge(*keys)
+
+    def search(self, query, max_results=MAX_RESULTS):
+        """
+        Find query in the indexed pages.
+
+        Returns:
+            list: {"page", "rect" (x0, y0, x1, y1 in PDF points), "text",
+                   "context"} dicts in page/reading order, at most max_results
+        """
+        tokens = [normalize_word(part) for part in query.split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return []
+
+        results = []
+        last = len(tokens) - 1
+        for key in self.candidate_keys(tokens[0], prefix=last == 0):
+            page_idx, word_idx = divmod(key, WORD_STRIDE)
+            page = self.pages[page_idx]
+            page_tokens = page["tokens"]
+            if word_idx + last >= len(page_tokens):
+                continue
+            matched = True
+            for offset in range(1, last + 1):
+                token = page_tokens[word_idx + offset]
+                if not (token.startswith(tokens[offset]) if offset == last else token == tokens[offset]):
+                    matched = False
+                    break
+            if not matched:
+                continue
+            results.append(self.make_result(page_idx, word_idx, word_idx + last))
+            if len(results) >= max_results:
+                break
+        return results
+
+    def make_result(self, page_idx, first_word, last_word):
+        """Build the result dict for words first_word..last_word of a page."""
+        page = self.pages[page_idx]
+        boxes = page["boxes"]
+        x0 = min(boxes[idx * 4] for idx in range(first_word, last_word + 1))
+        y0 = min(boxes[idx * 4 + 1] for idx in range(first_word, last_word + 1))
+        x1 = max(boxes[idx * 4 + 2] for idx in range(first_word, last_word + 1))
+        y1 = max(boxes[idx * 4 + 3] for idx in range(first_word, last_word + 1))
+        words = page["words"]
+        context = " ".join(words[max(0, first_word - CONTEXT_WORDS):last_word + CONTEXT_WORDS + 1])
+        return {
+            "page": page_idx,
+            "rect": (x0, y0, x1, y1),
+            "text": " ".join(words[first_word:last_word + 1]),
+            "context": context,
+        }
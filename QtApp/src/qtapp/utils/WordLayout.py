@@ -0,0 +1,47 @@
+"""
+Compact per-page word layout with spatial lookup.
+Stores word boxes from PyMuPDF once so year lookups only touch intersecting words.
+"""
+from    array                           import  array
+
+from    qtapp.utils.SpatialIndex        import  SpatialIndex
+
+
+class WordLayout:
+    """
+    Word bounding boxes of one page in a flat array plus a spatial index.
+
+    Parent: TextHandler
+    Children: SpatialIndex
+
+    Built from page.get_text("words"); words keep extraction (reading) order,
+    so sorting matched indices restores reading order.
+    """
+    def __init__(self, words):
+        """Build layout from PyMuPDF word tuples (x0, y0, x1, y1, text, block, line, word)."""
+        self.boxes = array("d")
+        self.words = []
+        self.index = SpatialIndex(cell_size=24.0)
+
+        for idx, word in enumerate(words):
+            x0, y0, x1, y1 = word[0], word[1], word[2], word[3]
+            self.boxes.extend((x0, y0, x1, y1))
+            self.words.append(word[4])
+            self.index.insert(idx, (x0, y0, x1, y1), z=-idx)
+
+    @classmethod
+    def from_page(cls, page):
+        """Extract words from a PyMuPDF page and build its layout."""
+        return cls(page.get_text("words"))
+
+    def __len__(self):
+        return len(self.words)
+
+    def word_rect(self, idx):
+        """Return (x0, y0, x1, y1) of word idx."""
+        offset = idx * 4
+        return tuple(self.boxes[offset:offset + 4])
+
+    def words_intersecting(self, rect):
+        """Return indices of words intersecting rect, in reading order."""
+        return sorted(self.index.query_rect(rect))
@@ -0,0 +1,92 @@
+"""
+Raw copies of PDF annotations for undo records.
+Captures an annotation's dictionary and every object it owns so a deleted annotation of any type can be re-created as it was.
+"""
+import  re
+import  base64
+import  pymupdf
+
+
+# keys pointing outside the annotation; re-created or dropped on restore
+EXTERNAL_KEYS = ("P", "Popup", "Parent", "IRT")
+REFERENCE = re.compile(r"\b(\d+) 0 R\b")
+
+
+def references(source):
+    """Xrefs referenced in a PDF object source string."""
+    return [int(xref) for xref in REFERENCE.findall(source)]
+
+
+def capture_annot(doc, xref):
+    """
+    Copy annotation xref and the objects it owns (appearance streams and
+    their resources) as JSON-safe data.
+
+    Streams are stored decompressed and base64 encoded. Objects reachable
+    only through EXTERNAL_KEYS (page, popup, parent, reply target) are not
+    copied.
+
+    Returns:
+        dict: {"xref", "object", "objects": {xref: {"object", "stream"}}}
+    """
+    todo = []
+    for key in doc.xref_get_keys(xref):
+        if key in EXTERNAL_KEYS:
+            continue
+        kind, value = doc.xref_get_key(xref, key)
+        if kind in ("xref", "array", "dict"):
+            todo.extend(references(value))
+
+    objects = {}
+    while todo:
+        item_xref = todo.pop()
+        if item_xref == xref or str(item_xref) in objects:
+            continue
+        source = doc.xref_object(item_xref, compressed=True)
+        stream = None
+        if doc.xref_is_stream(item_xref):
+            stream = base64.b64encode(doc.xref_stream(item_xref)).decode("ascii")
+        objects[str(item_xref)] = {"object": source, "stream": stream}
+        todo.extend(references(source))
+
+    return {"xref": xref, "object": doc.xref_object(xref, compressed=True), "objects": objects}
+
+
+def restore_annot(doc, page, raw):
+    """
+    Re-create a captured annotation on page under new xrefs.
+
+    The page's annotation list is synced afterwards, so the annotation can
+    be loaded from the live page object right away.
+
+    Returns:
+        int: xref of the re-created annotation
+    """
+    mapping = {int(old_xref): doc.get_new_xref() for old_xref in raw["objects"]}
+    new_xref = mapping[raw["xref"]] = doc.get_new_xref()
+
+    def remap(source):
+        return REFERENCE.sub(lambda match: f"{mapping.get(int(match.group(1)), int(match.group(1)))} 0 R",
+                             source)
+
+    for old_xref, item in raw["objects"].items():
+        doc.update_object(mapping[int(old_xref)], remap(item["object"]))
+        if item["stream"] is not None:
+            doc.update_stream(mapping[int(old_xref)], base64.b64decode(item["stream"]))
+    doc.update_object(new_xref, remap(raw["object"]))
+    doc.xref_set_key(new_xref, "P", f"{page.xref} 0 R")
+    for key in EXTERNAL_KEYS[1:]:
+        if doc.xref_get_key(new_xref, key)[0] != "null":
+            doc.xref_set_key(new_xref, key, "null")
+
+    kind, value = doc.xref_get_key(page.xref, "Annots")
+    if kind == "xref":
+        annots_xref = references(value)[0]
+        array = doc.xref_object(annots_xref, compressed=True).strip()
+        doc.update_object(annots_xref, f"{array[:-1].rstrip()} {new_xref} 0 R]")
+    elif kind == "array":
+        doc.xref_set_key(page.xref, "Annots", f"{value[:-1].rstrip()} {new_xref} 0 R]")
+    else:
+        doc.xref_set_key(page.xref, "Annots", f"[{new_xref} 0 R]")
+    pymupdf.mupdf.pdf_sync_page(pymupdf.mupdf.pdf_page_from_fz_page(page.this))
+    return new_xref
@@ -0,0 +1,294 @@
+"""
+Qt-free helpers for linking the articles of a multi-article volume in parallel.
+Splits the volume by ARTICLE_BREAKS, links every article in its own process and merges the results.
+"""
+import  os
+import  re
+import  json
+import  shutil
+import  hashlib
+import  pymupdf
+from    importlib                       import  metadata
+
+from    qtapp.utils.linkerRunner        import  run_linker_job
+
+
+ARTICLE_MODE = "citation-multi-article"
+LINK_CACHE_DIR = ".link_cache"
+LINK_CACHE_MAX_BYTES = 1 << 30
+# config keys that do not change the links of a single article
+# (both are applied to the article ranges before splitting)
+CACHE_IGNORED_KEYS = {"ARTICLE_BREAKS", "OFFSET"}
+
+
+def read_article_breaks(config_path):
+    """
+    Read ARTICLE_BREAKS from a config file.
+
+    Returns:
+        list: zero-based {"first": int, "last": int} dicts in file order
+    """
+    articles = []
+    with open(config_path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, _, value = line.strip().partition("=")
+            if key.strip() != "ARTICLE_BREAKS":
+                continue
+            for item in re.findall(r'"([^"]*)"', value):
+                first, last = item.split(":")
+                articles.append({"first": int(first) - 1, "last": int(last) - 1})
+    return articles
+
+
+def parse_offset(value):
+    """OFFSET value ("+2", "-5" or empty) as a page shift."""
+    try:
+        return int(value.strip() or 0)
+    except ValueError:
+        print(f"ignoring malformed offset: {value!r}")
+        return 0
+
+
+def read_offset(config_path):
+    """Read OFFSET from a config file as a page shift (0 if unset)."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, _, value = line.strip().partition("=")
+            if key.strip() == "OFFSET":
+                return parse_offset(value)
+    return 0
+
+
+def apply_offset(articles, offset, page_count):
+    """
+    Shift zero-based articles by offset pages, as the linker does with OFFSET.
+
+    Ranges are clamped to the document; articles shifted out of it entirely
+    are dropped.
+    """
+    shifted = []
+    for article in articles:
+        first = max(0, article["first"] + offset)
+        last = min(page_count - 1, article["last"] + offset)
+        if first <= last:
+            shifted.append({"first": first, "last": last})
+        else:
+            print(f"article {article} shifted by {offset:+d} is outside the document, skipped")
+    return shifted
+
+
+def write_article_config(config_path, article_config_path, page_count):
+    """
+    Copy config_path with ARTICLE_BREAKS reduced to one article covering page_count pages.
+
+    OFFSET is cleared: it was applied when the volume was split, the
+    extracted article must not be shifted again.
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    for idx, line in enumerate(lines):
+        key = line.strip().partition("=")[0].strip()
+        if key == "ARTICLE_BREAKS":
+            lines[idx] = f'ARTICLE_BREAKS="1:{page_count}"'
+        elif key == "OFFSET":
+            lines[idx] = "OFFSET="
+    with open(article_config_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def linker_version():
+    """Installed citation-linker version (part of every cache key)."""
+    try:
+        return metadata.version("citation-linker")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def config_fingerprint(config_path, cmd_in=ARTICLE_MODE):
+    """
+    Hash the config fields an article's links depend on.
+
+    ARTICLE_BREAKS is left out: each article's own range is covered by the
+    hash of its pages. Line order and surrounding whitespace are ignored.
+    """
+    fields = []
+    with open(config_path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, sep, value = line.strip().partition("=")
+            if sep and key.strip() not in CACHE_IGNORED_KEYS:
+                fields.append(f"{key.strip()}={value.strip()}")
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{cmd_in}\n{linker_version()}\n".encode())
+    digest.update("\n".join(sorted(fields)).encode())
+    return digest.hexdigest()
+
+
+def article_fingerprint(source_path, article_bytes, config_digest):
+    """
+    Cache key of one article: the source volume's path, the config hash and
+    the extracted single-article PDF.
+
+    article_bytes is the article saved without a new file ID, so it covers
+    everything its pages use (content streams, fonts, images, form XObjects)
+    and is the same for the same pages on every run. The path keeps articles
+    of different volumes sharing one cache directory apart.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{os.path.abspath(source_path)}\n{config_digest}\n".encode())
+    digest.update(article_bytes)
+    return digest.hexdigest()
+
+
+def cache_lookup(cache_dir, key):
+    """Return the cached linked PDF for key (and mark it recently used), or None."""
+    path = os.path.join(cache_dir, key + ".pdf")
+    if not os.path.exists(path):
+        return None
+    os.utime(path)
+    return path
+
+
+def cache_store(cache_dir, key, linked_path):
+    """Copy a freshly linked article into the cache."""
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, key + ".tmp")
+    shutil.copy(linked_path, tmp_path)
+    os.replace(tmp_path, os.path.join(cache_dir, key + ".pdf"))
+
+
+def prune_cache(cache_dir, max_bytes=LINK_CACHE_MAX_BYTES):
+    """Delete least recently used cache entries until the cache fits max_bytes."""
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def build_article_jobs(pdf_path, config_path, articles, work_dir, output_dir, cache_dir=None):
+    """
+    Extract every article into its own PDF and create one linker job per article.
+
+    Articles whose pages and config are unchanged since an earlier run are
+    taken from cache_dir instead and returned as finished results.
+
+    Args:
+        pdf_path: Input volume
+        config_path: Active config (its ARTICLE_BREAKS are replaced per article)
+        articles: zero-based {"first", "last"} dicts
+        work_dir: Directory for extracted PDFs, configs and scratch dirs
+        output_dir: Directory receiving per-article linked PDFs and logs
+        cache_dir: Link result cache (None disables caching)
+
+    Returns:
+        tuple: (jobs for run_article_job, cached result dicts)
+    """
+    base = os.path.splitext(os.path.basename(pdf_path))[0]
+    os.makedirs(work_dir, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    config_digest = config_fingerprint(config_path) if cache_dir else None
+    jobs = []
+    cached = []
+    with pymupdf.open(pdf_path) as src:
+        for idx, article in enumerate(articles):
+            with pymupdf.open() as part:
+                part.insert_pdf(src, from_page=article["first"], to_page=article["last"])
+                article_bytes = part.tobytes(no_new_id=True)
+            key = article_fingerprint(pdf_path, article_bytes, config_digest) if cache_dir else None
+            cached_path = cache_lookup(cache_dir, key) if cache_dir else None
+            if cached_path:
+                cached.append({"pdf": pdf_path, "status": "ok", "cached": True,
+                               "output": cached_path, "error": None, "elapsed_s": 0.0,
+                               "article": article, "index": idx, "cache_key": key})
+                continue
+
+            name = f"{base}_a{idx + 1:03d}"
+            article_pdf = os.path.join(work_dir, name + ".pdf")
+            with open(article_pdf, "wb") as f:
+                f.write(article_bytes)
+            article_config = os.path.join(work_dir, name + ".config")
+            write_article_config(config_path, article_config, article["last"] - article["first"] + 1)
+            jobs.append({
+                "pdf": article_pdf,
+                "config": article_config,
+                "scratch_dir": os.path.join(work_dir, name + "_scratch"),
+                "output_dir": output_dir,
+                "cmd_in": ARTICLE_MODE,
+                "keep_scratch": False,
+                "article": article,
+                "index": idx,
+                "cache_key": key,
+            })
+    return jobs, cached
+
+
+def run_article_job(job):
+    """Link one extracted article (process target wrapper around run_linker_job)."""
+    result = run_linker_job(job)
+    result["article"] = job["article"]
+    result["index"] = job["index"]
+    result["cache_key"] = job["cache_key"]
+    result["cached"] = False
+    return result
+
+
+def run_article_job_in_child(job, result_queue):
+    """Process target: link one article and report its result dict through result_queue."""
+    result_queue.put(run_article_job(job))
+
+
+def merge_article_outputs(pdf_path, results, output_path):
+    """
+    Replace the pages of every successfully linked article in the volume.
+
+    Articles that failed keep their original, unlinked pages; pages outside
+    any article are copied unchanged. The volume's outline is restored after
+    the page swap since page numbers do not change.
+
+    Returns:
+        int: Number of articles merged
+    """
+    merged = 0
+    with pymupdf.open(pdf_path) as doc:
+        toc = doc.get_toc(simple=False)
+        # back to front so earlier page numbers stay valid
+        for result in sorted(results, key=lambda result: result["article"]["first"], reverse=True):
+            if result["status"] != "ok":
+                continue
+            first, last = result["article"]["first"], result["article"]["last"]
+            with pymupdf.open(result["output"]) as linked:
+                if linked.page_count != last - first + 1:
+                    result["status"] = "failed"
+                    result["error"] = f"linked article has {linked.page_count} pages, expected {last - first + 1}"
+                    continue
+                doc.delete_pages(from_page=first, to_page=last)
+                doc.insert_pdf(linked, start_at=first, links=True, annots=True)
+            merged += 1
+        if toc:
+            doc.set_toc(toc)
+        doc.save(output_path, garbage=3, deflate=True)
+    return merged
+
+
+def write_article_report(report_path, pdf_path, results, elapsed_s):
+    """Write per-article status and timings as JSON next to the output."""
+    report = {
+        "pdf": pdf_path,
+        "articles": len(results),
+        "succeeded": sum(1 for result in results if result["status"] == "ok"),
+        "cached": sum(1 for result in results if result.get("cached")),
+        "elapsed_s": elapsed_s,
+        "results": sorted(results, key=lambda result: result["index"]),
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
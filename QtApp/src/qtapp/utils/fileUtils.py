@@ -0,0 +1,102 @@
+"""
+File helpers shared by the GUI and headless code paths.
+Qt-free so it can be imported from worker processes.
+"""
+import  os
+import  shutil
+import  hashlib
+try:
+    import  fcntl
+except ImportError:     # Windows
+    fcntl = None
+
+
+FINGERPRINT_SAMPLE = 1 << 20
+FICLONE = 0x40049409    # linux/fs.h, btrfs/xfs/bcachefs reflink ioctl
+
+
+def file_fingerprint(path, sample_size=FINGERPRINT_SAMPLE):
+    """
+    Return a cheap content fingerprint of path.
+
+    Hashes size, mtime and the first/last sample_size bytes, which is enough
+    to tell a re-written PDF apart without reading a 200 MB file in full.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(sample_size))
+        if stat.st_size > sample_size:
+            f.seek(max(sample_size, stat.st_size - sample_size))
+            digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
+
+def file_size(path):
+    """Return size of path in bytes, 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def is_same_content(src, dst):
+    """
+    True if dst already holds src: same inode, or same size and mtime.
+
+    handoff_file preserves mtime on every path, so a previous handoff of an
+    unchanged src is recognised without reading either file.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return True
+        src_stat, dst_stat = os.stat(src), os.stat(dst)
+    except OSError:
+        return False
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def reflink_file(src, dst):
+    """Clone src to dst with the FICLONE ioctl; False if the filesystem cannot."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def handoff_file(src, dst):
+    """
+    Make dst a read-only view of src as cheaply as the filesystem allows.
+
+    Tries, in order: nothing (dst already holds src), a hardlink, a reflink
+    and finally a full copy. The linker only reads its input, so sharing
+    blocks with src is safe; dst is swapped in atomically.
+
+    Returns:
+        str: "unchanged", "hardlink", "reflink" or "copy"
+    """
+    if os.path.exists(dst) and is_same_content(src, dst):
+        return "unchanged"
+
+    tmp_path = dst + ".handoff"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+        method = "hardlink"
+    except OSError:
+        if reflink_file(src, tmp_path):
+            method = "reflink"
+        else:
+            shutil.copy2(src, tmp_path)
+            method = "copy"
+    os.replace(tmp_path, dst)
+    return method
@@ -0,0 +1,124 @@
+"""
+Qt-free instrumentation for linking runs.
+Workers emit phase and per-article events; Bridge re-emits them as a Qt signal and appends them to a JSON lines file.
+"""
+import  os
+import  json
+import  time
+import  uuid
+import  pymupdf
+import  contextlib
+
+
+TELEMETRY_SUFFIX = "_telemetry.jsonl"
+
+
+def telemetry_path(output_path):
+    """JSON lines file that collects the events of every run producing output_path."""
+    return os.path.splitext(output_path)[0] + TELEMETRY_SUFFIX
+
+
+def append_jsonl(path, record):
+    """Append one event to a JSON lines file."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def count_link_items(doc, first=0, last=None):
+    """
+    Count pages, citation marks and links on pages first..last of an open document.
+
+    Citation marks are the non-link annotations the linker adds around
+    every citation it found; links are the link annotations it inserted.
+    """
+    last = doc.page_count - 1 if last is None else last
+    counts = {"pages": 0, "citations": 0, "links": 0}
+    for page_idx in range(first, last + 1):
+        page = doc[page_idx]
+        counts["pages"] += 1
+        counts["citations"] += sum(1 for _ in page.annots())
+        counts["links"] += len(page.get_links())
+    return counts
+
+
+def count_pdf_items(pdf_path, first=0, last=None):
+    """count_link_items for a PDF file; empty counts if it cannot be opened."""
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            return count_link_items(doc, first, last)
+    except Exception as e:
+        print(f"Could not count links in {pdf_path}: {e}")
+        return {"pages": 0, "citations": 0, "links": 0}
+
+
+def count_articles(pdf_path, articles):
+    """count_link_items for every {"first", "last"} article range of a PDF file, in order."""
+    with pymupdf.open(pdf_path) as doc:
+        return [count_link_items(doc, article["first"], article["last"]) for article in articles]
+
+
+def count_inserted(before, after):
+    """Citation marks and links added by the linker (after minus before, which may be None)."""
+    before = before or {"pages": 0, "citations": 0, "links": 0}
+    return {
+        "pages": after["pages"],
+        "citations": max(0, after["citations"] - before["citations"]),
+        "links": max(0, after["links"] - before["links"]),
+    }
+
+
+class LinkTelemetry:
+    """
+    Event source for one linking run.
+
+    Parent: Bridge, LinkingWorker, ArticleLinkingWorker
+    Children: None
+
+    Every event is a flat dict with "run_id", "event", "time" (wall clock)
+    and "t" (seconds since the telemetry was created) plus event fields:
+    - run_start / run_end: Bridge, once per run
+    - phase_start / phase_end: prepare, split, link, merge, cache, verify, ...
+      (phase_end carries "elapsed_s" and "status")
+    - article: per-article status, timings and counts
+    - document: counts of a whole-volume run
+    Events are passed to emit_func, which is a Qt signal's emit in the workers.
+    """
+    def __init__(self, emit_func=None, run_id=None):
+        """Initialize telemetry; a new run_id is generated if none is given."""
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.emit_func = emit_func
+        self.start = time.perf_counter()
+
+    def event(self, event, **fields):
+        """Build an event, pass it to emit_func and return it."""
+        record = {
+            "run_id": self.run_id,
+            "event": event,
+            "time": round(time.time(), 3),
+            "t": round(time.perf_counter() - self.start, 4),
+        }
+        record.update(fields)
+        if self.emit_func:
+            self.emit_func(record)
+        return record
+
+    @contextlib.contextmanager
+    def phase(self, name, **fields):
+        """
+        Emit phase_start/phase_end around a block.
+
+        The block may set "status" (default "ok", "error" on exceptions) or
+        add fields to the phase_end event through the yielded dict.
+        """
+        end_fields = dict(fields)
+        end_fields["status"] = "ok"
+        start = time.perf_counter()
+        self.event("phase_start", phase=name, **fields)
+        try:
+            yield end_fields
+        except Exception:
+            end_fields["status"] = "error"
+            raise
+        finally:
+            self.event("phase_end", phase=name, elapsed_s=round(time.perf_counter() - start, 4),
+                       **end_fields)
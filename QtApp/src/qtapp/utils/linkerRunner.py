@@ -0,0 +1,177 @@
+"""
+Qt-free helpers for running the citation linker entry points.
+Safe to import from worker processes (no QtWidgets/QtGui imports).
+"""
+import  os
+import  sys
+import  time
+import  shutil
+import  importlib
+import  traceback
+import  contextlib
+
+from    qtapp.utils.fileUtils           import  handoff_file
+
+
+# cmd_in name -> (module, function) of the citation_linker entry point
+LINKER_ENTRY_POINTS = {
+    "citation-linker":          ("citation_linker.citationLinker", "main"),
+    "citation-multi-file":      ("citation_linker.multiFile", "main"),
+    "citation-multi-article":   ("citation_linker.multiArticle", "main"),
+}
+DEFAULT_LINKER = "citation-multi-article"
+
+
+def get_linker_main(cmd_in=None):
+    """Import and return the linker main function for cmd_in."""
+    module_name, func_name = LINKER_ENTRY_POINTS.get(cmd_in, LINKER_ENTRY_POINTS[DEFAULT_LINKER])
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def run_linker(cmd_in=None):
+    """
+    Run a linker entry point in the current process.
+
+    The entry points return exit codes instead of calling sys.exit().
+
+    Returns:
+        int: Exit code (0 for success, non-zero for failure)
+    """
+    try:
+        return_code = get_linker_main(cmd_in)()
+    except Exception as e:
+        print(f"Error during linking process: {e}")
+        traceback.print_exc()
+        return_code = 1
+    return 1 if return_code is None else return_code
+
+
+def run_linker_in_child(cmd_in, result_queue):
+    """Process target: run the linker and report the exit code through result_queue."""
+    result_queue.put(run_linker(cmd_in))
+
+
+# environment variables that configPaths may derive its location files from
+USER_DIR_ENV = {
+    "HOME":             "",
+    "USERPROFILE":      "",
+    "APPDATA":          os.path.join("AppData", "Roaming"),
+    "LOCALAPPDATA":     os.path.join("AppData", "Local"),
+    "XDG_CONFIG_HOME":  ".config",
+    "XDG_DATA_HOME":    os.path.join(".local", "share"),
+}
+
+
+def isolate_user_dirs(home):
+    """
+    Point all user directory variables at home.
+
+    citation_linker keeps its active config/input/output locations in per-user
+    files; giving every job its own home keeps parallel jobs from overwriting
+    each other's locations. Must run before citation_linker is imported.
+    """
+    if "citation_linker.configPaths" in sys.modules:
+        print("warning: citation_linker already imported, user dirs not isolated")
+    for var, sub_dir in USER_DIR_ENV.items():
+        path = os.path.join(home, sub_dir)
+        os.makedirs(path, exist_ok=True)
+        os.environ[var] = path
+
+
+def active_config_path():
+    """
+    The user's active config file as registered with configPaths, or None.
+
+    Must be called in the parent process, before any job isolates its user
+    dirs: inside a job's scratch home only the factory defaults exist.
+    """
+    try:
+        from citation_linker.configPaths import resolve_config_path
+        config_path = resolve_config_path()
+    except Exception as e:
+        print(f"Could not resolve the active config: {e}")
+        return None
+    if not config_path or not os.path.isfile(config_path):
+        return None
+    return os.path.abspath(str(config_path))
+
+
+def prepare_scratch(scratch_dir, config_path):
+    """
+    Create an isolated linker environment inside scratch_dir.
+
+    Returns:
+        tuple: (input_dir, output_dir) registered with configPaths
+    """
+    input_dir = os.path.join(scratch_dir, "input")
+    output_dir = os.path.join(scratch_dir, "output")
+    home_dir = os.path.join(scratch_dir, "home")
+    for path in (input_dir, output_dir, home_dir):
+        os.makedirs(path, exist_ok=True)
+
+    isolate_user_dirs(home_dir)
+    from citation_linker.configPaths import ensure_defaults, resolve_config_path, resolve_dir_paths
+    ensure_defaults()
+    if config_path:
+        scratch_config = os.path.join(scratch_dir, os.path.basename(config_path))
+        shutil.copy(config_path, scratch_config)
+        resolve_config_path(scratch_config)
+    resolve_dir_paths({"input": input_dir, "output": output_dir})
+    return input_dir, output_dir
+
+
+def run_linker_job(job):
+    """
+    Link one PDF in an isolated scratch directory (process pool target).
+
+    Args:
+        job: dict with "pdf", "config", "scratch_dir", "output_dir", "cmd_in"
+             and optional "keep_scratch" and "output_name" (base name of the
+             linked PDF and log in output_dir, defaults to the PDF's)
+
+    Returns:
+        dict: Per-file status ("ok", "failed" or "error"), timings and paths
+    """
+    start = time.perf_counter()
+    pdf_path = job["pdf"]
+    base, ext = os.path.splitext(os.path.basename(pdf_path))
+    output_name = job.get("output_name") or base
+    log_path = os.path.join(job["output_dir"], output_name + ".log")
+    result = {
+        "pdf": pdf_path,
+        "status": "error",
+        "return_code": None,
+        "output": None,
+        "log": log_path,
+        "error": None,
+    }
+
+    try:
+        with open(log_path, "w", encoding="utf-8") as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            input_dir, output_dir = prepare_scratch(job["scratch_dir"], job.get("config"))
+            result["handoff"] = handoff_file(pdf_path, os.path.join(input_dir, base + ext))
+            prepared = time.perf_counter()
+            result["prepare_s"] = prepared - start
+
+            return_code = run_linker(job.get("cmd_in"))
+            result["link_s"] = time.perf_counter() - prepared
+            result["return_code"] = return_code
+
+        linked_path = os.path.join(output_dir, base + "_linked" + ext)
+        if return_code == 0 and os.path.exists(linked_path):
+            final_path = os.path.join(job["output_dir"], output_name + "_linked" + ext)
+            shutil.move(linked_path, final_path)
+            result["output"] = final_path
+            result["status"] = "ok"
+        else:
+            result["status"] = "failed"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if not job.get("keep_scratch"):
+            shutil.rmtree(job["scratch_dir"], ignore_errors=True)
+
+    result["elapsed_s"] = time.perf_counter() - start
+    return result
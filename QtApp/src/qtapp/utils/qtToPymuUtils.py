@@ -3,6 +3,7 @@ Coordinate and rectangle conversion utilities between Qt and PyMuPDF.
 Handles DPI/pixel transformations and zoom factor calculations.
 """
 import  pymupdf
+from    array           import  array
 from    PySide6.QtCore  import  QPointF, QPoint, QRectF, QSizeF, QRect, QSize
 
 
@@ -75,3 +76,69 @@ def dpi_to_px(rect_info):
     
     return view_rect
 
+
+""" 
+rect arrays
+flat array('d') of N rects laid out as x0, y0, x1, y1, x0, y0, ...
+(page space in points unless stated otherwise); one array per page
+replaces N QRectF objects on the paint and hit-test paths
+"""
+
+
+def rects_to_array(rects):
+    """Pack PyMuPDF Rects, QRectFs or (x0, y0, x1, y1) tuples into a flat rect array."""
+    coords = array("d")
+    for rect in rects:
+        if isinstance(rect, (QRectF, QRect)):
+            coords.extend((rect.left(), rect.top(),
+                           rect.left() + rect.width(), rect.top() + rect.height()))
+        else:
+            coords.extend(tuple(rect)[:4])
+    return coords
+
+def array_rect(rect_array, idx):
+    """Return rect idx of a flat rect array as a (x0, y0, x1, y1) tuple."""
+    base = idx * 4
+    return tuple(rect_array[base:base + 4])
+
+def scale_rect_array(rect_array, zoom_factor, dx=0.0, dy=0.0):
+    """Scale every rect by zoom_factor and shift by (dx, dy) in one pass."""
+    offsets = (dx, dy, dx, dy)
+    return array("d", [value * zoom_factor + offsets[i & 3]
+                       for i, value in enumerate(rect_array)])
+
+def array_to_qrects(rect_array):
+    """Unpack a flat rect array into integer QRects (rounded corners)."""
+    rects = []
+    it = iter(rect_array)
+    for x0, y0, x1, y1 in zip(it, it, it, it):
+        left, top = round(x0), round(y0)
+        rects.append(QRect(left, top, round(x1) - left, round(y1) - top))
+    return rects
+
+def array_to_qrectfs(rect_array):
+    """Unpack a flat rect array into QRectFs."""
+    it = iter(rect_array)
+    return [QRectF(x0, y0, x1 - x0, y1 - y0)
+            for x0, y0, x1, y1 in zip(it, it, it, it)]
+
+def dpi_to_px_batch(rect_array, zoom_factor, dx=0.0, dy=0.0):
+    """
+    Convert N page-space rects to pixel QRects in one pass.
+
+    With (dx, dy) set to the page offset in the viewport (see
+    TextSelector.page_to_viewport_offset) the result is in viewport
+    coordinates, replacing dpi_to_px + page_to_viewport_coords per item.
+    """
+    return array_to_qrects(scale_rect_array(rect_array, zoom_factor, dx, dy))
+
+def px_to_dpi_batch(rect_array, zoom_factor, dx=0.0, dy=0.0):
+    """Convert N pixel rects (flat array) back to page-space QRectFs; inverse of dpi_to_px_batch."""
+    inverse = 1.0 / zoom_factor
+    return array_to_qrectfs(scale_rect_array(rect_array, inverse, -dx * inverse, -dy * inverse))
+
+def points_to_px_batch(points, zoom_factor):
+    """Batch variant of point_to_px; None entries are passed through."""
+    return [QPoint(int(point.x() / zoom_factor), int(point.y() / zoom_factor))
+            if point is not None else None
+            for point in points]
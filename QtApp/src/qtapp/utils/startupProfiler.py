@@ -0,0 +1,106 @@
+"""
+Startup timing for the Citation Linker application (--profile-startup).
+Qt-free and dependency-free so it can be imported before anything heavy is loaded.
+"""
+import  sys
+import  time
+from    contextlib                      import  contextmanager
+
+
+# modules whose import dominates cold start; reported as loaded/deferred
+HEAVY_MODULES = [
+    "pymupdf",
+    "PySide6.QtWidgets",
+    "PySide6.QtPdf",
+    "PySide6.QtPdfWidgets",
+    "citation_linker",
+    "citation_linker.configPaths",
+]
+
+
+class StartupProfiler:
+    """
+    Collects import/construct timings relative to process start.
+
+    Parent: None
+    Children: None
+
+    Disabled by default; every call is a no-op until enable() is called,
+    so the hooks can stay in the startup path permanently.
+    """
+    def __init__(self):
+        """Initialize a disabled profiler."""
+        self.enabled = False
+        self.start = time.perf_counter()
+        self.records = []
+        self.depth = 0
+
+    def enable(self):
+        """Start recording; timings are reported relative to this call."""
+        self.enabled = True
+        self.start = time.perf_counter()
+        self.records = []
+
+    def mark(self, label):
+        """Record a milestone (time since start)."""
+        if self.enabled:
+            self.records.append(("mark", label, time.perf_counter() - self.start, 0.0, self.depth))
+
+    @contextmanager
+    def measure(self, label, category="construct"):
+        """
+        Time the enclosed block.
+
+        Args:
+            label: Name shown in the report
+            category: "import" or "construct"
+        """
+        if not self.enabled:
+            yield
+            return
+        begin = time.perf_counter()
+        record_idx = len(self.records)
+        self.records.append(None)
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.records[record_idx] = (category, label, begin - self.start,
+                                        time.perf_counter() - begin, self.depth)
+
+    def totals(self):
+        """Return top-level seconds spent per category."""
+        totals = {}
+        for record in self.records:
+            if record is None:
+                continue
+            category, _, _, duration, depth = record
+            if category != "mark" and depth == 0:
+                totals[category] = totals.get(category, 0.0) + duration
+        return totals
+
+    def report(self, title="startup"):
+        """Print the timing breakdown and which heavy modules are loaded."""
+        if not self.enabled:
+            return
+        print("=========================")
+        print(f"{title} profile (ms since start)")
+        print(f"{'at':>9} {'took':>9}  {'kind':9} step")
+        for record in self.records:
+            if record is None:
+                continue
+            category, label, at, duration, depth = record
+            took = f"{duration * 1000:9.1f}" if category != "mark" else " " * 9
+            print(f"{at * 1000:9.1f} {took}  {category:9} {'  ' * depth}{label}")
+        print("----")
+        for category, total in sorted(self.totals().items()):
+            print(f"total {category:9}            {total * 1000:9.1f} ms")
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        deferred = [name for name in HEAVY_MODULES if name not in sys.modules]
+        print(f"loaded:   {', '.join(loaded) or '-'}")
+        print(f"deferred: {', '.join(deferred) or '-'}")
+        print("=========================")
+
+
+profiler = StartupProfiler()
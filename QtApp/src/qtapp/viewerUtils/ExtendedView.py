@@ -1,7 +1,8 @@
 from    PySide6.QtPdfWidgets            import  QPdfView
 from    PySide6.QtPdf                   import  QPdfPageNavigator
 from    PySide6.QtCore                  import  Qt, QMargins, QRect, QRectF, QTimer, QPoint, Slot
-from    PySide6.QtGui                   import  QKeyEvent, QMouseEvent, QGuiApplication, QPainter, QPen, QColor
+from    PySide6.QtGui                   import  QKeyEvent, QKeySequence, QMouseEvent, QGuiApplication, QPainter, QPen, QColor
+from    PySide6.QtWidgets               import  QMessageBox
 
 from    qtapp.viewerUtils.TextSelector  import  TextSelector
 """
@@ -12,6 +13,8 @@ from    qtapp.utils.TextHandler         import  TextHandler
 from    qtapp.viewerUtils.Navigator     import  PdfNavigator
 from    qtapp.viewerUtils.ZoomSelector  import  ZoomSelector
 from    qtapp.components.PopupWidget    import  PopupWidget
+from    qtapp.viewerUtils.RenderCache   import  RenderCache
+from    qtapp.viewerUtils.OverlayLayer  import  OverlayLayer
 from    qtapp.utils.qtToPymuUtils       import  dpi_to_px, px_to_dpi
 
 from    functools                       import  partial
@@ -74,8 +77,10 @@ class   ExtendedView(QPdfView):
         self.current_annotations = None
         self.current_links = None
         self.curr_page_rect = None
-        self.curr_annot_idx = 0
+        self.curr_annot_xref = None   # xref of the annotation/link the popup acts on
+        self.curr_annot_page = None
         self.curr_annot_type = None
+        self.search_hit = None      # (page, (x0, y0, x1, y1) in PDF points)
         self.is_output = isOutput
         print("dpi: ", dpi, "transform_factor: ", self.zoom_transform_factor)
         print("physical dpi: ", physical_dpi)
@@ -85,6 +90,8 @@ class   ExtendedView(QPdfView):
         self.text_handler = textHandler
         self.navigator = navigator
         self.zoom_selector = zoomSelector
+        self.render_cache = RenderCache(self)
+        self.overlay_layer = OverlayLayer()
         if self.is_output:
             self.popup = PopupWidget(self, QPoint(0,0), {"add_link", "add_destination"})
         else:
@@ -96,7 +103,7 @@ class   ExtendedView(QPdfView):
         self.selection_enabled = False
         self.setPageSpacing(0)
         self.setDocumentMargins(QMargins(10,10,10,10))
-        self.popup.assign_alt_buttons({"delete"})
+        self.popup.assign_alt_buttons({"delete", "delete all in article"})
         self.popup.switch_buttons_to(alt=False)
         self.navigator.hide()
         self.zoom_selector.hide()
@@ -111,14 +118,24 @@ class   ExtendedView(QPdfView):
             self.popup.button_objs["special_case"].clicked.connect(self.handle_special_case)
 
         self.popup.alt_buttons["delete"].clicked.connect(partial(self.on_annot_event, "delete"))
+        self.popup.alt_buttons["delete all in article"].clicked.connect(partial(self.on_bulk_event, "delete"))
+        self.text_handler.bulk_edit_finished.connect(self.on_bulk_edit_finished)
+        self.render_cache.page_ready.connect(self.on_page_rendered)
+        self.navigator.scheduler.burst_finished.connect(self.on_navigation_settled)
 
 
     def paintEvent(self, event):
-        """Custom paint to draw annotations, links, page highlights, and selections."""
-        super().paintEvent(event)
+        """Custom paint to draw the page, annotations, links, page highlights, and selections."""
         self.update_text_selector()
-        self.paint_annotiations()
-        self.paint_pages()
+        if not self.paint_page():
+            super().paintEvent(event)
+        if self.navigator.scheduler.skip_overlays():
+            # flying past pages: overlays are painted once the burst lands
+            self.current_annotations = None
+            self.current_links = None
+        else:
+            self.paint_overlay()
+            self.paint_search_hit()
         if self.selection_rect:
             painter = QPainter(self.viewport())
             color = QColor(255, 255, 0, 100)
@@ -127,50 +144,104 @@ class   ExtendedView(QPdfView):
             painter.drawRect(self.selection_rect)
             painter.end()
 
+    def setDocument(self, document):
+        """Set the document and point the render cache at it."""
+        super().setDocument(document)
+        self.render_cache.set_document(document)
+
+    def paint_page(self):
+        """
+        Paint the current page from the render cache; False if there is no page to show.
+
+        The view does its own page rendering instead of QPdfView's, so a page is
+        rendered once (by the cache, neighbours in the background) and drawn at
+        the same origin the overlays and the text selection use. A page not
+        rendered yet stays blank until page_ready; neighbours are not
+        prefetched during a navigation burst.
+        """
+        curr_page = self.navigator.get_curr_page()
+        document = self.document()
+        if curr_page is None or document is None or not 0 <= curr_page < document.pageCount():
+            return False
+        zoom = self.effectiveZoomFactor()
+        self.render_cache.set_zoom(zoom, self.devicePixelRatioF())
+        self.render_cache.prefetch(curr_page, neighbours=not self.navigator.scheduler.skip_overlays())
+        image = self.render_cache.get(curr_page)
+
+        dx, dy = self.text_selector.page_to_viewport_offset()
+        page_size = document.pagePointSize(curr_page)
+        page_rect = QRectF(dx, dy, page_size.width() * zoom, page_size.height() * zoom)
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), self.palette().dark())
+        painter.fillRect(page_rect, Qt.white)
+        if image is not None:
+            painter.drawImage(page_rect, image)
+        painter.end()
+        return True
+
+    @Slot()
+    def on_page_rendered(self, page_idx):
+        """Repaint when the page on screen finished rendering in the background."""
+        if page_idx == self.navigator.get_curr_page():
+            self.viewport().update()
+
+    @Slot()
+    def on_navigation_settled(self, page_idx):
+        """Paint overlays (and prefetch neighbours) for the page a navigation burst landed on."""
+        self.viewport().update()
+
     def mousePressEvent(self, event):
         """Handle mouse press for text selection and annotation interaction."""
         if self.selection_enabled and event.button() == Qt.LeftButton:
             self.clear_selection()
             self.update_text_selector()
             self.text_selector.handleMousePress(event)
-            if self.current_links and self.current_annotations:
-                for annot in self.current_annotations:
-                    screen_rect = self.text_selector.page_to_viewport_coords(annot["rect"])
-                for link in self.current_links:
-                    screen_rect = self.text_selector.page_to_viewport_coords(link["from"])
-                    if screen_rect.contains(event.pos()):
-                        print("INTERSECTIOON LINK Left click")
-                        print("to filed", link["to_dpi"])
-                        self.navigator.jump_to(link["page"], link["to_dpi"])
+            for kind, xref in self.hit_test(event.pos()):
+                if kind == "link":
+                    link = self.hit_item(kind, xref)
+                    print("INTERSECTIOON LINK Left click")
+                    print("to filed", link["to_dpi"])
+                    self.navigator.jump_to(link["page"], link["to_dpi"])
+                    break
 
         elif event.button() == Qt.RightButton:
             self.clear_selection()
             self.update_text_selector()
-            if self.current_links and self.current_annotations:
-                for idx, annot in enumerate(self.current_annotations):
-                    screen_rect = self.text_selector.page_to_viewport_coords(annot["rect"])
-                    if screen_rect.contains(event.pos()):
-                        print ("INTERSECTION")
-                        popup_pos = self.viewport().mapToGlobal(event.pos())
-                        self.popup.show_at(popup_pos, alt=True)
-                        self.curr_annot_type = "annot"
-                        self.curr_annot_idx = idx
-                        event.accept()
-                        return
-                for idx, link in enumerate(self.current_links):
-                    screen_rect = self.text_selector.page_to_viewport_coords(link["from"])
-                    if screen_rect.contains(event.pos()):
-                        print("INTERSECTION LINK")
-                        print("to field", link["to_dpi"])
-                        popup_pos = self.viewport().mapToGlobal(event.pos())
-                        self.popup.show_at(popup_pos, alt=True)
-                        self.curr_annot_idx = idx
-                        self.curr_annot_type = "link"
+            hits = self.hit_test(event.pos())
+            if hits:
+                kind, xref = hits[0]
+                if kind == "annot":
+                    print ("INTERSECTION")
+                else:
+                    print("INTERSECTION LINK")
+                    print("to field", self.hit_item(kind, xref)["to_dpi"])
+                self.handle_annots(event, xref, kind)
             event.accept()
             return
         else:
             super().mousePressEvent(event)
 
+    def hit_test(self, pos):
+        """
+        Resolve annotations/links under a viewport position, topmost first.
+
+        The position is transformed once into page space and looked up in the
+        page's spatial index instead of transforming every item to the viewport.
+        """
+        if self.current_links is None or self.current_annotations is None:
+            return []
+        curr_page = self.navigator.get_curr_page()
+        if curr_page is None:
+            return []
+        page_point = self.text_selector.viewport_to_page_point(pos)
+        return self.text_handler.hit_test(curr_page, page_point)
+
+    def hit_item(self, kind, xref, page_idx=None):
+        """Display dict of an annotation/link by xref on page_idx (default: current page)."""
+        if page_idx is None:
+            page_idx = self.navigator.get_curr_page()
+        return self.text_handler.get_item_px(page_idx, kind, xref, self.effectiveZoomFactor())
+
     def mouseMoveEvent(self, event):
         """Handle mouse move during text selection."""
         if self.selection_enabled and self.text_selector.selecting:
@@ -220,9 +291,21 @@ class   ExtendedView(QPdfView):
             super().wheelEvent(event)
 
     def keyPressEvent(self, event):
-        """Handle keyboard events for page navigation and article selection."""
+        """
+        Handle keyboard events for page navigation, article selection,
+        undo/redo of edits and picking a suggested link destination.
+        """
         self.clear_selection()
-        if event.key() == Qt.Key_Up:
+        suggestions = getattr(self.parent, "link_suggestions", None)
+        if suggestions and suggestions.has_suggestions() and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            suggestions.commit()
+        elif suggestions and suggestions.isVisible() and event.key() == Qt.Key_Escape:
+            suggestions.dismiss()
+        elif event.matches(QKeySequence.Undo):
+            self.text_handler.undo()
+        elif event.matches(QKeySequence.Redo):
+            self.text_handler.redo()
+        elif event.key() == Qt.Key_Up:
             self.navigator.page_back()
         elif event.key() == Qt.Key_Down:
             self.navigator.page_forward()
@@ -239,20 +322,19 @@ class   ExtendedView(QPdfView):
         """Toggle page selection for multi-article document boundaries."""
         curr_page = self.navigator.get_curr_page()
 
-        for elem in self.text_handler.article_cache[:]:
-            for pos, page in elem.items():
-                if curr_page == page:
-                    print(f"you are on a {curr_page} which a part of {elem}")
-                    self.text_handler.article_cache.remove(elem)
-                    self.last_page = None
-                    self.curr_page_rect = None
-                    self.first_page = None
-                    if curr_page != elem["first"]:
-                        self.first_page = elem["first"]
-                    if self.curr_page_rect:
-                        self.viewport().update(self.curr_page_rect)
-                    self.viewport().update()
-                    return
+        elem = self.text_handler.article_cache.find_boundary(curr_page)
+        if elem is not None:
+            print(f"you are on a {curr_page} which a part of {elem}")
+            self.text_handler.article_cache.remove(elem)
+            self.last_page = None
+            self.curr_page_rect = None
+            self.first_page = None
+            if curr_page != elem["first"]:
+                self.first_page = elem["first"]
+            if self.curr_page_rect:
+                self.viewport().update(self.curr_page_rect)
+            self.viewport().update()
+            return
 
         if self.first_page is None:
             self.first_page = curr_page
@@ -269,8 +351,12 @@ class   ExtendedView(QPdfView):
         elif curr_page > self.first_page:
             self.last_page = curr_page
             article_info = {"first": self.first_page, "last": self.last_page}
-            print(f"Article saved: pages {self.first_page} to {self.last_page}")
-            self.text_handler.article_cache.append(article_info)
+            overlaps = self.text_handler.article_cache.overlapping(self.first_page, self.last_page)
+            if overlaps:
+                print(f"Warning: pages {self.first_page} to {self.last_page} overlap {overlaps}, not saved")
+            else:
+                print(f"Article saved: pages {self.first_page} to {self.last_page}")
+                self.text_handler.article_cache.append(article_info)
             self.first_page = None
             self.last_page = None
             self.curr_page_rect = None
@@ -286,11 +372,12 @@ class   ExtendedView(QPdfView):
 
         self.viewport().update()
 
-    def handle_annots(self, event, annot_idx, type="annot"):
+    def handle_annots(self, event, annot_xref, type="annot"):
         """Show context menu for annotation actions."""
         popup_pos = self.viewport().mapToGlobal(event.pos())
         self.popup.show_at(popup_pos, alt=True)
-        self.curr_annot_idx = annot_idx
+        self.curr_annot_xref = annot_xref
+        self.curr_annot_page = self.navigator.get_curr_page()
         if type == "annot":
             self.curr_annot_type = "annot"
         else:
@@ -298,24 +385,35 @@ class   ExtendedView(QPdfView):
 
 
     def on_annot_event(self, action):
-        """Execute action on selected annotation or link."""
+        """
+        Execute action on selected annotation or link.
+
+        The target is addressed by xref, so it stays valid (or is reported
+        gone) when the other viewer of this document edited the page meanwhile.
+        """
+        item = self.hit_item(self.curr_annot_type, self.curr_annot_xref, self.curr_annot_page)
+        if item is None:
+            print(f"{self.curr_annot_type} {self.curr_annot_xref} no longer exists")
+            self.popup.hide()
+            self.viewport().update()
+            return
+
         if  self.curr_annot_type == "annot":
             print("action:", action)
             new_rect = None
             self.text_handler.annot_action(
-                    self.curr_annot_idx,
+                    self.curr_annot_xref,
                     action,
-                    new_rect
+                    new_rect,
+                    self.curr_annot_page
                     )
 
-            update_rect = (self.text_selector.page_to_viewport_coords
-                (self.current_annotations[self.curr_annot_idx]["rect"]))
+            update_rect = self.text_selector.page_to_viewport_coords(item["rect"])
             
         elif self.curr_annot_type == "link":
             new_dest = None
-            self.text_handler.link_action(self.curr_annot_idx, action, new_dest)
-            update_rect = (self.text_selector.page_to_viewport_coords
-                (self.current_links[self.curr_annot_idx]["from"]))
+            self.text_handler.link_action(self.curr_annot_xref, action, new_dest, self.curr_annot_page)
+            update_rect = self.text_selector.page_to_viewport_coords(item["from"])
             update_rect.setHeight(update_rect.height() + 2)
             update_rect.setWidth(update_rect.width() + 2)
             update_rect.setX(update_rect.x() - 1)
@@ -324,6 +422,52 @@ class   ExtendedView(QPdfView):
         self.popup.hide()
 
 
+    def on_bulk_event(self, action):
+        """
+        Apply action to every annotation of the selected one's type (or every
+        link) in the current article, after the user confirmed the scope and
+        the number of items. Without an article on the page the dialog offers
+        the whole document instead.
+        """
+        curr_page = self.curr_annot_page
+        item = self.hit_item(self.curr_annot_type, self.curr_annot_xref, curr_page)
+        self.popup.hide()
+        if item is None:
+            return
+        if self.curr_annot_type == "annot":
+            annot_type = item["type"]
+            kind = "annot"
+            select = lambda item: item["type"] == annot_type
+            what = f"{annot_type} annotations"
+        else:
+            kind = "link"
+            select = None
+            what = "links"
+        article = self.text_handler.article_cache.find(curr_page)
+        scope = "article" if article else "document"
+        pages = self.text_handler.scope_pages(scope, curr_page)
+        count = self.text_handler.count_bulk_items(pages, kind, select)
+        if article:
+            where = f"the article on pages {article['first'] + 1}-{article['last'] + 1}"
+        else:
+            where = f"the whole document ({len(pages)} pages)"
+        if count == 0:
+            QMessageBox.information(self, f"{action.capitalize()} all", f"There are no {what} in {where}.")
+            return
+        message = f"{action.capitalize()} {count} {what} in {where}?"
+        if not article:
+            message = f"Page {curr_page + 1} is not part of an article.\n" + message
+        answer = QMessageBox.question(self, f"{action.capitalize()} all", message,
+                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            return
+        self.text_handler.bulk_edit(action, pages, kind=kind, select=select)
+
+    @Slot()
+    def on_bulk_edit_finished(self, report):
+        """Repaint once after a bulk edit, however many pages it touched."""
+        self.viewport().update()
+
     @Slot()
     def handle_bibliography(self):
         """Mark selected text as bibliography delimiter."""
@@ -360,6 +504,8 @@ class   ExtendedView(QPdfView):
                         "viewport": self.viewport()
                       }
         self.parent.link_saved.emit(signal_data)
+        if getattr(self.parent, "link_suggestions", None):
+            self.parent.suggest_destinations(curr_text, self.navigator.get_curr_page())
         self.popup.hide()
         self.clear_selection()
         if self.selection_rect:
@@ -379,6 +525,7 @@ class   ExtendedView(QPdfView):
         self.text_handler.link_destination(dpi_rect,
                                            self.navigator.get_curr_page(),
                                            zoom_factor)
+        self.parent.destination_set.emit()
         self.popup.hide()
         self.clear_selection()
         if self.selection_rect:
@@ -421,37 +568,82 @@ class   ExtendedView(QPdfView):
         
 
 
-    def paint_annotiations(self):
-        """Paint all annotations and links for current page."""
+    def set_search_hit(self, page_idx, rect):
+        """Highlight a search result rect (PDF points) on page_idx."""
+        self.search_hit = (page_idx, rect)
+        self.viewport().update()
+
+    def clear_search_hit(self):
+        """Remove the search result highlight."""
+        self.search_hit = None
+
+    def paint_search_hit(self):
+        """Outline the current search hit if it is on the page shown."""
+        if self.search_hit is None or self.search_hit[0] != self.navigator.get_curr_page():
+            return
+        x0, y0, x1, y1 = self.search_hit[1]
+        zoom = self.effectiveZoomFactor()
+        dx, dy = self.text_selector.page_to_viewport_offset()
+        rect = QRectF(x0 * zoom + dx, y0 * zoom + dy, (x1 - x0) * zoom, (y1 - y0) * zoom)
         painter = QPainter(self.viewport())
-        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QColor(255, 140, 0, 90))
+        painter.setPen(QPen(QColor(255, 140, 0), 2))
+        painter.drawRect(rect.adjusted(-2, -2, 2, 2))
+        painter.end()
 
-        self.current_annotations = None
+    def paint_overlay(self):
+        """
+        Blit the cached overlay (annotations, links, article tints) for the current view state.
+
+        The overlay is repainted only when page, zoom, scroll, annotations/links
+        or article boundaries change; selection updates reuse it.
+        """
         curr_page = self.navigator.get_curr_page()
-        annotations = self.text_handler.get_all_annotations(curr_page, self.effectiveZoomFactor())
-        links = self.text_handler.get_all_links(curr_page, self.effectiveZoomFactor())
-        self.current_annotations = annotations
-        self.current_links = links
+        zoom = self.effectiveZoomFactor()
+        self.current_annotations = self.text_handler.get_all_annotations(curr_page, zoom)
+        self.current_links = self.text_handler.get_all_links(curr_page, zoom)
+
+        state = (curr_page,
+                 zoom,
+                 self.text_selector.page_to_viewport_offset(),
+                 self.text_handler.cache_generation,
+                 self.first_page,
+                 self.last_page,
+                 self.text_handler.article_cache.boundary_count(curr_page))
+        pixmap = self.overlay_layer.get(state, self.viewport().size(),
+                                        self.viewport().devicePixelRatioF(), self.paint_overlay_items)
+        painter = QPainter(self.viewport())
+        painter.drawPixmap(0, 0, pixmap)
+        painter.end()
 
-        for annot in annotations:
-            screen_rect = self.text_selector.page_to_viewport_coords(annot["rect"])
+    def paint_overlay_items(self, painter):
+        """Draw annotations, links and article tints with painter (overlay cache miss)."""
+        painter.save()
+        self.paint_annotiations(painter)
+        painter.restore()
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        self.paint_pages(painter)
 
+    def paint_annotiations(self, painter):
+        """Paint all annotations and links for current page."""
+        curr_page = self.navigator.get_curr_page()
+        annotations = self.current_annotations
+        annot_rects, link_rects = self.text_handler.get_viewport_rects(
+                curr_page, self.effectiveZoomFactor(), self.text_selector.page_to_viewport_offset())
+
+        for annot, screen_rect in zip(annotations, annot_rects):
             if annot["type"] == "Underline":
                 self.draw_underline(painter, screen_rect, annot)
             if annot["type"] == "Highlight":
                 self.draw_highlight(painter, screen_rect, annot)
             if annot["type"] == "Link":
                 self.draw_link(painter, screen_rect)
-        for link in links:
-            screen_rect = self.text_selector.page_to_viewport_coords(link["from"])
+        for screen_rect in link_rects:
             self.draw_link(painter, screen_rect)
 
-        painter.end()
-
-    def paint_pages(self):
+    def paint_pages(self, painter):
         """Paint page highlights for article boundaries."""
         curr_page = self.navigator.get_curr_page()
-        painter = QPainter(self.viewport())
         page_size = self.document().pagePointSize(curr_page)
         zoom = self.effectiveZoomFactor()
         page_rect = QRect(0, 0, int(page_size.width() * zoom), int(page_size.height() * zoom))
@@ -462,13 +654,10 @@ class   ExtendedView(QPdfView):
             painter.setBrush(color)
             painter.setPen(Qt.NoPen)
             painter.drawRect(rect)
-        for obj in self.text_handler.article_cache:
-            for value in obj.values():
-                if curr_page == value:
-                    color = QColor(0, 255, 0, 100)
-                    painter.setBrush(color)
-                    painter.drawRect(rect)
-        painter.end()
+        for _ in range(self.text_handler.article_cache.boundary_count(curr_page)):
+            color = QColor(0, 255, 0, 100)
+            painter.setBrush(color)
+            painter.drawRect(rect)
 
     def draw_underline(self, painter, rect, annot):
         """Draw underline annotation."""
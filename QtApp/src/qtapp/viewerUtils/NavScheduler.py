@@ -0,0 +1,129 @@
+"""
+Navigation scheduler that coalesces bursts of page jumps.
+Auto-repeat buttons and wheel ticks are merged into a single jump to the final target page.
+"""
+import  time
+from    PySide6.QtCore                  import  QObject, QTimer, Signal
+
+
+BURST_GAP_MS = 150          # longer than RepeatButton's 100 ms interval
+MAX_INTERVAL_MS = 400       # show progress at least this often during a burst
+
+
+class NavScheduler(QObject):
+    """
+    Coalesces page navigation requests into as few QPdfPageNavigator jumps as possible.
+
+    Parent: PdfNavigator
+    Children: QTimer
+
+    The first request after a quiet period jumps immediately. Later requests
+    that arrive within BURST_GAP_MS of each other only move the pending
+    target; the target is committed when the burst ends, and at most every
+    MAX_INTERVAL_MS while it continues so the view keeps up with the user.
+    Targets overwritten before being committed are counted as dropped.
+    Overlays (annotations, links, article highlights) are skipped while a
+    burst of more than one request runs; burst_finished asks the view to
+    paint them once.
+    """
+    burst_started = Signal()
+    burst_finished = Signal(int)
+
+    def __init__(self, parent=None, burst_gap_ms=BURST_GAP_MS, max_interval_ms=MAX_INTERVAL_MS):
+        """Initialize idle scheduler for a PdfNavigator."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.in_burst = False
+        self.pending_page = None
+        self.pending_location = None
+        self.max_interval_s = max_interval_ms / 1000.0
+        self.last_commit = 0.0
+
+        ### counters
+        self.requested = 0
+        self.committed = 0
+        self.dropped = 0
+        self.burst_requested = 0
+        self.burst_dropped = 0
+
+        self.gap_timer = QTimer(self)
+        self.gap_timer.setSingleShot(True)
+        self.gap_timer.setInterval(burst_gap_ms)
+
+        ### signals
+        self.gap_timer.timeout.connect(self.finish_burst)
+
+    ### methods
+    def skip_overlays(self):
+        """True while pages are flown past; a single jump still paints overlays."""
+        return self.in_burst and self.burst_requested > 1
+
+    def target_page(self):
+        """Page the navigation is heading to (pending target or current page)."""
+        if self.pending_page is not None:
+            return self.pending_page
+        return self.parent.nav.currentPage()
+
+    def request(self, page, location):
+        """Ask to show page; committed now or when the burst ends."""
+        self.requested += 1
+        self.gap_timer.start()
+
+        if not self.in_burst:
+            self.in_burst = True
+            self.burst_requested = 1
+            self.burst_dropped = 0
+            self.burst_started.emit()
+            self.commit(page, location)
+            return
+
+        self.burst_requested += 1
+        if self.pending_page is not None:
+            self.dropped += 1
+            self.burst_dropped += 1
+        self.pending_page = page
+        self.pending_location = location
+        if time.perf_counter() - self.last_commit >= self.max_interval_s:
+            self.flush()
+
+    def commit(self, page, location):
+        """Perform the actual jump."""
+        self.committed += 1
+        self.last_commit = time.perf_counter()
+        self.parent.nav.jump(page, location)
+
+    def flush(self):
+        """Commit the pending target, if any."""
+        if self.pending_page is None:
+            return
+        page, location = self.pending_page, self.pending_location
+        self.pending_page = None
+        self.pending_location = None
+        if page != self.parent.nav.currentPage():
+            self.commit(page, location)
+
+    def cancel(self):
+        """Forget the pending target (an explicit jump overrides the burst)."""
+        if self.pending_page is not None:
+            self.dropped += 1
+            self.burst_dropped += 1
+        self.pending_page = None
+        self.pending_location = None
+
+    def finish_burst(self):
+        """Gap timer expired: land on the final target and let overlays paint again."""
+        self.flush()
+        self.in_burst = False
+        if self.burst_requested > 1:
+            print(f"nav burst: {self.burst_requested} requests, {self.burst_dropped} jumps dropped")
+        self.burst_finished.emit(self.parent.nav.currentPage())
+
+    def stats(self):
+        """Return request/commit/drop counters."""
+        return {
+            "requested": self.requested,
+            "committed": self.committed,
+            "dropped": self.dropped,
+        }
@@ -12,6 +12,8 @@ from PySide6.QtWidgets      import (QWidget,
 from PySide6.QtPdf          import  QPdfPageNavigator
 from PySide6.QtGui          import  QValidator, QKeyEvent
 
+from qtapp.viewerUtils.NavScheduler import  NavScheduler
+
 
 class RepeatButton(QPushButton):
     """
@@ -105,6 +107,7 @@ class PdfNavigator(QWidget):
         self.layout = QHBoxLayout()
         self.setLayout(self.layout)
         self.nav = None
+        self.scheduler = NavScheduler(self)
         self.page_display = HumanReadableSpinBox()
         self.label = QLabel(f"/{total_pages}")
 
@@ -132,26 +135,27 @@ class PdfNavigator(QWidget):
     def page_forward(self):
         """Navigate to next page."""
         if self.nav:
-            page = self.nav.currentPage()
+            page = self.scheduler.target_page()
             location = self.nav.currentLocation()
             next_page = min(page + 1, self.page_display.maximum())
-            self.nav.jump(next_page, location)
+            self.scheduler.request(next_page, location)
             self.update_page_display(next_page)
 
     @Slot()
     def page_back(self):
         """Navigate to previous page."""
         if self.nav:
-            page = self.nav.currentPage()
+            page = self.scheduler.target_page()
             location = self.nav.currentLocation()
             prev_page = max(page - 1, self.page_display.minimum())
-            self.nav.jump(prev_page, location)
+            self.scheduler.request(prev_page, location)
             self.update_page_display(prev_page)
 
     @Slot()
     def history_forward(self):
         """Move forward in navigation history."""
         if self.nav:
+            self.scheduler.cancel()
             self.nav.forward()
             page = self.nav.currentPage()
             self.update_page_display(page)
@@ -160,6 +164,7 @@ class PdfNavigator(QWidget):
     def history_back(self):
         """Move backward in navigation history."""
         if self.nav:
+            self.scheduler.cancel()
             self.nav.back()
             page = self.nav.currentPage()
             self.update_page_display(page)
@@ -170,6 +175,7 @@ class PdfNavigator(QWidget):
         if self.nav:
             location = point if point else self.nav.currentLocation()
             # self.nav.jump(page, point)
+            self.scheduler.cancel()
             self.nav.jump(page_number, location)
             self.update_page_display(page_number)
         
@@ -181,17 +187,25 @@ class PdfNavigator(QWidget):
             self.page_display.setValue(page_number)
             self.page_display.blockSignals(False)
 
+    @Slot()
+    def on_nav_page_changed(self, page_number):
+        """Show the page jumped to, or the burst target while one is pending."""
+        if self.scheduler.pending_page is not None:
+            page_number = self.scheduler.pending_page
+        self.update_page_display(page_number)
+
     @Slot()
     def update_nav_from_spinbox(self):
         """Update navigation when page number manually entered."""
         if self.nav:
             page = self.page_display.value()
+            self.scheduler.cancel()
             self.nav.jump(page, QPointF())
 
     def set_view(self, view):
         """Connect navigator to PDF view."""
         self.nav: QPdfPageNavigator = view.pageNavigator()
-        self.nav.currentPageChanged.connect(self.update_page_display)
+        self.nav.currentPageChanged.connect(self.on_nav_page_changed)
         self.page_display.editingFinished.connect(self.update_nav_from_spinbox)
 
     def set_total_pages(self, tot_pages):
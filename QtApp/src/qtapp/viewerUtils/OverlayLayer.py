@@ -0,0 +1,61 @@
+"""
+Cached overlay layer for the PDF viewers.
+Annotations, links and article-boundary tints are painted once per view state into a transparent pixmap.
+"""
+from    PySide6.QtCore                  import  Qt
+from    PySide6.QtGui                   import  QPainter, QPixmap
+
+
+class OverlayLayer:
+    """
+    Viewport-sized pixmap holding everything ExtendedView draws over a page.
+
+    Parent: ExtendedView
+    Children: QPixmap
+
+    The pixmap is keyed by the view state passed to get() (page, zoom,
+    scroll offset, content generation, ...) and repainted only when that
+    key changes or invalidate() is called. Paint events for small dirty
+    rects (selection, rubber band, popup) blit the cached pixmap instead of
+    redrawing every underline, highlight and link box on the page.
+    """
+    def __init__(self):
+        """Initialize empty layer."""
+        self.pixmap = None
+        self.key = None
+        self.generation = 0
+        self.hits = 0
+        self.renders = 0
+
+    def invalidate(self):
+        """Force a repaint of the layer on the next get()."""
+        self.generation += 1
+
+    def get(self, state, size, device_pixel_ratio, paint_func):
+        """
+        Return the overlay pixmap for state, painting it with paint_func(painter) if stale.
+
+        Args:
+            state: Hashable view state the overlay depends on
+            size: Viewport QSize in logical pixels
+            device_pixel_ratio: Viewport device pixel ratio
+            paint_func: Callable drawing the overlay with a QPainter in viewport coordinates
+        """
+        key = (state, self.generation, size.width(), size.height(), device_pixel_ratio)
+        if key == self.key and self.pixmap is not None:
+            self.hits += 1
+            return self.pixmap
+
+        pixmap = QPixmap(max(1, round(size.width() * device_pixel_ratio)),
+                         max(1, round(size.height() * device_pixel_ratio)))
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        paint_func(painter)
+        painter.end()
+
+        self.pixmap = pixmap
+        self.key = key
+        self.renders += 1
+        return pixmap
@@ -0,0 +1,239 @@
+"""
+Background page rendering for the PDF viewers.
+Renders the current page and its neighbours on worker threads and keeps them in a byte-budgeted LRU.
+"""
+from    collections                     import  OrderedDict
+from    PySide6.QtCore                  import  QObject, QSize, Signal, Slot
+from    PySide6.QtPdf                   import  QPdfPageRenderer, QPdfDocumentRenderOptions
+
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_PREFETCH_PAGES = 2
+
+
+class RenderCache(QObject):
+    """
+    LRU cache of rendered page images at the current zoom.
+
+    Parent: ExtendedView
+    Children: QPdfPageRenderer
+
+    The cache is the only renderer of ExtendedView (QPdfView's own page
+    rendering is bypassed), so every page is rendered once. Pages are
+    rendered by QPdfPageRenderer in MultiThreaded mode, so
+    page_forward/page_back can show an image that was rendered while the
+    user was still reading the previous page. Entries are keyed by page
+    index and evicted least recently used first once the QImage bytes
+    exceed budget_bytes. Changing zoom drops every entry; results of
+    requests made before the change are discarded when they arrive.
+    Hits and misses are counted once per page shown, not per repaint.
+    """
+    page_ready = Signal(int)
+
+    def __init__(self, parent=None, budget_bytes=DEFAULT_BUDGET_BYTES, prefetch_pages=DEFAULT_PREFETCH_PAGES):
+        """Initialize an empty cache without a document."""
+        super().__init__(parent)
+
+        ### member declarations
+        self.parent = parent
+        self.budget_bytes = budget_bytes
+        self.prefetch_pages = prefetch_pages
+        self.document = None
+        self.zoom = None
+        self.device_pixel_ratio = 1.0
+        self.images = OrderedDict()     # page -> QImage
+        self.pending = {}               # request id -> page
+        self.pending_pages = set()
+        self.current_page = None
+        self.last_lookup = None         # page of the last counted get()
+        self.bytes_used = 0
+        self.options = QPdfDocumentRenderOptions()
+
+        ### counters
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.evictions = 0
+        self.stale = 0
+
+        self.renderer = QPdfPageRenderer(self)
+        self.renderer.setRenderMode(QPdfPageRenderer.RenderMode.MultiThreaded)
+
+        ### signals
+        self.renderer.pageRendered.connect(self.on_page_rendered)
+
+    ### methods
+    def set_document(self, document):
+        """Switch to a new QPdfDocument and drop all cached pages."""
+        self.document = document
+        self.renderer.setDocument(document)
+        self.invalidate()
+
+    def set_zoom(self, zoom, device_pixel_ratio=1.0):
+        """Set the zoom pages are rendered at; any change invalidates the cache."""
+        if zoom == self.zoom and device_pixel_ratio == self.device_pixel_ratio:
+            return
+        self.zoom = zoom
+        self.device_pixel_ratio = device_pixel_ratio
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop all cached images and forget in-flight requests."""
+        self.images.clear()
+        self.pending.clear()
+        self.pending_pages.clear()
+        self.last_lookup = None
+        self.bytes_used = 0
+
+    def suspend(self):
+        """
+        Detach the renderer and forget in-flight requests before the
+        document is closed or reloaded; waits for a render in progress.
+        """
+        self.pending.clear()
+        self.pending_pages.clear()
+        self.renderer.setDocument(None)
+
+    def resume(self):
+        """Reattach the renderer to the (reloaded) document after suspend()."""
+        self.renderer.setDocument(self.document)
+
+    def close(self):
+        """
+        Drop all cached pages and release the renderer before the document
+        is closed; the cache cannot render afterwards.
+        """
+        self.invalidate()
+        self.renderer.setDocument(None)
+        self.renderer.deleteLater()
+        self.renderer = None
+        self.document = None
+
+    def image_size(self, page_idx):
+        """Pixel size of page_idx at the current zoom."""
+        size = self.document.pagePointSize(page_idx)
+        scale = self.zoom * self.device_pixel_ratio
+        return QSize(max(1, round(size.width() * scale)),
+                     max(1, round(size.height() * scale)))
+
+    def get(self, page_idx):
+        """
+        Return the cached QImage for page_idx or None.
+
+        A hit or miss is counted when the page looked up changes (or the zoom
+        does); repainting the same page until its render arrives is not.
+        """
+        image = self.images.get(page_idx)
+        if image is not None:
+            self.images.move_to_end(page_idx)
+        if page_idx != self.last_lookup:
+            self.last_lookup = page_idx
+            if image is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return image
+
+    def request(self, page_idx):
+        """Queue page_idx for rendering unless it is cached or already in flight."""
+        if (self.document is None or self.zoom is None
+                or not 0 <= page_idx < self.document.pageCount()
+                or page_idx in self.images or page_idx in self.pending_pages):
+            return
+        request_id = self.renderer.requestPage(page_idx, self.image_size(page_idx), self.options)
+        self.pending[request_id] = page_idx
+        self.pending_pages.add(page_idx)
+
+    def prefetch(self, page_idx, neighbours=True):
+        """
+        Render page_idx and (with neighbours) its prefetch_pages neighbours on both sides, nearest first.
+
+        The window shrinks when fewer pages fit the budget at the current zoom,
+        so prefetching never evicts the page on screen or re-renders in a loop.
+        """
+        self.current_page = page_idx
+        self.request(page_idx)
+        if (not neighbours or self.document is None or self.zoom is None
+                or not 0 <= page_idx < self.document.pageCount()):
+            return
+        size = self.image_size(page_idx)
+        page_bytes = size.width() * size.height() * 4
+        radius = min(self.prefetch_pages, (self.budget_bytes // page_bytes - 1) // 2)
+        for distance in range(1, radius + 1):
+            self.request(page_idx + distance)
+            self.request(page_idx - distance)
+
+    @Slot()
+    def on_page_rendered(self, page_idx, image_size, image, options, request_id):
+        """Store a finished render; results from before the last invalidate are dropped."""
+        if self.pending.pop(request_id, None) is None:
+            self.stale += 1
+            return
+        self.pending_pages.discard(page_idx)
+        if image.isNull():
+            return
+        image.setDevicePixelRatio(self.device_pixel_ratio)
+        self.renders += 1
+        self.images[page_idx] = image
+        self.bytes_used += image.sizeInBytes()
+        self.evict(keep={page_idx, self.current_page})
+        self.page_ready.emit(page_idx)
+
+    def evict(self, keep=()):
+        """Drop least recently used pages until the cache fits the budget; pages in keep stay."""
+        while self.bytes_used > self.budget_bytes:
+            victim = next((page_idx for page_idx in self.images if page_idx not in keep), None)
+            if victim is None:
+                break
+            image = self.images.pop(victim)
+            self.bytes_used -= image.sizeInBytes()
+            self.evictions += 1
+
+    def set_budget(self, budget_bytes):
+        """Change the byte budget, evicting at once if it shrank."""
+        self.budget_bytes = budget_bytes
+        self.evict(keep={self.current_page})
+
+    def trim(self, keep=()):
+        """
+        Drop every cached page except keep and forget in-flight requests
+        for other pages (memory ceiling reached; the document may be
+        reloaded next).
+
+        Returns:
+            int: bytes freed
+        """
+        for request_id, page_idx in list(self.pending.items()):
+            if page_idx not in keep:
+                del self.pending[request_id]
+                self.pending_pages.discard(page_idx)
+        freed = 0
+        for page_idx in [page_idx for page_idx in self.images if page_idx not in keep]:
+            image = self.images.pop(page_idx)
+            freed += image.sizeInBytes()
+            self.evictions += 1
+        self.bytes_used -= freed
+        return freed
+
+    def stats(self):
+        """Return hit/miss counters and memory usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "renders": self.renders,
+            "evictions": self.evictions,
+            "stale": self.stale,
+            "pages": len(self.images),
+            "bytes": self.bytes_used,
+            "budget_bytes": self.budget_bytes,
+        }
+
+    def print_stats(self, label=""):
+        """Print counters (debug output on close)."""
+        stats = self.stats()
+        print(f"render cache {label}: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}), {stats['renders']} renders, "
+              f"{stats['evictions']} evictions, {stats['pages']} pages, "
+              f"{stats['bytes'] / 1e6:.1f}/{stats['budget_bytes'] / 1e6:.0f} MB")
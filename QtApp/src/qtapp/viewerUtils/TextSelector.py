@@ -174,30 +174,34 @@ class TextSelector(QObject):
         rect.setSize(size)
         return rect
 
-    def page_to_viewport_coords(self, page_rect):
-        """ inverse transformation of coordinates; page -> viewport """
-        page_x = page_rect.x()
-        page_y = page_rect.y()
+    def viewport_to_page_point(self, pos):
+        """ transforms a viewport pixel position to page coordinates (points) """
+        dx, dy = self.page_to_viewport_offset()
+        px_x = float(pos.x()) - dx
+        px_y = float(pos.y()) - dy
+
+        return QPointF(px_x / self.current_zoom_factor,
+                       px_y / self.current_zoom_factor)
 
+    def page_to_viewport_offset(self):
+        """ pixel offset of the current page's origin in the viewport; page px + offset = viewport """
         doc_width = self.current_document_size.width() * self.current_zoom_factor
-        doc_height = self.current_document_size.height() * self.current_zoom_factor
         view_width = float(self.current_viewport.width())
-        view_height = float(self.current_viewport.height())
 
         if doc_width > view_width:
             margin_w = self.current_margins
         else:
             margin_w = (view_width - doc_width) / 2.0 - 1.0
 
-        scroll_pos_x = page_x
-        scroll_pos_y = page_y
-
-        total_x = scroll_pos_x + margin_w - self.w_offset
-        total_y = scroll_pos_y + self.current_margins - self.h_offset
-
         viewport_pos = self.parent.view.viewport().pos()
-        viewport_x = total_x + viewport_pos.x()
-        viewport_y = total_y + viewport_pos.y()
+        return (margin_w - self.w_offset + viewport_pos.x(),
+                self.current_margins - self.h_offset + viewport_pos.y())
+
+    def page_to_viewport_coords(self, page_rect):
+        """ inverse transformation of coordinates; page -> viewport """
+        dx, dy = self.page_to_viewport_offset()
+        viewport_x = page_rect.x() + dx
+        viewport_y = page_rect.y() + dy
         size = page_rect.size()
         rect = QRect()
 
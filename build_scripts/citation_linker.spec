@@ -38,6 +38,8 @@ a = Analysis(
         # Add all qtapp modules
         'qtapp',
         'qtapp.main',
+        'qtapp.app',
+        'qtapp.batch',
         'qtapp.components',
         'qtapp.utils',
         'qtapp.viewerUtils',